@@ -0,0 +1,159 @@
+"""Benchmark parsing of the login flow pages and the latency of a full HelenSession login.
+
+The login runs against a local stub server that serves the login pages in tests/resources/login,
+so no network access or credentials are needed. The pages are small synthetic pages with the
+structure of the real login flow, so parsing speedups measured on them are indicative only.
+
+Usage: python -m benchmarks.bench_login [--iterations N] [--server-delay-ms MS]
+"""
+
+import argparse
+import statistics
+import threading
+import time
+import timeit
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup
+
+from helenservice.helen_session import HelenSession
+from helenservice.login_page_parser import extract_login_page_fields
+
+LOGIN_PAGES_DIR = Path(__file__).resolve().parent.parent / "tests" / "resources" / "login"
+
+# Path of each request in the login flow and the page it responds with
+LOGIN_FLOW_PAGES = {
+    "/hcc/TupasLoginFrame": "tupas.html",
+    "/oauth/authorize": "authorize.html",
+    "/granted": "access_granted.html",
+    "/continue": "proceed.html",
+    "/auth/callback": "auth_response.html",
+}
+
+# Fields that HelenSession extracts from each page
+PAGE_FIELDS = {
+    "tupas.html": {},
+    "authorize.html": {},
+    "access_granted.html": {"input_names": ("code", "state")},
+    "proceed.html": {"need_form": False, "need_anchor": True},
+    "auth_response.html": {"input_names": ("code", "state")},
+}
+
+
+def read_login_page(name: str, base_url: str) -> str:
+    return (LOGIN_PAGES_DIR / name).read_text().replace("{base}", base_url)
+
+
+class _LoginStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._delay()
+        path = urlparse(self.path).path
+        if path == "/callback":
+            self._respond(200, b"<html><body>Oma Helen</body></html>", {"Set-Cookie": "access-token=stub.token.value"})
+        elif path in LOGIN_FLOW_PAGES:
+            self._respond(200, self.server.pages[LOGIN_FLOW_PAGES[path]])
+        else:
+            self._respond(404, b"")
+
+    def do_POST(self):
+        self._delay()
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self._respond(302, b"", {"Location": f"{self.server.base_url}/granted"})
+
+    def _delay(self):
+        if self.server.delay_seconds:
+            time.sleep(self.server.delay_seconds)
+
+    def _respond(self, status: int, body: bytes, headers: dict = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_login_stub_server(delay_seconds: float = 0.0) -> ThreadingHTTPServer:
+    """Start a local server that imitates the Oma Helen login flow with the synthetic pages."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _LoginStubHandler)
+    server.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    server.delay_seconds = delay_seconds
+    server.pages = {name: read_login_page(name, server.base_url).encode() for name in PAGE_FIELDS}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def create_stub_session_class(server: ThreadingHTTPServer, use_fast_parser: bool) -> type:
+    return type(
+        "StubHelenSession",
+        (HelenSession,),
+        {
+            "HELEN_LOGIN_HOST": server.base_url,
+            "TUPAS_LOGIN_URL": f"{server.base_url}/hcc/TupasLoginFrame",
+            "USE_FAST_LOGIN_PAGE_PARSER": use_fast_parser,
+        },
+    )
+
+
+def _parse_with_beautifulsoup(html: str, input_names=(), need_form=True, need_anchor=False):
+    soup = BeautifulSoup(html, "html.parser")
+    if need_form:
+        soup.find("form").attrs["action"]
+    if need_anchor:
+        soup.find("a").attrs["href"]
+    for name in input_names:
+        soup.find("input", {"name": name}).get("value")
+
+
+def benchmark_page_parsing(iterations: int):
+    print(f"Login page parsing, mean of {iterations} runs")
+    print(f"{'page':<22}{'size':>10}{'extractor':>14}{'BeautifulSoup':>16}{'speedup':>10}")
+    for name, fields in PAGE_FIELDS.items():
+        html = read_login_page(name, "https://login.example.test")
+        extractor = timeit.timeit(partial(extract_login_page_fields, html, **fields), number=iterations) / iterations
+        soup = timeit.timeit(partial(_parse_with_beautifulsoup, html, **fields), number=iterations) / iterations
+        print(f"{name:<22}{len(html):>9}B{extractor * 1000:>12.3f}ms{soup * 1000:>14.3f}ms{soup / extractor:>9.1f}x")
+
+
+def benchmark_login(iterations: int, delay_seconds: float):
+    server = start_login_stub_server(delay_seconds)
+    try:
+        print(f"\nFull login against a local stub server, {iterations} logins")
+        print(f"{'parser':<16}{'median':>12}{'p95':>12}")
+        for label, use_fast_parser in (("extractor", True), ("BeautifulSoup", False)):
+            session_class = create_stub_session_class(server, use_fast_parser)
+            latencies = []
+            for _ in range(iterations):
+                started = time.perf_counter()
+                helen_session = session_class().login("username", "password")
+                latencies.append(time.perf_counter() - started)
+                assert helen_session.get_access_token() == "stub.token.value"
+                helen_session.close()
+            p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+            print(f"{label:<16}{statistics.median(latencies) * 1000:>10.2f}ms{p95 * 1000:>10.2f}ms")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--server-delay-ms", type=float, default=0.0, help="Simulated latency of each response")
+    args = parser.parse_args()
+
+    benchmark_page_parsing(args.iterations)
+    benchmark_login(args.iterations, args.server_delay_ms / 1000)
+
+
+if __name__ == "__main__":
+    main()
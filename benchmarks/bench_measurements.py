@@ -0,0 +1,249 @@
+"""Benchmark response parsing, cost calculations, contract lookups and CLI serialization at realistic scale.
+
+The one-day fixtures in tests/resources are scaled up to a year of quarter-hour measurements for
+several delivery sites. The HTTP layer is replaced with a stub transport that serves the synthetic
+data, so no network access or credentials are needed. Each benchmark reports the median wall time
+and the peak memory allocated during one run.
+
+Usage: python -m benchmarks.bench_measurements [--days N] [--sites N] [--iterations N]
+"""
+
+import argparse
+import copy
+import json
+import statistics
+import time
+import tracemalloc
+from bisect import bisect_left
+from datetime import date, timedelta
+from functools import partial
+from pathlib import Path
+from urllib.parse import urlparse
+
+from helenservice.api_client import HelenApiClient
+from helenservice.api_response import MeasurementsWithSpotPriceResponse
+from helenservice.const import RESOLUTION_HOUR, RESOLUTION_QUARTER, STREAM_CHUNK_SIZE
+from helenservice.rollup import roll_up_measurements
+from helenservice.stream_decoder import decode_measurements_with_spot_prices
+from helenservice.utils import (
+    format_epoch_utc_timestamp,
+    get_local_day_bounds,
+    iter_dates,
+    json_serializer,
+    parse_utc_timestamp_to_epoch,
+)
+
+RESOURCES_DIR = Path(__file__).resolve().parent.parent / "tests" / "resources"
+FIRST_DAY = date(2025, 1, 1)
+
+
+def _read_fixture(name: str) -> dict:
+    with open(RESOURCES_DIR / name) as f:
+        return json.load(f)
+
+
+def create_quarter_series(first_day: date, days: int) -> list[dict]:
+    """Repeat the quarter fixture over the given days, following the 23 and 25 hour days of DST changes."""
+    fixture_series = _read_fixture("measurement_spot_quarter_response.json")["series"]
+    series = []
+    for day in iter_dates(first_day, first_day + timedelta(days=days - 1)):
+        day_start, day_stop = get_local_day_bounds(day)
+        for quarter_start in range(int(day_start.timestamp()), int(day_stop.timestamp()), 900):
+            entry = dict(fixture_series[len(series) % len(fixture_series)])
+            entry["start"] = format_epoch_utc_timestamp(quarter_start)
+            entry["stop"] = format_epoch_utc_timestamp(quarter_start + 900)
+            series.append(entry)
+    return series
+
+
+def create_contracts(sites: int) -> dict:
+    """Copy the active contract of the fixture into the given number of delivery sites."""
+    contracts_response = _read_fixture("contracts_response.json")
+    template = contracts_response["contracts"][1]
+    contracts = []
+    for site in range(sites):
+        contract = copy.deepcopy(template)
+        contract["gsrn"] = f"64300757200000{site:04d}"
+        contract["delivery_site"]["id"] = 70000000 + site
+        contract["end_date"] = None
+        contracts.append(contract)
+    return {"contracts": contracts, "failed_sources": []}
+
+
+class StubResponse:
+    def __init__(self, body: bytes):
+        self._body = body
+
+    def json(self):
+        return json.loads(self._body)
+
+    def iter_content(self, chunk_size: int = 1):
+        for offset in range(0, len(self._body), chunk_size):
+            yield self._body[offset : offset + chunk_size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+class StubTransport:
+    """Serves the contracts and the measurements of the requested range and resolution from memory.
+
+    Response bodies are encoded once per request and then reused, so that repeated runs measure
+    the client and not the stub.
+    """
+
+    def __init__(self, quarter_series: list[dict], contracts: dict):
+        quarter_response = _read_fixture("measurement_spot_quarter_response.json")
+        quarter_response.update(
+            start=quarter_series[0]["start"], stop=quarter_series[-1]["stop"], series=quarter_series
+        )
+        hour_response = roll_up_measurements(MeasurementsWithSpotPriceResponse(**quarter_response), RESOLUTION_HOUR)
+        self._series = {RESOLUTION_QUARTER: quarter_series, RESOLUTION_HOUR: hour_response.to_dict()["series"]}
+        self._series_starts = {
+            resolution: [parse_utc_timestamp_to_epoch(entry["start"]) for entry in series]
+            for resolution, series in self._series.items()
+        }
+        self._template = quarter_response
+        self._contracts_body = json.dumps(contracts).encode()
+        self._bodies = {}
+
+    def get(self, url: str, params: dict = None, headers: dict = None, timeout: float = None, **kwargs):
+        if urlparse(url).path.endswith("/contract/list"):
+            return StubResponse(self._contracts_body)
+        key = (params["start"], params["stop"], params["resolution"])
+        body = self._bodies.get(key)
+        if body is None:
+            body = self._bodies[key] = self._encode_measurements(*key)
+        return StubResponse(body)
+
+    def _encode_measurements(self, start: str, stop: str, resolution: str) -> bytes:
+        starts = self._series_starts[resolution]
+        first_index = bisect_left(starts, parse_utc_timestamp_to_epoch(start))
+        last_index = bisect_left(starts, parse_utc_timestamp_to_epoch(stop))
+        response = dict(self._template, start=start, stop=stop, resolution=resolution)
+        response["series"] = self._series[resolution][first_index:last_index]
+        return json.dumps(response).encode()
+
+
+class _StubSession:
+    def get_access_token(self):
+        return "stub.token.value"
+
+
+def create_client(transport: StubTransport, **kwargs) -> HelenApiClient:
+    client = HelenApiClient(transport=transport, **kwargs)
+    client._session = _StubSession()
+    return client
+
+
+def measure(label: str, function, iterations: int, setup=None):
+    """Print the median wall time of the runs and the peak memory allocated during one run."""
+    durations = []
+    for _ in range(iterations):
+        argument = setup() if setup else None
+        started = time.perf_counter()
+        function(argument) if setup else function()
+        durations.append(time.perf_counter() - started)
+
+    argument = setup() if setup else None
+    tracemalloc.start()
+    function(argument) if setup else function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<58}{statistics.median(durations) * 1000:>12.2f}ms{peak / 1024 / 1024:>12.2f}MiB")
+
+
+def run_benchmarks(days: int, sites: int, iterations: int):
+    quarter_series = create_quarter_series(FIRST_DAY, days)
+    contracts = create_contracts(sites)
+    gsrn_ids = [contract["gsrn"] for contract in contracts["contracts"]]
+    transport = StubTransport(quarter_series, contracts)
+    last_day = FIRST_DAY + timedelta(days=days - 1)
+    # Encode the stub responses of every range the benchmarks request before measuring
+    for resolution in (RESOLUTION_QUARTER, RESOLUTION_HOUR):
+        create_client(transport).get_measurements_with_spot_prices_for_sites(FIRST_DAY, last_day, gsrn_ids, resolution)
+    quarter_body = transport.get(
+        "", {"start": quarter_series[0]["start"], "stop": quarter_series[-1]["stop"], "resolution": RESOLUTION_QUARTER}
+    )._body
+    quarter_response = MeasurementsWithSpotPriceResponse(**json.loads(quarter_body))
+
+    print(
+        f"{days} days of quarter-hour data ({len(quarter_series)} entries, "
+        f"{len(quarter_body) / 1024 / 1024:.1f} MiB JSON), {sites} delivery sites"
+    )
+    print(f"{'benchmark':<58}{'median':>14}{'peak memory':>14}")
+
+    measure(
+        "Parse JSON and construct the response model",
+        lambda: MeasurementsWithSpotPriceResponse(**json.loads(quarter_body)),
+        iterations,
+    )
+    measure(
+        "Decode the response model from a stream",
+        lambda: decode_measurements_with_spot_prices(StubResponse(quarter_body).iter_content(STREAM_CHUNK_SIZE)),
+        iterations,
+    )
+
+    measure(
+        "calculate_total_costs_by_spot_prices_between_dates, cold",
+        lambda client: client.calculate_total_costs_by_spot_prices_between_dates(FIRST_DAY, last_day, gsrn_ids[0]),
+        iterations,
+        setup=partial(create_client, transport),
+    )
+    warm_client = create_client(transport)
+    warm_client.calculate_total_costs_by_spot_prices_between_dates(FIRST_DAY, last_day, gsrn_ids[0])
+    measure(
+        "calculate_total_costs_by_spot_prices_between_dates, warm",
+        lambda: warm_client.calculate_total_costs_by_spot_prices_between_dates(FIRST_DAY, last_day, gsrn_ids[0]),
+        iterations,
+    )
+    measure(
+        "calculate_impact_of_usage_between_dates, cold",
+        lambda client: client.calculate_impact_of_usage_between_dates(FIRST_DAY, last_day, gsrn_ids[0]),
+        iterations,
+        setup=partial(create_client, transport),
+    )
+    measure(
+        "calculate_impact_of_usage_between_dates, warm",
+        lambda: warm_client.calculate_impact_of_usage_between_dates(FIRST_DAY, last_day, gsrn_ids[0]),
+        iterations,
+    )
+    measure(
+        f"calculate_usage_cost_summaries_for_sites, {sites} sites, cold",
+        lambda client: client.calculate_usage_cost_summaries_for_sites(
+            FIRST_DAY, last_day, gsrn_ids, RESOLUTION_QUARTER
+        ),
+        iterations,
+        setup=partial(create_client, transport),
+    )
+
+    def look_up_contracts():
+        for _ in range(100):
+            for gsrn_id in gsrn_ids:
+                warm_client.get_contract_type(gsrn_id)
+                warm_client.get_contract_energy_unit_price(gsrn_id)
+
+    measure(f"Contract lookups, {200 * sites} lookups", look_up_contracts, iterations)
+
+    measure(
+        "CLI JSON output of the quarter-hour response",
+        lambda: json.dumps(quarter_response, default=json_serializer, indent=2),
+        iterations,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=365, help="How many days of data to generate")
+    parser.add_argument("--sites", type=int, default=3, help="How many delivery sites to generate")
+    parser.add_argument("--iterations", type=int, default=5, help="How many times each benchmark is run")
+    args = parser.parse_args()
+
+    run_benchmarks(args.days, args.sites, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
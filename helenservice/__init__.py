@@ -3,15 +3,58 @@ from .api_client import HelenApiClient
 
 # Exceptions users might need to catch
 from .api_exceptions import HelenAuthenticationException, InvalidApiResponseException, InvalidDeliverySiteException
+from .async_api_client import AsyncHelenApiClient
+from .async_helen_session import AsyncHelenSession
+from .cache_policy import CachePolicy
+
+# Calculations that work on already-fetched measurements
+from .calculations import (
+    UsageCostSummary,
+    calculate_impact_of_usage,
+    calculate_total_consumption,
+    calculate_total_spot_cost,
+    calculate_usage_cost_summary,
+)
 
 # Constants that users need
 from .const import RESOLUTION_HOUR, RESOLUTION_QUARTER
+from .export import ExportResult, export_measurements
+from .measurement_store import MeasurementStore
+from .metrics import HelenMetrics, get_default_metrics
 from .price_client import HelenPriceClient
+from .price_percentiles import PricePercentileIndex
+from .rollup import roll_up_measurements
+from .scheduler import Appliance, PriceScheduler, ScheduledRun
+from .spot_price_index import SpotPriceIndex, SpotPriceSpan
+from .transport import HelenTransport
 
 __all__ = [
     # Main classes
     'HelenApiClient',
+    'AsyncHelenApiClient',
+    'AsyncHelenSession',
     'HelenPriceClient',
+    'MeasurementStore',
+    'HelenTransport',
+    'SpotPriceIndex',
+    'SpotPriceSpan',
+    'PriceScheduler',
+    'Appliance',
+    'ScheduledRun',
+    'PricePercentileIndex',
+    'CachePolicy',
+    'HelenMetrics',
+    'get_default_metrics',
+    # Calculations
+    'UsageCostSummary',
+    'calculate_usage_cost_summary',
+    'calculate_total_consumption',
+    'calculate_total_spot_cost',
+    'calculate_impact_of_usage',
+    'roll_up_measurements',
+    # Export
+    'export_measurements',
+    'ExportResult',
     # Constants
     'RESOLUTION_HOUR',
     'RESOLUTION_QUARTER',
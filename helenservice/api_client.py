@@ -1,9 +1,11 @@
 import logging
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta
-from zoneinfo import ZoneInfo
 
-import requests
-from cachetools import TTLCache, cachedmethod
+from cachetools import LRUCache, cachedmethod
+from requests import Response
 
 from helenservice.api_exceptions import InvalidApiResponseException, InvalidDeliverySiteException
 
@@ -11,11 +13,47 @@ from .api_response import (
     MeasurementsWithSpotPriceResponse,
     SpotPriceChartResponse,
 )
-from .const import HTTP_READ_TIMEOUT, RESOLUTION_HOUR
+from .cache_policy import DATA_IMMUTABLE, CachePolicy, PolicyCache
+from .calculations import (
+    UsageCostSummary,
+    calculate_impact_of_usage,
+    calculate_total_consumption,
+    calculate_total_spot_cost,
+    calculate_usage_cost_summary,
+)
+from .const import (
+    CHUNK_MONTH,
+    CHUNKED_RESOLUTIONS,
+    DAY_SEGMENTABLE_RESOLUTIONS,
+    HTTP_READ_TIMEOUT,
+    RESOLUTION_DAY,
+    RESOLUTION_HOUR,
+    RESOLUTION_MONTH,
+    ROLL_UP_SOURCE_RESOLUTIONS,
+    STREAM_CHUNK_SIZE,
+)
+from .contract_index import ContractIndex, ContractProducts
 from .helen_session import HelenSession
+from .measurement_store import MeasurementStore
+from .metrics import CACHE_EVICTION, CACHE_HIT, CACHE_MISS, HelenMetrics, InstrumentedTTLCache, get_default_metrics
+from .price_percentiles import PricePercentileIndex
+from .range_cache import DayRangeCache
+from .rollup import roll_up_measurements
+from .single_flight import SingleFlight, single_flight
+from .spot_price_index import SpotPriceIndex
+from .stream_decoder import decode_measurements_with_spot_prices
+from .transport import HelenTransport, get_default_transport
+from .utils import (
+    format_utc_timestamp,
+    get_local_day_bounds,
+    get_utc_time_range,
+    group_consecutive_dates,
+    iter_dates,
+    map_ahead,
+    plan_date_chunks,
+)
 
 
-# TODO: consider moving all calculation functions somewhere else - they are not related to HelenApiClient
 class HelenApiClient:
     HELEN_API_URL_V25 = "https://api.omahelen.fi/v25"
     HELEN_API_URL_V26 = "https://api.omahelen.fi/v26"
@@ -28,71 +66,133 @@ class HelenApiClient:
     _selected_delivery_site_id: str = None
     _selected_contract = None
     _all_active_contracts = None
-
-    def __init__(self, tax: float = None, margin: float = None):
+    _contract_index: ContractIndex = None
+    _indexed_contracts = None
+
+    def __init__(
+        self,
+        tax: float = None,
+        margin: float = None,
+        measurement_store: MeasurementStore = None,
+        max_fetch_workers: int = 4,
+        fetch_chunk_size: str = CHUNK_MONTH,
+        transport: HelenTransport = None,
+        stream_responses: bool = False,
+        cache_policy: CachePolicy = None,
+        roll_up_resolutions: bool = False,
+        metrics: HelenMetrics = None,
+    ):
+        """
+        Args:
+            tax: The tax to add to spot prices (default: 0.255)
+            margin: The margin (c/kWh) to add to spot prices (default: 0.38)
+            measurement_store: Optional persistent store for measurements. When given, measurements of
+                days that do not change anymore are read from the store instead of the API.
+            max_fetch_workers: How many chunks of a long quarter or hour range, or how many delivery sites, are
+                fetched concurrently. The client never has more measurement requests in flight than this, also
+                when the chunks of several sites are fetched at once (default: 4)
+            fetch_chunk_size: How long ranges are split into chunks, "month" or "week" (default: "month")
+            transport: HTTP transport for the API calls (default: the transport shared by all clients)
+            stream_responses: Decode measurement responses incrementally while they are downloaded, so that
+                the peak memory use does not grow with the length of the range (default: False)
+            cache_policy: How long cached measurements and spot prices stay valid depending on how final the
+                data of their days is (default: CachePolicy())
+            roll_up_resolutions: Answer hour, day and month requests locally by rolling up cached quarter or
+                hour measurements of the whole range instead of fetching them. Rolled up series have no
+                temperature or humidity, and their averaged prices are not rounded like the API rounds
+                them (default: False)
+            metrics: Where the hits, misses and evictions of the caches are recorded (default: the metrics shared
+                by all clients). Requests are recorded by the transport.
+        """
         self._tax = 0.255 if tax is None else tax
         self._margin = 0.38 if margin is None else margin
-        self._cache = TTLCache(maxsize=128, ttl=3600)
+        self._metrics = get_default_metrics() if metrics is None else metrics
+        self._cache = InstrumentedTTLCache(maxsize=128, ttl=3600, name="contract_list", metrics=self._metrics)
+        self._cache_lock = threading.RLock()
+        # Concurrent cache misses of the same request wait for one upstream request
+        self._single_flight = SingleFlight()
+        self._state_lock = threading.RLock()
+        self._cache_policy = CachePolicy() if cache_policy is None else cache_policy
+        self._day_cache = DayRangeCache(cache_policy=self._cache_policy, name="measurement_days", metrics=self._metrics)
+        self._range_cache = PolicyCache(
+            maxsize=128, cache_policy=self._cache_policy, name="measurement_ranges", metrics=self._metrics
+        )
+        self._spot_price_cache = PolicyCache(
+            maxsize=512, cache_policy=self._cache_policy, name="spot_prices", metrics=self._metrics
+        )
+        # Indexes of the cached spot price responses by date, as (response, index)
+        self._spot_price_indexes = LRUCache(maxsize=512)
+        self._spot_price_indexes_lock = threading.Lock()
+        self._revalidation_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="helen-revalidate")
+        self._revalidating_keys = set()
+        self._revalidating_keys_lock = threading.Lock()
+        self._measurement_store = measurement_store
+        self._max_fetch_workers = max_fetch_workers
+        # Shared by the nested thread pools of sites and chunks, which would otherwise multiply
+        self._fetch_semaphore = threading.BoundedSemaphore(max(1, max_fetch_workers))
+        self._fetch_chunk_size = fetch_chunk_size
+        self._transport = get_default_transport() if transport is None else transport
+        self._stream_responses = stream_responses
+        self._roll_up_resolutions = roll_up_resolutions
+
+    def login_and_init(self, username, password, session_file: str = None):
+        """Login to Oma Helen. Creates a new session when called.
+
+        If a session file is given, a still valid session saved in it is reused without logging in,
+        and a new session is saved into it after logging in. The file is only readable by the
+        current user.
+        """
+        return self.init_with_session(HelenSession.restore_or_login(username, password, session_file))
 
-    def login_and_init(self, username, password):
-        """Login to Oma Helen. Creates a new session when called."""
-        self._session = HelenSession().login(username, password)
+    def init_with_session(self, session: HelenSession):
+        """Use an already logged in session to access the API."""
+        self._session = session
         self._latest_login_time = datetime.now()
         self._refresh_api_client_state()
         return self
 
     def is_session_valid(self):
-        """If the latest login has happened within the last hour, then the session should be valid and ready to go"""
+        """Check whether the access token is still valid. If the token has no readable expiry time, then
+        the session is expected to be valid if the latest login has happened within the last hour
+        """
         if self._latest_login_time is None:
             return False
+        if self._session.get_access_token_expiry() is not None:
+            return self._session.is_access_token_valid()
         now = datetime.now()
         is_latest_login_within_hour = now - timedelta(hours=1) <= self._latest_login_time <= now
         return is_latest_login_within_hour
 
     def close(self):
+        self._revalidation_executor.shutdown(wait=False, cancel_futures=True)
         if self._session is not None:
             self._session.close()
 
-    def _get_hourly_consumption_costs(self, start_date: date, end_date: date) -> list:
-        series = self.get_measurements_with_spot_prices(start_date, end_date, RESOLUTION_HOUR).series
-        if not series:
-            return []
-        hourly_consumption_costs = []
-        for entry in series:
-            if entry.electricity is None or entry.electricity_spot_prices is None:
-                continue
-            hourly_price_with_tax_and_margin = entry.electricity_spot_prices * (1 + self._tax) + self._margin
-            hourly_consumption_costs.append(abs(hourly_price_with_tax_and_margin * entry.electricity))
-        return hourly_consumption_costs
-
-    def calculate_transfer_fees_between_dates(self, start_date: date, end_date: date):
+    def calculate_transfer_fees_between_dates(self, start_date: date, end_date: date, gsrn: str = None):
         """Calculate your total transfer fee costs including the monthly base price
 
         Returns the price in euros
         """
-        total_consumption = self.get_total_consumption_between_dates(start_date, end_date)
-        transfer_fee = self.get_transfer_fee()
+        total_consumption = self.get_total_consumption_between_dates(start_date, end_date, gsrn)
+        transfer_fee = self.get_transfer_fee(gsrn)
         total_price = total_consumption * transfer_fee
-        total_price_in_euros = total_price / 100 + self.get_transfer_base_price()
+        total_price_in_euros = total_price / 100 + self.get_transfer_base_price(gsrn)
         return total_price_in_euros
 
-    def get_total_consumption_between_dates(self, start_date: date, end_date: date) -> float:
-        series = self.get_daily_measurements_between_dates(start_date, end_date).series
-        total_consumption = sum(abs(entry.electricity) for entry in series if entry.electricity is not None)
-        return total_consumption
+    def get_total_consumption_between_dates(self, start_date: date, end_date: date, gsrn: str = None) -> float:
+        measurements = self.get_daily_measurements_between_dates(start_date, end_date, gsrn)
+        return calculate_total_consumption(measurements)
 
-    def calculate_total_costs_by_spot_prices_between_dates(self, start_date: date, end_date: date):
+    def calculate_total_costs_by_spot_prices_between_dates(self, start_date: date, end_date: date, gsrn: str = None):
         """Calculate your total electricity cost with according spot prices by hourly precision.
         Note: Spot prices include the user-configured tax and margin.
 
         Returns the price in euros
         """
-        hourly_consumption_costs = self._get_hourly_consumption_costs(start_date, end_date)
-        total_price = sum(hourly_consumption_costs)
-        total_price_in_euros = total_price / 100
-        return total_price_in_euros
+        measurements = self.get_measurements_with_spot_prices(start_date, end_date, RESOLUTION_HOUR, gsrn)
+        return calculate_total_spot_cost(measurements, self._tax, self._margin)
 
-    def calculate_impact_of_usage_between_dates(self, start_date: date, end_date: date) -> float:
+    def calculate_impact_of_usage_between_dates(self, start_date: date, end_date: date, gsrn: str = None) -> float:
         """Calculate the price impact of your usage based on hourly consumption and hourly spot prices
 
         The price impact increases or decreases your contract's unit price in certain contracts
@@ -105,83 +205,316 @@ class HelenApiClient:
         B = total consumption multiplied with the whole month's average market price (i.e. your average price of the whole month)
         E = total consumption
         """
-        series = self.get_measurements_with_spot_prices(start_date, end_date, RESOLUTION_HOUR).series
-        if not series:
-            return 0.0
-        valid_entries = [
-            entry for entry in series if entry.electricity is not None and entry.electricity_spot_prices is not None
-        ]
-        if not valid_entries:
-            return 0.0
-        hourly_weighted_consumption_prices = [
-            abs(entry.electricity_spot_prices * (1 + self._tax) * entry.electricity) for entry in valid_entries
-        ]
-        monthly_average_price = sum(
-            abs(entry.electricity_spot_prices * (1 + self._tax)) for entry in valid_entries
-        ) / len(valid_entries)
-        total_consumption = sum(abs(entry.electricity) for entry in valid_entries)
-        total_hourly_weighted_consumption_prices = sum(hourly_weighted_consumption_prices)
-        total_consumption_average_price = monthly_average_price * total_consumption
-
-        impact = (total_hourly_weighted_consumption_prices - total_consumption_average_price) / total_consumption
-
-        return impact
-
-    @cachedmethod(lambda self: self._cache)
-    def get_daily_measurements_between_dates(self, start: date, end: date) -> MeasurementsWithSpotPriceResponse:
+        measurements = self.get_measurements_with_spot_prices(start_date, end_date, RESOLUTION_HOUR, gsrn)
+        return calculate_impact_of_usage(measurements, self._tax)
+
+    def calculate_usage_cost_summary_between_dates(
+        self, start_date: date, end_date: date, resolution: str = RESOLUTION_HOUR, gsrn: str = None
+    ) -> UsageCostSummary:
+        """Calculate consumption, spot cost, average prices and the impact of usage between dates in one go.
+        Note: Spot costs include the user-configured tax and margin.
+        """
+        measurements = self.get_measurements_with_spot_prices(start_date, end_date, resolution, gsrn)
+        return calculate_usage_cost_summary(measurements, self._tax, self._margin)
+
+    def get_daily_measurements_between_dates(
+        self, start: date, end: date, gsrn: str = None
+    ) -> MeasurementsWithSpotPriceResponse:
         """Get electricity measurements for each day between the given dates."""
 
-        return self.get_measurements_with_spot_prices(start, end, resolution="day")
+        return self.get_measurements_with_spot_prices(start, end, RESOLUTION_DAY, gsrn)
 
-    @cachedmethod(lambda self: self._cache)
-    def get_monthly_measurements_by_year(self, year: int) -> MeasurementsWithSpotPriceResponse:
+    def get_monthly_measurements_by_year(self, year: int, gsrn: str = None) -> MeasurementsWithSpotPriceResponse:
         """Get electricity measurements for each month of the selected year."""
 
         start = date(year, 1, 1)
         end = date(year, 12, 31)
-        return self.get_measurements_with_spot_prices(start, end, resolution="month")
+        return self.get_measurements_with_spot_prices(start, end, RESOLUTION_MONTH, gsrn)
 
-    @cachedmethod(lambda self: self._cache)
     def get_measurements_between_dates(
-        self, start: date, end: date, resolution: str = RESOLUTION_HOUR
+        self, start: date, end: date, resolution: str = RESOLUTION_HOUR, gsrn: str = None
     ) -> MeasurementsWithSpotPriceResponse:
         """Get electricity measurements for each hour or quarter between given dates."""
 
-        return self.get_measurements_with_spot_prices(start, end, resolution)
+        return self.get_measurements_with_spot_prices(start, end, resolution, gsrn)
 
-    @cachedmethod(lambda self: self._cache)
     def get_measurements_with_spot_prices(
-        self, start: date, end: date, resolution: str = RESOLUTION_HOUR
+        self, start: date, end: date, resolution: str = RESOLUTION_HOUR, gsrn: str = None
     ) -> MeasurementsWithSpotPriceResponse:
         """Get electricity measurements with spot prices for a specific GSRN between given dates.
 
+        Measurements are cached per day, so a range overlapping previously fetched ranges
+        only fetches the days that are not cached yet.
+
         Args:
             start: The start date
             end: The end date
             resolution: The resolution (default: "hour")
+            gsrn: GSRN or delivery site id to use instead of the selected delivery site
 
         Returns:
             MeasurementsWithSpotPriceResponse object containing measurements and spot prices.
         """
-        start_time, end_time = self._get_utc_time_range(start, end)
+        gsrn_id = self._get_contract(gsrn)["gsrn"]
+        return self._get_measurements_with_spot_prices_for_gsrn(gsrn_id, start, end, resolution)
+
+    def iter_measurements_with_spot_prices(
+        self, start: date, end: date, resolution: str = RESOLUTION_HOUR, gsrn: str = None, max_workers: int = None
+    ) -> Iterator[MeasurementsWithSpotPriceResponse]:
+        """Get electricity measurements with spot prices between given dates one chunk at a time.
+
+        Long quarter and hour ranges are split into chunks like `get_measurements_with_spot_prices`
+        does, and each chunk is yielded in chronological order as soon as it is available. At most
+        `max_workers` chunks are fetched ahead, so only a few chunks are held in memory however
+        long the range is. Other resolutions are yielded as one response.
+
+        Args:
+            start: The start date
+            end: The end date
+            resolution: The resolution (default: "hour")
+            gsrn: GSRN or delivery site id to use instead of the selected delivery site
+            max_workers: How many chunks are fetched concurrently (default: max_fetch_workers of the client)
+        """
+        gsrn_id = self._get_contract(gsrn)["gsrn"]
+        if resolution not in CHUNKED_RESOLUTIONS:
+            yield self._get_measurements_with_spot_prices_for_gsrn(gsrn_id, start, end, resolution)
+            return
+
+        chunks = plan_date_chunks(start, end, self._fetch_chunk_size)
+        yield from map_ahead(
+            lambda chunk: self._get_measurements_with_spot_prices_for_gsrn(gsrn_id, chunk[0], chunk[1], resolution),
+            chunks,
+            self._max_fetch_workers if max_workers is None else max_workers,
+        )
+
+    def get_measurements_with_spot_prices_for_sites(
+        self, start: date, end: date, site_ids: list[str] = None, resolution: str = RESOLUTION_HOUR
+    ) -> dict[str, MeasurementsWithSpotPriceResponse]:
+        """Get electricity measurements with spot prices of several delivery sites concurrently.
+        The selected delivery site is not changed.
+
+        Args:
+            start: The start date
+            end: The end date
+            site_ids: GSRN ids or delivery site ids (default: all active delivery sites by GSRN)
+            resolution: The resolution (default: "hour")
+
+        Returns:
+            Measurements of each site by the given site id.
+
+        Raises:
+            InvalidDeliverySiteException: If any of the site ids is not an active delivery site.
+        """
+        return self._map_sites(
+            site_ids, lambda gsrn_id: self._get_measurements_with_spot_prices_for_gsrn(gsrn_id, start, end, resolution)
+        )
+
+    def calculate_usage_cost_summaries_for_sites(
+        self, start_date: date, end_date: date, site_ids: list[str] = None, resolution: str = RESOLUTION_HOUR
+    ) -> dict[str, UsageCostSummary]:
+        """Calculate consumption, spot cost, average prices and the impact of usage of several delivery
+        sites concurrently. The selected delivery site is not changed.
+        Note: Spot costs include the user-configured tax and margin.
+
+        Returns:
+            UsageCostSummary of each site by the given site id.
+        """
+        return self._map_sites(
+            site_ids,
+            lambda gsrn_id: calculate_usage_cost_summary(
+                self._get_measurements_with_spot_prices_for_gsrn(gsrn_id, start_date, end_date, resolution),
+                self._tax,
+                self._margin,
+            ),
+        )
+
+    def _map_sites(self, site_ids: list[str], function) -> dict:
+        """Resolve the site ids to GSRN ids and call the function for each site on a bounded thread pool."""
+        self._refresh_api_client_state()
+        contract_index = self._contract_index
+        if site_ids is None:
+            site_ids = contract_index.gsrn_ids
+        gsrn_ids_by_site_id = {
+            str(site_id): self._find_active_contract(site_id, contract_index)["gsrn"] for site_id in site_ids
+        }
+        if len(gsrn_ids_by_site_id) <= 1 or self._max_fetch_workers <= 1:
+            return {site_id: function(gsrn_id) for site_id, gsrn_id in gsrn_ids_by_site_id.items()}
 
-        gsrn_id = self._selected_contract["gsrn"]
+        logging.debug("Fetching %d delivery sites concurrently", len(gsrn_ids_by_site_id))
+        with ThreadPoolExecutor(max_workers=min(self._max_fetch_workers, len(gsrn_ids_by_site_id))) as executor:
+            results = executor.map(function, gsrn_ids_by_site_id.values())
+            return dict(zip(gsrn_ids_by_site_id.keys(), results))
+
+    def _get_measurements_with_spot_prices_for_gsrn(
+        self, gsrn_id: str, start: date, end: date, resolution: str
+    ) -> MeasurementsWithSpotPriceResponse:
+        if self._roll_up_resolutions and resolution in ROLL_UP_SOURCE_RESOLUTIONS:
+            rolled_up = self._roll_up_cached_measurements(gsrn_id, start, end, resolution)
+            if rolled_up is not None:
+                return rolled_up
+        if resolution not in DAY_SEGMENTABLE_RESOLUTIONS:
+            return self._get_measurements_with_spot_prices_for_range(gsrn_id, start, end, resolution)
+        return self._get_measurements_with_spot_prices_by_day(gsrn_id, start, end, resolution)
+
+    def _roll_up_cached_measurements(
+        self, gsrn_id: str, start: date, end: date, resolution: str
+    ) -> MeasurementsWithSpotPriceResponse:
+        """
+        Roll up the range from cached measurements of a finer resolution if every day of the range is
+        cached with that resolution. Returns None if no finer resolution covers the whole range.
+        """
+        days = list(iter_dates(start, end))
+        for source_resolution in ROLL_UP_SOURCE_RESOLUTIONS[resolution]:
+            day_responses = self._get_cached_days(gsrn_id, source_resolution, days)
+            if len(day_responses) == len(days):
+                logging.debug("Rolling up cached '%s' measurements to '%s'", source_resolution, resolution)
+                return roll_up_measurements(self._concat_days(day_responses, start, end, source_resolution), resolution)
+        return None
+
+    def _get_cached_days(
+        self, gsrn_id: str, resolution: str, days: list[date], stale_days: list[date] = None
+    ) -> dict[date, MeasurementsWithSpotPriceResponse]:
+        """Look up days from the in-memory day cache first and then from the measurement store, if any."""
+        day_responses = self._day_cache.get_days(gsrn_id, resolution, days, stale_days)
+        if self._measurement_store is not None and len(day_responses) < len(days):
+            wanted_days = [day for day in days if day not in day_responses]
+            stored_days = self._measurement_store.get_days(gsrn_id, resolution, wanted_days)
+            self._metrics.record_cache("measurement_store", CACHE_HIT, len(stored_days))
+            self._metrics.record_cache("measurement_store", CACHE_MISS, len(wanted_days) - len(stored_days))
+            self._day_cache.put_days(gsrn_id, resolution, stored_days)
+            day_responses.update(stored_days)
+        return day_responses
+
+    def _concat_days(
+        self, day_responses: dict[date, MeasurementsWithSpotPriceResponse], start: date, end: date, resolution: str
+    ) -> MeasurementsWithSpotPriceResponse:
+        start_time, _ = get_local_day_bounds(start)
+        _, end_time = get_local_day_bounds(end)
+        return MeasurementsWithSpotPriceResponse.concat(
+            [day_responses[day] for day in iter_dates(start, end) if day in day_responses],
+            format_utc_timestamp(start_time),
+            format_utc_timestamp(end_time),
+            resolution,
+        )
+
+    def _get_measurements_with_spot_prices_for_range(
+        self, gsrn_id: str, start: date, end: date, resolution: str
+    ) -> MeasurementsWithSpotPriceResponse:
+        return self._get_with_cache_policy(
+            self._range_cache,
+            (gsrn_id, start, end, resolution),
+            end,
+            lambda: self._fetch_measurements_with_spot_prices(gsrn_id, start, end, resolution),
+        )
+
+    def _get_measurements_with_spot_prices_by_day(
+        self, gsrn_id: str, start: date, end: date, resolution: str
+    ) -> MeasurementsWithSpotPriceResponse:
+        """
+        Assemble the range from cached days and fetch only the days that are not cached.
+        Expired live days are served from the cache while they are refetched in the background.
+        """
+        days = list(iter_dates(start, end))
+        stale_days = []
+        day_responses = self._get_cached_days(gsrn_id, resolution, days, stale_days)
+        missing_days = [day for day in days if day not in day_responses]
+        if stale_days:
+            self._revalidate_in_background(
+                ("days", gsrn_id, resolution, tuple(stale_days)),
+                lambda: self._fetch_and_cache_days(gsrn_id, stale_days, resolution),
+            )
+
+        fetched = self._fetch_and_cache_days(gsrn_id, missing_days, resolution)
+        for _, fetched_days in fetched:
+            day_responses.update(fetched_days)
+        if len(fetched) == 1 and len(missing_days) == len(days):
+            # Nothing was cached, so the fetched response already covers the whole range
+            return fetched[0][0]
+        return self._concat_days(day_responses, start, end, resolution)
+
+    def _fetch_and_cache_days(
+        self, gsrn_id: str, days: list[date], resolution: str
+    ) -> list[tuple[MeasurementsWithSpotPriceResponse, dict]]:
+        """
+        Fetch the given days and put them into the day cache. Complete days that do not change anymore
+        are also written to the measurement store, while empty or partial days are fetched again later.
+        Returns each fetched response with its days.
+        """
+        fetched = []
+        for response in self._fetch_measurements_with_spot_prices_in_chunks(
+            gsrn_id, group_consecutive_dates(days), resolution
+        ):
+            fetched_days = response.split_by_local_day()
+            self._day_cache.put_days(gsrn_id, resolution, fetched_days)
+            if self._measurement_store is not None:
+                immutable_days = {
+                    day: day_response
+                    for day, day_response in fetched_days.items()
+                    if self._cache_policy.classify_day(day) == DATA_IMMUTABLE and day_response.is_complete()
+                }
+                self._measurement_store.put_days(gsrn_id, resolution, immutable_days)
+            fetched.append((response, fetched_days))
+        return fetched
+
+    def _fetch_measurements_with_spot_prices_in_chunks(
+        self, gsrn_id: str, date_ranges: list[tuple[date, date]], resolution: str
+    ) -> list[MeasurementsWithSpotPriceResponse]:
+        """
+        Fetch the given date ranges. Long ranges of quarter or hour resolution are split into
+        chunks on Helsinki midnight boundaries, which are fetched concurrently on a bounded
+        thread pool. Returns the responses in chronological order.
+        """
+        chunks = []
+        for range_start, range_end in date_ranges:
+            if resolution in CHUNKED_RESOLUTIONS:
+                chunks.extend(plan_date_chunks(range_start, range_end, self._fetch_chunk_size))
+            else:
+                chunks.append((range_start, range_end))
+        if len(chunks) <= 1 or self._max_fetch_workers <= 1:
+            return [
+                self._fetch_measurements_with_spot_prices(gsrn_id, chunk_start, chunk_end, resolution)
+                for chunk_start, chunk_end in chunks
+            ]
+
+        logging.debug("Fetching %d chunks of '%s' measurements concurrently", len(chunks), resolution)
+        with ThreadPoolExecutor(max_workers=min(self._max_fetch_workers, len(chunks))) as executor:
+            return list(
+                executor.map(
+                    lambda chunk: self._fetch_measurements_with_spot_prices(gsrn_id, chunk[0], chunk[1], resolution),
+                    chunks,
+                )
+            )
+
+    @single_flight(lambda self: self._single_flight)
+    def _fetch_measurements_with_spot_prices(
+        self, gsrn_id: str, start: date, end: date, resolution: str
+    ) -> MeasurementsWithSpotPriceResponse:
+        start_time, end_time = self._get_utc_time_range(start, end)
 
         chart_params = {"start": start_time, "stop": end_time, "resolution": resolution, "channel": "oh"}
 
         chart_url = f"{self.HELEN_API_URL_V26}/chart-data/{gsrn_id}/electricity"
-        response = requests.get(
-            chart_url,
-            params=chart_params,
-            headers=self._api_request_headers(),
-            timeout=HTTP_READ_TIMEOUT,
-        )
+        with self._fetch_semaphore:
+            response = self._transport.get(
+                chart_url,
+                params=chart_params,
+                headers=self._api_request_headers(),
+                timeout=HTTP_READ_TIMEOUT,
+                stream=self._stream_responses,
+            )
 
-        return MeasurementsWithSpotPriceResponse(**response.json())
+            if self._stream_responses:
+                with response:
+                    response.raise_for_status()
+                    try:
+                        return decode_measurements_with_spot_prices(response.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+                    except (TypeError, KeyError, ValueError) as e:
+                        raise InvalidApiResponseException(f"Unexpected response from {response.url}: {e}") from e
+            return self._parse_api_response(response, MeasurementsWithSpotPriceResponse)
 
-    @cachedmethod(lambda self: self._cache)
     def get_spot_prices_from_chart_data(self, target_date: date) -> SpotPriceChartResponse:
         """Get electricity spot prices from chart data API for a single day. Returns data in 15-minute intervals.
+        Prices of past days are cached until evicted, and prices of today and later are revalidated regularly.
 
         Args:
             target_date: The target date to get spot prices for
@@ -189,32 +522,99 @@ class HelenApiClient:
         Returns:
             SpotPriceChartResponse object containing the full data structure.
         """
+        return self._get_with_cache_policy(
+            self._spot_price_cache,
+            target_date,
+            target_date,
+            lambda: self._fetch_spot_prices_from_chart_data(target_date),
+        )
+
+    def get_spot_price_index(self, start_date: date, end_date: date = None) -> SpotPriceIndex:
+        """Get the spot prices of a day or of the days between the given dates indexed by time, e.g. for
+        looking up the price at a moment with `price_at`. The index of each day is built once per fetched
+        response, so repeated lookups do not parse timestamps again.
+
+        Args:
+            start_date: The first day
+            end_date: The last day (default: the first day)
+        """
+        end_date = start_date if end_date is None else end_date
+        return SpotPriceIndex.concat(self._get_spot_price_indexes_of_days(list(iter_dates(start_date, end_date))))
+
+    def get_price_percentile_index(self, start_date: date, end_date: date, vat: bool = True) -> PricePercentileIndex:
+        """Get the order statistics of the spot prices between the given dates, e.g. for asking whether a
+        price is among the cheapest 20% or what the median price is. Keep the returned index and add new days
+        to it with `add_day(day, client.get_spot_price_index(day))` instead of building it again.
+
+        Args:
+            start_date: The first day
+            end_date: The last day
+            vat: Use the prices with VAT (default: True)
+        """
+        days = list(iter_dates(start_date, end_date))
+        percentile_index = PricePercentileIndex(vat)
+        for day, day_index in zip(days, self._get_spot_price_indexes_of_days(days)):
+            percentile_index.add_day(day, day_index)
+        return percentile_index
+
+    def _get_spot_price_indexes_of_days(self, days: list[date]) -> list[SpotPriceIndex]:
+        """Get the spot price index of each day, fetching days that are not cached concurrently."""
+        if len(days) <= 1 or self._max_fetch_workers <= 1:
+            return [self._get_spot_price_index_of_day(day) for day in days]
+        with ThreadPoolExecutor(max_workers=min(self._max_fetch_workers, len(days))) as executor:
+            return list(executor.map(self._get_spot_price_index_of_day, days))
+
+    def _get_spot_price_index_of_day(self, target_date: date) -> SpotPriceIndex:
+        response = self.get_spot_prices_from_chart_data(target_date)
+        with self._spot_price_indexes_lock:
+            cached = self._spot_price_indexes.get(target_date)
+        if cached is not None and cached[0] is response:
+            self._metrics.record_cache("spot_price_indexes", CACHE_HIT)
+            return cached[1]
+        self._metrics.record_cache("spot_price_indexes", CACHE_MISS)
+        index = SpotPriceIndex.from_chart_response(response)
+        with self._spot_price_indexes_lock:
+            is_evicting = (
+                target_date not in self._spot_price_indexes
+                and len(self._spot_price_indexes) >= self._spot_price_indexes.maxsize
+            )
+            self._spot_price_indexes[target_date] = (response, index)
+        if is_evicting:
+            self._metrics.record_cache("spot_price_indexes", CACHE_EVICTION)
+        return index
+
+    @single_flight(lambda self: self._single_flight)
+    def _fetch_spot_prices_from_chart_data(self, target_date: date) -> SpotPriceChartResponse:
         start_time, end_time = self._get_utc_time_range(target_date, target_date)
 
         chart_params = {"start": start_time, "stop": end_time}
 
         chart_url = self.HELEN_API_URL_V25 + self.SPOT_PRICES_CHART_ENDPOINT
-        response = requests.get(
+        response = self._transport.get(
             chart_url,
             params=chart_params,
             headers=self._api_request_headers(),
             timeout=HTTP_READ_TIMEOUT,
         )
 
-        return SpotPriceChartResponse(**response.json())
+        return self._parse_api_response(response, SpotPriceChartResponse)
 
-    @cachedmethod(lambda self: self._cache)
+    @cachedmethod(lambda self: self._cache, lock=lambda self: self._cache_lock)
+    @single_flight(lambda self: self._single_flight)
     def get_contract_data_json(self):
         """Get your contract data."""
 
         contract_url = self.HELEN_API_URL_V25 + self.CONTRACT_ENDPOINT
         contract_params = {"include_transfer": "true", "update": "true", "include_products": "true"}
-        contract_response_dict = requests.get(
+        contract_response = self._transport.get(
             contract_url,
             headers=self._api_request_headers(),
             timeout=HTTP_READ_TIMEOUT,
             params=contract_params,
-        ).json()
+        )
+        contract_response_dict = self._read_api_response(contract_response)
+        if "contracts" not in contract_response_dict:
+            raise InvalidApiResponseException(f"Unexpected response from {contract_response.url}: no contracts")
         contracts_dict = contract_response_dict["contracts"]
 
         return contracts_dict
@@ -223,122 +623,76 @@ class HelenApiClient:
         """Get all delivery site ids from your contracts."""
 
         self._refresh_api_client_state()
-        delivery_sites = list(map(lambda contract: str(contract["delivery_site"]["id"]), self._all_active_contracts))
-        return delivery_sites
+        return self._contract_index.delivery_site_ids
 
     def get_all_gsrn_ids(self) -> list[int]:
         """Get all GSRN ids from your contracts."""
 
         self._refresh_api_client_state()
-        gsrn_ids = list(map(lambda contract: str(contract["gsrn"]), self._all_active_contracts))
-        return gsrn_ids
+        return self._contract_index.gsrn_ids
 
     def select_delivery_site_if_valid_id(self, delivery_site_id: str = None):
         """Select a delivery site to be used when querying data."""
-        delivery_sites = self.get_all_delivery_site_ids()
-        gsrn_ids = self.get_all_gsrn_ids()
-        found_delivery_site_id = next(filter(lambda id: str(id) == delivery_site_id, delivery_sites), None)
-        if not found_delivery_site_id:
-            found_delivery_site_id = next(filter(lambda id: str(id) == delivery_site_id, gsrn_ids), None)
-        if not found_delivery_site_id:
-            raise InvalidDeliverySiteException(
-                f"Cannot select {delivery_site_id} because it does not exist in the active delivery sites list {delivery_sites} or GSRN id list {gsrn_ids}"
-            )
-        self._selected_delivery_site_id = str(found_delivery_site_id)
-        self._refresh_api_client_state()
-        self._invalidate_caches()
+        with self._state_lock:
+            self._refresh_api_client_state()
+            contract_index = self._contract_index
+            if contract_index.find(delivery_site_id) is None:
+                raise InvalidDeliverySiteException(
+                    f"Cannot select {delivery_site_id} because it does not exist in the active delivery sites list "
+                    f"{contract_index.delivery_site_ids} or GSRN id list {contract_index.gsrn_ids}"
+                )
+            self._selected_delivery_site_id = str(delivery_site_id)
+            self._refresh_api_client_state()
         logging.warning("Delivery site set to '%s'", delivery_site_id)
 
-    def get_contract_base_price(self) -> float:
+    def get_contract_base_price(self, gsrn: str = None) -> float:
         """Get the contract base price from your contract data."""
 
-        self._refresh_api_client_state()
-        contract = self._selected_contract
-        if not contract:
-            raise InvalidApiResponseException("Contract data is empty or None")
-        products = contract["products"] if contract else []
-        product = next(filter(lambda p: p["product_type"] == "energy", products), None)
-        if not product:
-            logging.warning("Could not resolve contract base price from Helen API response. Returning 0.0")
-            return 0.0
-        components = product["components"] if product else []
-        base_price_component = next(filter(lambda component: component["is_base_price"], components), None)
+        base_price_component = self._get_contract_products(gsrn).energy_base_price_component
         if not base_price_component:
             logging.warning("Could not resolve contract base price from Helen API response. Returning 0.0")
             return 0.0
         return base_price_component["price"]
 
-    def get_contract_type(self) -> str:
+    def get_contract_type(self, gsrn: str = None) -> str:
         """Get the contract type as a string from your contract data."""
 
-        self._refresh_api_client_state()
-        contract = self._selected_contract
-        if not contract:
-            raise InvalidApiResponseException("Contract data is empty or None")
-        products = contract["products"] if contract else []
-        product = next(filter(lambda p: p["product_type"] == "energy", products), None)
+        product = self._get_contract_products(gsrn).energy_product
         if not product:
             logging.warning("Could not resolve contract type from Helen API response. Returning None")
             return None
         return product["id"]
 
-    def get_contract_energy_unit_price(self) -> float:
+    def get_contract_start_date(self, gsrn: str = None) -> date:
+        """Get the date when your contract started."""
+
+        return date.fromisoformat(self._get_contract(gsrn)["start_date"][:10])
+
+    def get_contract_energy_unit_price(self, gsrn: str = None) -> float:
         """
         Get the fixed unit price for electricity from your contract data. Returns '0.0' for spot electricity contracts
         because the price is not fixed in your contract when using spot.
         """
 
-        self._refresh_api_client_state()
-        contract = self._selected_contract
-        if not contract:
-            raise InvalidApiResponseException("Contract data is empty or None")
-        products = contract["products"] if contract else []
-        product = next(filter(lambda p: p["product_type"] == "energy", products), None)
-        if not product:
-            logging.warning("Could not resolve energy price from Helen API response. Returning 0.0")
-            return 0.0
-        if not product:
-            raise InvalidApiResponseException("Product data is empty or None")
-        components = product["components"] if product else []
-        energy_unit_price_component = next(filter(lambda component: component["name"] == "Energia", components), None)
+        energy_unit_price_component = self._get_contract_products(gsrn).energy_components.get("Energia")
         if not energy_unit_price_component:
             logging.warning("Could not resolve energy price from Helen API response. Returning 0.0")
             return 0.0
         return energy_unit_price_component["price"]
 
-    def get_transfer_fee(self) -> float:
+    def get_transfer_fee(self, gsrn: str = None) -> float:
         """Get the transfer fee price (c/kWh) from your contract data. Returns '0.0' if Helen is not your transfer company"""
 
-        self._refresh_api_client_state()
-        contract = self._selected_contract
-        if not contract:
-            raise InvalidApiResponseException("Contract data is empty or None")
-        products = contract["products"] if contract else []
-        product = next(filter(lambda p: p["product_type"] == "transfer", products), None)
-        if not product:
-            logging.warning("Could not resolve transfer fees from Helen API response. Returning 0.0")
-            return 0.0
-        components = product["components"] if product else []
-        transfer_fee_component = next(filter(lambda component: component["name"] == "Siirtomaksu", components), None)
+        transfer_fee_component = self._get_contract_products(gsrn).transfer_components.get("Siirtomaksu")
         if transfer_fee_component is None:
             logging.warning("Could not resolve transfer fees from Helen API response. Returning 0.0")
             return 0.0
         return transfer_fee_component["price"]
 
-    def get_transfer_base_price(self) -> float:
+    def get_transfer_base_price(self, gsrn: str = None) -> float:
         """Get the transfer base price (eur) from your contract data. Returns '0.0' if Helen is not your transfer company"""
 
-        self._refresh_api_client_state()
-        contract = self._selected_contract
-        if not contract:
-            raise InvalidApiResponseException("Contract data is empty or None")
-        products = contract["products"] if contract else []
-        product = next(filter(lambda p: p["product_type"] == "transfer", products), None)
-        if not product:
-            logging.warning("Could not resolve transfer base price from Helen API response. Returning 0.0")
-            return 0.0
-        components = product["components"] if product else []
-        transfer_base_price_component = next(filter(lambda component: component["is_base_price"], components), None)
+        transfer_base_price_component = self._get_contract_products(gsrn).transfer_base_price_component
         if transfer_base_price_component is None:
             logging.warning("Could not resolve transfer base price from Helen API response. Returning 0.0")
             return 0.0
@@ -348,19 +702,115 @@ class HelenApiClient:
         return self._session.get_access_token()
 
     def _refresh_api_client_state(self):
+        """Refresh the contract index and the selected contract. The index is an immutable snapshot that is
+        replaced as a whole, so concurrent readers always see either the old or the new contracts."""
         contracts = self.get_contract_data_json()
-        self._all_active_contracts = self._get_all_active_contracts(contracts)
+        with self._state_lock:
+            # The contract list is cached, so the index is only rebuilt when the list has been fetched again
+            if self._contract_index is None or contracts is not self._indexed_contracts:
+                self._contract_index = ContractIndex(contracts)
+                self._indexed_contracts = contracts
+            self._all_active_contracts = self._contract_index.active_contracts
+
+            if self._selected_delivery_site_id is None:
+                latest_active_contract = self._contract_index.latest_contract
+                self._selected_contract = latest_active_contract
+                self._selected_delivery_site_id = latest_active_contract["gsrn"]
+            else:
+                selected_active_contract = self._contract_index.find(self._selected_delivery_site_id)
+                if selected_active_contract is None:
+                    logging.error("No active contracts found")
+                self._selected_contract = selected_active_contract
+
+    def _find_active_contract(self, site_id: str, contract_index: ContractIndex = None) -> dict:
+        """Find the active contract of a GSRN or delivery site id from the latest contract index."""
+        contract_index = self._contract_index if contract_index is None else contract_index
+        contract = contract_index.find(site_id)
+        if contract is None:
+            raise InvalidDeliverySiteException(
+                f"{site_id} does not exist in the active delivery sites list {contract_index.delivery_site_ids} "
+                f"or GSRN id list {contract_index.gsrn_ids}"
+            )
+        return contract
 
-        if self._selected_delivery_site_id is None:
-            latest_active_contract = self._get_latest_contract(self._all_active_contracts)
-            self._selected_contract = latest_active_contract
-            self._selected_delivery_site_id = latest_active_contract["gsrn"]
+    def _get_contract(self, gsrn: str = None) -> dict:
+        """Get the active contract of a GSRN or delivery site id, or the selected contract if no id is given."""
+        if gsrn is None:
+            contract = self._selected_contract
         else:
-            selected_active_contract = self._get_contract_by_delivery_site_id(self._all_active_contracts)
-            self._selected_contract = selected_active_contract
+            self._refresh_api_client_state()
+            contract = self._find_active_contract(gsrn)
+        if not contract:
+            raise InvalidApiResponseException("Contract data is empty or None")
+        return contract
 
-    def _invalidate_caches(self):
-        self._cache.clear()
+    def _get_contract_products(self, gsrn: str = None) -> ContractProducts:
+        self._refresh_api_client_state()
+        with self._state_lock:
+            contract_index = self._contract_index
+            contract = self._selected_contract if gsrn is None else self._find_active_contract(gsrn, contract_index)
+        if not contract:
+            raise InvalidApiResponseException("Contract data is empty or None")
+        return contract_index.get_products(contract)
+
+    def _get_with_cache_policy(self, cache: PolicyCache, key, day: date, load):
+        """Get a value from a policy cache, or load it and cache it as data of the given day. A stale
+        value is returned at once and reloaded in the background."""
+        value, is_stale = cache.get(key)
+        if value is None:
+            return self._load_into_cache(cache, key, day, load)
+        if is_stale:
+            self._revalidate_in_background((id(cache), key), lambda: self._load_into_cache(cache, key, day, load))
+        return value
+
+    def _load_into_cache(self, cache: PolicyCache, key, day: date, load):
+        value = load()
+        cache.put(key, value, day)
+        return value
+
+    def _revalidate_in_background(self, key, revalidate):
+        """Run the revalidation on the background thread unless the same key is already being revalidated."""
+        with self._revalidating_keys_lock:
+            if key in self._revalidating_keys:
+                return
+            self._revalidating_keys.add(key)
+
+        def run():
+            try:
+                revalidate()
+            except Exception:
+                logging.warning("Revalidating cached data failed", exc_info=True)
+            finally:
+                with self._revalidating_keys_lock:
+                    self._revalidating_keys.discard(key)
+
+        try:
+            self._revalidation_executor.submit(run)
+        except RuntimeError:
+            # The client has been closed
+            with self._revalidating_keys_lock:
+                self._revalidating_keys.discard(key)
+
+    def _read_api_response(self, response: Response) -> dict:
+        """Read the JSON object of an API response. Error statuses raise requests' HTTPError and other
+        bodies raise InvalidApiResponseException, e.g. the HTML error page of a proxy."""
+        response.raise_for_status()
+        try:
+            body = response.json()
+        except ValueError as e:
+            raise InvalidApiResponseException(f"Response from {response.url} is not valid JSON: {e}") from e
+        if not isinstance(body, dict):
+            raise InvalidApiResponseException(f"Response from {response.url} is not a JSON object")
+        return body
+
+    def _parse_api_response(self, response: Response, response_class):
+        """Construct the response model from an API response. Bodies that do not match the model raise
+        InvalidApiResponseException."""
+        body = self._read_api_response(response)
+        try:
+            return response_class(**body)
+        except (TypeError, KeyError, ValueError) as e:
+            raise InvalidApiResponseException(f"Unexpected response from {response.url}: {e}") from e
 
     def _api_request_headers(self):
         return {
@@ -371,106 +821,10 @@ class HelenApiClient:
     def set_margin(self, margin: float):
         self._margin = margin
 
-    def _get_all_active_contracts(self, contracts):
-        """
-        Find all active contracts from a list of contracts.
-        A contract is considered active if:
-        - It has no end_date or end_date is in the future
-        - Its start_date is not in the future
-        - Its domain is not 'electricity-production'
-        """
-        now = datetime.now()
-
-        def is_active_contract(contract):
-            # Check if contract has started (start_date is not in future)
-            start_date = datetime.strptime(contract["start_date"], '%Y-%m-%dT%H:%M:%S')
-            if start_date > now:
-                return False
-
-            # Check if contract hasn't ended (end_date is None or in future)
-            end_date_str = contract.get("end_date")
-            if end_date_str is not None:
-                end_date = datetime.strptime(end_date_str, '%Y-%m-%dT%H:%M:%S')
-                if end_date < now:
-                    return False
-
-            # Check domain
-            return contract.get("domain") != "electricity-production"
-
-        return list(filter(is_active_contract, contracts))
-
-    def _get_contract_by_delivery_site_id(self, contracts):
-        """
-        Finds a contract from a list of contracts by delivery_site_id.
-        """
-        active_contracts = self._get_all_active_contracts(contracts)
-        if self._selected_delivery_site_id:
-            if len(str(self._selected_delivery_site_id)) == 18:
-                active_contracts = list(
-                    filter(
-                        lambda contract: contract["gsrn"] == str(self._selected_delivery_site_id),
-                        active_contracts,
-                    )
-                )
-            else:
-                active_contracts = list(
-                    filter(
-                        lambda contract: str(contract["delivery_site"]["id"]) == str(self._selected_delivery_site_id),
-                        active_contracts,
-                    )
-                )
-        if active_contracts.__len__() > 1:
-            logging.debug("Found multiple active Helen contracts. Using the newest one.")
-            active_contracts.sort(
-                key=lambda contract: datetime.strptime(contract["start_date"], '%Y-%m-%dT%H:%M:%S'),
-                reverse=True,
-            )
-        if active_contracts.__len__() == 0:
-            logging.error("No active contracts found")
-            return None
-        return active_contracts[0]
-
-    def _get_latest_contract(self, contracts):
-        """
-        Resolves the latest contract from a list of contracts.
-        """
-        if contracts.__len__() == 0:
-            logging.error("No contracts found")
-            return None
-        contracts.sort(
-            key=lambda contract: datetime.strptime(contract["start_date"], '%Y-%m-%dT%H:%M:%S'),
-            reverse=True,
-        )
-        return contracts[0]
-
     def _date_is_now_or_later(self, end_date_str):
         end_date = datetime.strptime(end_date_str, '%Y-%m-%dT%H:%M:%S')
         now = datetime.now()
         return end_date >= now
 
     def _get_utc_time_range(self, start_date: date, end_date: date) -> tuple[str, str]:
-        """
-        Convert a local date range to UTC midnight boundaries, matching the Oma Helen API.
-
-        The API uses midnight Helsinki time as interval boundaries. Because Helsinki is
-        UTC+2 (winter) or UTC+3 (summer), midnight of a given date in Helsinki maps to
-        21:00Z or 22:00Z of the *previous* UTC calendar day. Both start and stop use
-        this convention, producing a half-open interval [start_date, end_date+1).
-
-        Args:
-            start_date: First day of the range (inclusive)
-            end_date: Last day of the range (inclusive)
-
-        Returns:
-            tuple of (start_time, stop_time) as ISO 8601 strings with UTC offset.
-        """
-        fi_tz = ZoneInfo("Europe/Helsinki")
-        # Midnight of start_date in Helsinki (= 21:00Z or 22:00Z of the previous UTC day)
-        local_start = datetime.combine(start_date, datetime.min.time()).replace(tzinfo=fi_tz)
-        # Midnight of the day after end_date in Helsinki (exclusive upper bound)
-        local_end = datetime.combine(end_date + timedelta(days=1), datetime.min.time()).replace(tzinfo=fi_tz)
-
-        utc_start = local_start.astimezone(ZoneInfo("UTC"))
-        utc_end = local_end.astimezone(ZoneInfo("UTC"))
-
-        return (utc_start.isoformat(), utc_end.isoformat())
+        return get_utc_time_range(start_date, end_date)
@@ -1,3 +1,29 @@
+import math
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+from datetime import date, timedelta
+
+from .const import RESOLUTION_SECONDS
+from .utils import (
+    format_epoch_utc_timestamp,
+    get_local_date_of_epoch,
+    get_local_date_of_utc_timestamp,
+    get_local_day_bounds,
+    iter_dates,
+    parse_utc_timestamp,
+    parse_utc_timestamp_to_epoch,
+)
+
+MEASUREMENT_VALUE_FIELDS = (
+    "electricity",
+    "electricity_spot_prices_vat",
+    "electricity_spot_prices",
+    "ambient_temperature",
+    "ambient_humidity",
+)
+
+
 class SpotPriceChartSeries:
     def __init__(
         self,
@@ -65,7 +91,40 @@ class MeasurementsWithSpotPriceSeries:
         self.ambient_humidity = ambient_humidity
 
 
+class MeasurementsWithSpotPriceSeriesView(Sequence):
+    """Read-only list-like view over the rows of a MeasurementsWithSpotPriceResponse.
+
+    Rows are created on access, so changes made to a row are not reflected in the response.
+    """
+
+    def __init__(self, response: "MeasurementsWithSpotPriceResponse"):
+        self._response = response
+
+    def __len__(self):
+        return len(self._response.starts)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._response.get_row(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("series index out of range")
+        return self._response.get_row(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self._response.get_row(index)
+
+
 class MeasurementsWithSpotPriceResponse:
+    """Measurements with spot prices stored column by column.
+
+    Timestamps are stored as epoch seconds in `starts` and `stops`, and each value of
+    MEASUREMENT_VALUE_FIELDS in its own float array where NaN marks a missing value. The
+    `series` attribute offers a per-row view of the same data.
+    """
+
     def __init__(
         self,
         start: str,
@@ -86,5 +145,175 @@ class MeasurementsWithSpotPriceResponse:
         self.ids = ids
         self.data_start_times = data_start_times
         self.data_stop_times = data_stop_times
-        self.series = list(map(lambda s: MeasurementsWithSpotPriceSeries(**s), series))
         self.missing_series = missing_series if missing_series is not None else []
+        self._init_columns()
+        self.extend_entries(series)
+
+    def _init_columns(self):
+        self.starts = array("q")
+        self.stops = array("q")
+        self.columns = {field: array("d") for field in MEASUREMENT_VALUE_FIELDS}
+        self._previous_stop = None
+
+    @property
+    def series(self) -> MeasurementsWithSpotPriceSeriesView:
+        return MeasurementsWithSpotPriceSeriesView(self)
+
+    @series.setter
+    def series(self, series: list):
+        self._init_columns()
+        self.extend_entries([entry if isinstance(entry, dict) else entry.__dict__ for entry in series])
+
+    def extend_entries(self, entries: list):
+        """Append series entries as returned by the API, one column at a time."""
+        for entry in entries:
+            self._append_timestamps(entry["start"], entry["stop"])
+        for field, column in self.columns.items():
+            column.extend([math.nan if entry.get(field) is None else entry[field] for entry in entries])
+
+    def append_entry(self, entry: dict):
+        """Append a single series entry as returned by the API."""
+        self._append_timestamps(entry["start"], entry["stop"])
+        for field, column in self.columns.items():
+            value = entry.get(field)
+            column.append(math.nan if value is None else value)
+
+    def _append_timestamps(self, start: str, stop: str):
+        # Consecutive entries share the boundary timestamp, so most start times need no parsing
+        if self._previous_stop is not None and start == self._previous_stop[0]:
+            self.starts.append(self._previous_stop[1])
+        else:
+            self.starts.append(parse_utc_timestamp_to_epoch(start))
+        stop_epoch = parse_utc_timestamp_to_epoch(stop)
+        self.stops.append(stop_epoch)
+        self._previous_stop = (stop, stop_epoch)
+
+    def get_row(self, index: int) -> MeasurementsWithSpotPriceSeries:
+        values = {}
+        for field, column in self.columns.items():
+            value = column[index]
+            values[field] = None if math.isnan(value) else value
+        return MeasurementsWithSpotPriceSeries(
+            format_epoch_utc_timestamp(self.starts[index]), format_epoch_utc_timestamp(self.stops[index]), **values
+        )
+
+    def to_dict(self) -> dict:
+        """Convert the response back into the JSON structure returned by the API."""
+        return {
+            "start": self.start,
+            "stop": self.stop,
+            "resolution": self.resolution,
+            "units": self.units,
+            "ids": self.ids,
+            "data_start_times": self.data_start_times,
+            "data_stop_times": self.data_stop_times,
+            "series": [entry.__dict__ for entry in self.series],
+            "missing_series": self.missing_series,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MeasurementsWithSpotPriceResponse":
+        return cls(**data)
+
+    def split_by_local_day(self) -> dict[date, "MeasurementsWithSpotPriceResponse"]:
+        """Split the response into one response per Helsinki calendar day.
+
+        Every day covered by the response gets an entry, even if it has no series entries.
+        Only meaningful for the 'quarter', 'hour' and 'day' resolutions.
+        """
+        first_day = get_local_date_of_utc_timestamp(self.start)
+        last_day = get_local_date_of_utc_timestamp(self.stop)
+        if last_day > first_day:
+            # The stop time is exclusive, so a stop at local midnight does not cover that day
+            day_start, _ = get_local_day_bounds(last_day)
+            if parse_utc_timestamp(self.stop) == day_start:
+                last_day -= timedelta(days=1)
+        if self.starts:
+            first_day = min(first_day, get_local_date_of_epoch(self.starts[0]))
+            last_day = max(last_day, get_local_date_of_epoch(self.starts[-1]))
+
+        days = {}
+        for day in iter_dates(first_day, last_day):
+            day_start, day_stop = get_local_day_bounds(day)
+            day_start_epoch = int(day_start.timestamp())
+            day_stop_epoch = int(day_stop.timestamp())
+            first_index = bisect_left(self.starts, day_start_epoch)
+            last_index = bisect_left(self.starts, day_stop_epoch)
+            days[day] = self._slice(
+                format_epoch_utc_timestamp(day_start_epoch),
+                format_epoch_utc_timestamp(day_stop_epoch),
+                first_index,
+                last_index,
+            )
+        return days
+
+    def is_complete(self) -> bool:
+        """Whether the series covers the whole time range of the response without gaps at its resolution
+        and every entry has a consumption, i.e. no data of the range is missing yet."""
+        if not self.starts or self.start is None or self.stop is None:
+            return False
+        if self.starts[0] != parse_utc_timestamp_to_epoch(self.start):
+            return False
+        if self.stops[-1] != parse_utc_timestamp_to_epoch(self.stop):
+            return False
+        entry_seconds = RESOLUTION_SECONDS.get(self.resolution)
+        previous_stop = self.starts[0]
+        for start, stop in zip(self.starts, self.stops):
+            if start != previous_stop or (entry_seconds is not None and stop - start != entry_seconds):
+                return False
+            previous_stop = stop
+        return not any(math.isnan(value) for value in self.columns["electricity"])
+
+    @classmethod
+    def concat(
+        cls, responses: list["MeasurementsWithSpotPriceResponse"], start: str, stop: str, resolution: str
+    ) -> "MeasurementsWithSpotPriceResponse":
+        """Combine responses of consecutive time ranges into one response covering the given range."""
+        combined = cls(start, stop, resolution, {}, {}, {}, {}, [])
+        for response in responses:
+            combined.units.update(response.units)
+            combined.ids.update(response.ids)
+            combined.starts.extend(response.starts)
+            combined.stops.extend(response.stops)
+            for field, column in combined.columns.items():
+                column.extend(response.columns[field])
+        combined.data_start_times, combined.data_stop_times = combined._get_data_times()
+        return combined
+
+    @classmethod
+    def from_columns(
+        cls, start: str, stop: str, resolution: str, units: dict, ids: dict, starts: array, stops: array, columns: dict
+    ) -> "MeasurementsWithSpotPriceResponse":
+        """Create a response from epoch timestamp columns and value columns of MEASUREMENT_VALUE_FIELDS."""
+        response = cls(start, stop, resolution, units, ids, {}, {}, [])
+        response.starts = starts
+        response.stops = stops
+        response.columns = {
+            field: columns.get(field, array("d", [math.nan]) * len(starts)) for field in response.columns
+        }
+        response.data_start_times, response.data_stop_times = response._get_data_times()
+        return response
+
+    def _slice(self, start: str, stop: str, first_index: int, last_index: int) -> "MeasurementsWithSpotPriceResponse":
+        response = MeasurementsWithSpotPriceResponse(start, stop, self.resolution, self.units, self.ids, {}, {}, [])
+        response.starts = self.starts[first_index:last_index]
+        response.stops = self.stops[first_index:last_index]
+        response.columns = {field: column[first_index:last_index] for field, column in self.columns.items()}
+        response.data_start_times, response.data_stop_times = response._get_data_times()
+        return response
+
+    def _get_data_times(self) -> tuple[dict, dict]:
+        """Resolve the first and last timestamp that has data for each unit in the series."""
+        data_start_times = {}
+        data_stop_times = {}
+        for key in self.units:
+            column = self.columns.get(key)
+            if column is None:
+                continue
+            first_index = next((index for index, value in enumerate(column) if not math.isnan(value)), None)
+            if first_index is None:
+                continue
+            last_index = next(index for index in reversed(range(len(column))) if not math.isnan(column[index]))
+            data_start_times[key] = format_epoch_utc_timestamp(self.starts[first_index])
+            data_stop_times[key] = format_epoch_utc_timestamp(self.stops[last_index])
+        return data_start_times, data_stop_times
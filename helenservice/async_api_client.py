@@ -0,0 +1,205 @@
+import asyncio
+from collections.abc import AsyncIterator
+from concurrent.futures import Executor
+from datetime import date
+from functools import partial
+
+from .api_client import HelenApiClient
+from .api_response import MeasurementsWithSpotPriceResponse, SpotPriceChartResponse
+from .async_helen_session import AsyncHelenSession
+from .calculations import UsageCostSummary
+from .const import RESOLUTION_HOUR
+from .measurement_store import MeasurementStore
+from .price_percentiles import PricePercentileIndex
+from .spot_price_index import SpotPriceIndex
+
+
+class AsyncHelenApiClient:
+    """Asyncio counterpart of HelenApiClient.
+
+    Requests are run in an executor so that they do not block the event loop, and any number of
+    calls can be awaited concurrently, e.g. with `asyncio.gather`. The responses, caches and
+    calculations are shared with HelenApiClient. Pass an executor to bound the number of
+    concurrent requests; by default the event loop's default executor is used.
+    """
+
+    def __init__(
+        self,
+        tax: float = None,
+        margin: float = None,
+        measurement_store: MeasurementStore = None,
+        executor: Executor = None,
+        **client_kwargs,
+    ):
+        """
+        Args:
+            tax: The tax to add to spot prices (default: 0.255)
+            margin: The margin (c/kWh) to add to spot prices (default: 0.38)
+            measurement_store: Optional persistent store for measurements
+            executor: Executor to run the requests in (default: the event loop's default executor)
+            client_kwargs: Other keyword arguments of HelenApiClient, e.g. `transport`, `cache_policy`,
+                `stream_responses`, `max_fetch_workers`, `roll_up_resolutions` or `metrics`
+        """
+        self._client = HelenApiClient(tax, margin, measurement_store, **client_kwargs)
+        self._executor = executor
+        self._session: AsyncHelenSession = None
+
+    async def _run(self, function, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(function, *args))
+
+    async def login_and_init(self, username, password, session_file: str = None):
+        """Login to Oma Helen. Creates a new session when called, unless a still valid session
+        can be restored from the given session file."""
+        self._session = await AsyncHelenSession(self._executor).login(username, password, session_file)
+        await self._run(self._client.init_with_session, self._session.helen_session)
+        return self
+
+    def is_session_valid(self):
+        return self._client.is_session_valid()
+
+    async def close(self):
+        """Close down the session and stop the background revalidation of the underlying client"""
+        if self._session is not None:
+            await self._session.close()
+        await self._run(self._client.close)
+
+    def set_margin(self, margin: float):
+        self._client.set_margin(margin)
+
+    def get_api_access_token(self):
+        return self._client.get_api_access_token()
+
+    @property
+    def sync_client(self) -> HelenApiClient:
+        """The underlying HelenApiClient, e.g. for using it from worker threads"""
+        return self._client
+
+    async def get_contract_data_json(self):
+        """Get your contract data."""
+        return await self._run(self._client.get_contract_data_json)
+
+    async def get_all_delivery_site_ids(self) -> list[int]:
+        """Get all delivery site ids from your contracts."""
+        return await self._run(self._client.get_all_delivery_site_ids)
+
+    async def get_all_gsrn_ids(self) -> list[int]:
+        """Get all GSRN ids from your contracts."""
+        return await self._run(self._client.get_all_gsrn_ids)
+
+    async def select_delivery_site_if_valid_id(self, delivery_site_id: str = None):
+        """Select a delivery site to be used when querying data."""
+        await self._run(self._client.select_delivery_site_if_valid_id, delivery_site_id)
+
+    async def get_contract_base_price(self, gsrn: str = None) -> float:
+        """Get the contract base price from your contract data."""
+        return await self._run(self._client.get_contract_base_price, gsrn)
+
+    async def get_contract_type(self, gsrn: str = None) -> str:
+        """Get the contract type as a string from your contract data."""
+        return await self._run(self._client.get_contract_type, gsrn)
+
+    async def get_contract_energy_unit_price(self, gsrn: str = None) -> float:
+        """Get the fixed unit price for electricity from your contract data."""
+        return await self._run(self._client.get_contract_energy_unit_price, gsrn)
+
+    async def get_transfer_fee(self, gsrn: str = None) -> float:
+        """Get the transfer fee price (c/kWh) from your contract data."""
+        return await self._run(self._client.get_transfer_fee, gsrn)
+
+    async def get_transfer_base_price(self, gsrn: str = None) -> float:
+        """Get the transfer base price (eur) from your contract data."""
+        return await self._run(self._client.get_transfer_base_price, gsrn)
+
+    async def get_measurements_with_spot_prices(
+        self, start: date, end: date, resolution: str = RESOLUTION_HOUR, gsrn: str = None
+    ) -> MeasurementsWithSpotPriceResponse:
+        """Get electricity measurements with spot prices for the selected delivery site between given dates."""
+        return await self._run(self._client.get_measurements_with_spot_prices, start, end, resolution, gsrn)
+
+    async def iter_measurements_with_spot_prices(
+        self, start: date, end: date, resolution: str = RESOLUTION_HOUR, gsrn: str = None
+    ) -> AsyncIterator[MeasurementsWithSpotPriceResponse]:
+        """Get electricity measurements with spot prices between given dates one chunk at a time."""
+        responses = self._client.iter_measurements_with_spot_prices(start, end, resolution, gsrn)
+        while True:
+            response = await self._run(next, responses, None)
+            if response is None:
+                return
+            yield response
+
+    async def get_measurements_with_spot_prices_for_sites(
+        self, start: date, end: date, site_ids: list[str] = None, resolution: str = RESOLUTION_HOUR
+    ) -> dict[str, MeasurementsWithSpotPriceResponse]:
+        """Get electricity measurements with spot prices of several delivery sites concurrently."""
+        return await self._run(
+            self._client.get_measurements_with_spot_prices_for_sites, start, end, site_ids, resolution
+        )
+
+    async def get_measurements_between_dates(
+        self, start: date, end: date, resolution: str = RESOLUTION_HOUR, gsrn: str = None
+    ) -> MeasurementsWithSpotPriceResponse:
+        """Get electricity measurements for each hour or quarter between given dates."""
+        return await self._run(self._client.get_measurements_between_dates, start, end, resolution, gsrn)
+
+    async def get_daily_measurements_between_dates(
+        self, start: date, end: date, gsrn: str = None
+    ) -> MeasurementsWithSpotPriceResponse:
+        """Get electricity measurements for each day between the given dates."""
+        return await self._run(self._client.get_daily_measurements_between_dates, start, end, gsrn)
+
+    async def get_monthly_measurements_by_year(self, year: int, gsrn: str = None) -> MeasurementsWithSpotPriceResponse:
+        """Get electricity measurements for each month of the selected year."""
+        return await self._run(self._client.get_monthly_measurements_by_year, year, gsrn)
+
+    async def get_spot_prices_from_chart_data(self, target_date: date) -> SpotPriceChartResponse:
+        """Get electricity spot prices from chart data API for a single day. Returns data in 15-minute intervals."""
+        return await self._run(self._client.get_spot_prices_from_chart_data, target_date)
+
+    async def get_spot_price_index(self, start_date: date, end_date: date = None) -> SpotPriceIndex:
+        """Get the spot prices of a day or of the days between the given dates indexed by time."""
+        return await self._run(self._client.get_spot_price_index, start_date, end_date)
+
+    async def get_price_percentile_index(
+        self, start_date: date, end_date: date, vat: bool = True
+    ) -> PricePercentileIndex:
+        """Get the order statistics of the spot prices between the given dates."""
+        return await self._run(self._client.get_price_percentile_index, start_date, end_date, vat)
+
+    async def get_total_consumption_between_dates(self, start_date: date, end_date: date, gsrn: str = None) -> float:
+        return await self._run(self._client.get_total_consumption_between_dates, start_date, end_date, gsrn)
+
+    async def calculate_transfer_fees_between_dates(self, start_date: date, end_date: date, gsrn: str = None) -> float:
+        """Calculate your total transfer fee costs including the monthly base price. Returns the price in euros"""
+        return await self._run(self._client.calculate_transfer_fees_between_dates, start_date, end_date, gsrn)
+
+    async def calculate_total_costs_by_spot_prices_between_dates(
+        self, start_date: date, end_date: date, gsrn: str = None
+    ) -> float:
+        """Calculate your total electricity cost with according spot prices by hourly precision."""
+        return await self._run(
+            self._client.calculate_total_costs_by_spot_prices_between_dates, start_date, end_date, gsrn
+        )
+
+    async def calculate_impact_of_usage_between_dates(
+        self, start_date: date, end_date: date, gsrn: str = None
+    ) -> float:
+        """Calculate the price impact of your usage based on hourly consumption and hourly spot prices"""
+        return await self._run(self._client.calculate_impact_of_usage_between_dates, start_date, end_date, gsrn)
+
+    async def calculate_usage_cost_summary_between_dates(
+        self, start_date: date, end_date: date, resolution: str = RESOLUTION_HOUR, gsrn: str = None
+    ) -> UsageCostSummary:
+        """Calculate consumption, spot cost, average prices and the impact of usage between dates in one go."""
+        return await self._run(
+            self._client.calculate_usage_cost_summary_between_dates, start_date, end_date, resolution, gsrn
+        )
+
+    async def calculate_usage_cost_summaries_for_sites(
+        self, start_date: date, end_date: date, site_ids: list[str] = None, resolution: str = RESOLUTION_HOUR
+    ) -> dict[str, UsageCostSummary]:
+        """Calculate consumption, spot cost, average prices and the impact of usage of several delivery sites
+        concurrently."""
+        return await self._run(
+            self._client.calculate_usage_cost_summaries_for_sites, start_date, end_date, site_ids, resolution
+        )
@@ -0,0 +1,49 @@
+import asyncio
+from concurrent.futures import Executor
+from functools import partial
+
+from .helen_session import HelenSession
+
+
+class AsyncHelenSession:
+    """Asyncio counterpart of HelenSession.
+
+    The login chain is run in an executor so that it does not block the event loop.
+    """
+
+    def __init__(self, executor: Executor = None):
+        self._executor = executor
+        self._helen_session = HelenSession()
+
+    async def login(self, username, password, session_file: str = None):
+        """Login to Oma Helen web and follow redirects until the main page is reached.
+        If a session file is given, a still valid saved session is reused instead, see
+        `HelenSession.restore_or_login()`.
+
+        :param username: The username for Oma Helen web service.
+        :param password: The password for Oma Helen web service.
+        :param session_file: Optional path of a file to restore the session from and save it into.
+        :return: AsyncHelenSession.
+        :rtype: .AsyncHelenSession
+        """
+        loop = asyncio.get_running_loop()
+        self._helen_session = await loop.run_in_executor(
+            self._executor, partial(HelenSession.restore_or_login, username, password, session_file)
+        )
+        return self
+
+    def get_access_token(self):
+        """Get the access-token to use the Helen API. It is required to login before the
+        token can be accessed
+        """
+        return self._helen_session.get_access_token()
+
+    @property
+    def helen_session(self) -> HelenSession:
+        """The underlying logged in HelenSession"""
+        return self._helen_session
+
+    async def close(self):
+        """Close down the session for the Oma Helen web service"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, self._helen_session.close)
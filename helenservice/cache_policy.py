@@ -0,0 +1,122 @@
+import math
+import threading
+import time
+from datetime import date, timedelta
+
+from cachetools import LRUCache
+
+from .const import MEASUREMENTS_SETTLING_DAYS
+from .metrics import CACHE_EVICTION, CACHE_HIT, CACHE_MISS, CACHE_STALE_HIT, HelenMetrics
+from .utils import get_local_today
+
+# Data of days that do not change anymore
+DATA_IMMUTABLE = "immutable"
+# Data of yesterday, which may still be corrected
+DATA_SETTLING = "settling"
+# Data of today and later, which keeps changing
+DATA_LIVE = "live"
+
+
+class CachePolicy:
+    """Decides how long cached data stays valid based on how final the data of its day is.
+
+    Days before yesterday are immutable and never expire, yesterday is settling, and today and
+    later days are live. Live data that has expired can still be served for a while, while it is
+    revalidated in the background (stale-while-revalidate).
+    """
+
+    def __init__(self, settling_ttl: float = 3600, live_ttl: float = 300, live_stale_ttl: float = 3600):
+        """
+        Args:
+            settling_ttl: Seconds that data of yesterday is fresh (default: 3600)
+            live_ttl: Seconds that data of today and later days is fresh (default: 300)
+            live_stale_ttl: Seconds that expired live data can still be served while it is
+                revalidated, 0 disables stale-while-revalidate (default: 3600)
+        """
+        self.settling_ttl = settling_ttl
+        self.live_ttl = live_ttl
+        self.live_stale_ttl = live_stale_ttl
+
+    def classify_day(self, day: date, today: date = None) -> str:
+        """Classify the data of a Helsinki calendar day as immutable, settling or live."""
+        today = get_local_today() if today is None else today
+        if day < today - timedelta(days=MEASUREMENTS_SETTLING_DAYS - 1):
+            return DATA_IMMUTABLE
+        if day < today:
+            return DATA_SETTLING
+        return DATA_LIVE
+
+    def get_expiry(self, data_class: str, now: float) -> tuple[float, float]:
+        """Get the times until which data of the class is fresh and until which it can be served stale."""
+        if data_class == DATA_IMMUTABLE:
+            return math.inf, math.inf
+        if data_class == DATA_SETTLING:
+            fresh_until = now + self.settling_ttl
+            return fresh_until, fresh_until
+        fresh_until = now + self.live_ttl
+        return fresh_until, fresh_until + self.live_stale_ttl
+
+
+class PolicyCache:
+    """Thread-safe LRU cache whose entries expire according to a CachePolicy.
+
+    `get` returns expired live entries that are still within their stale-while-revalidate window
+    together with a flag telling that they should be revalidated. If metrics are given, the hits,
+    stale hits, misses and evictions are recorded under the name of the cache.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        cache_policy: CachePolicy = None,
+        timer=time.monotonic,
+        name: str = None,
+        metrics: HelenMetrics = None,
+    ):
+        self._cache = LRUCache(maxsize=maxsize)
+        self._cache_policy = CachePolicy() if cache_policy is None else cache_policy
+        self._timer = timer
+        self._lock = threading.Lock()
+        self._name = name
+        self._metrics = metrics
+
+    def get(self, key) -> tuple[object, bool]:
+        """Get a cached value and whether it is stale. Returns (None, False) if there is no usable value."""
+        now = self._timer()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                value, is_stale = None, False
+            else:
+                value, fresh_until, stale_until = entry
+                is_stale = now >= fresh_until
+                if now >= stale_until:
+                    del self._cache[key]
+                    value, is_stale = None, False
+        self._record(CACHE_MISS if value is None else CACHE_STALE_HIT if is_stale else CACHE_HIT)
+        return value, is_stale
+
+    def put(self, key, value, day: date, is_complete: bool = True):
+        """Cache a value of the given day with the expiry of the day's data class. Incomplete values of
+        immutable days, e.g. measurements that have not arrived yet, expire like settling data."""
+        data_class = self._cache_policy.classify_day(day)
+        if data_class == DATA_IMMUTABLE and not is_complete:
+            data_class = DATA_SETTLING
+        fresh_until, stale_until = self._cache_policy.get_expiry(data_class, self._timer())
+        with self._lock:
+            is_evicting = key not in self._cache and len(self._cache) >= self._cache.maxsize
+            self._cache[key] = (value, fresh_until, stale_until)
+        if is_evicting:
+            self._record(CACHE_EVICTION)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._cache)
+
+    def _record(self, event: str):
+        if self._metrics is not None:
+            self._metrics.record_cache(self._name, event)
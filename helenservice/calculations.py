@@ -0,0 +1,158 @@
+import math
+from array import array
+from collections.abc import Iterable
+from typing import Union
+
+from .api_response import MeasurementsWithSpotPriceResponse
+
+# Calculations accept a response or any iterable of series entries with `electricity` and
+# `electricity_spot_prices` attributes, so they can run on already-fetched data
+Measurements = Union[MeasurementsWithSpotPriceResponse, Iterable]
+
+# NumPy is imported on the first calculation instead of with the package, as importing it is slow.
+# None if it is not installed.
+_NOT_IMPORTED = object()
+numpy = _NOT_IMPORTED
+
+
+def _import_numpy():
+    global numpy
+    if numpy is _NOT_IMPORTED:
+        try:
+            import numpy as imported_numpy
+        except ImportError:  # pragma: no cover - depends on the environment
+            imported_numpy = None
+        numpy = imported_numpy
+    return numpy
+
+
+class UsageCostSummary:
+    """Consumption and spot price costs of a measurement series.
+
+    Only entries that have both a consumption and a spot price are included.
+    """
+
+    def __init__(
+        self,
+        total_consumption: float,
+        total_spot_cost: float,
+        weighted_average_price: float,
+        average_price: float,
+        impact: float,
+        entry_count: int,
+    ):
+        # kWh
+        self.total_consumption = total_consumption
+        # eur, includes tax and margin
+        self.total_spot_cost = total_spot_cost
+        # c/kWh, includes tax
+        self.weighted_average_price = weighted_average_price
+        # c/kWh, includes tax
+        self.average_price = average_price
+        # c/kWh, see calculate_impact_of_usage
+        self.impact = impact
+        self.entry_count = entry_count
+
+
+def calculate_usage_cost_summary(measurements: Measurements, tax: float, margin: float) -> UsageCostSummary:
+    """Calculate consumption, spot cost, weighted and average price and the impact of usage in one pass.
+    The calculation is vectorized with NumPy when it is installed.
+
+    Args:
+        measurements: Measurements with spot prices, e.g. of hourly or quarterly resolution
+        tax: The tax to add to spot prices, e.g. 0.255
+        margin: The margin (c/kWh) to add to spot prices
+
+    Returns:
+        UsageCostSummary of the entries that have both a consumption and a spot price.
+    """
+    electricity, spot_prices = _get_consumption_and_price_columns(measurements)
+    if _import_numpy() is not None:
+        return _calculate_usage_cost_summary_vectorized(electricity, spot_prices, tax, margin)
+
+    tax_multiplier = 1 + tax
+    entry_count = 0
+    total_consumption = 0.0
+    total_cost = 0.0
+    total_weighted_price = 0.0
+    total_price = 0.0
+    for consumption, spot_price in zip(electricity, spot_prices):
+        if math.isnan(consumption) or math.isnan(spot_price):
+            continue
+        price_with_tax = spot_price * tax_multiplier
+        entry_count += 1
+        total_consumption += abs(consumption)
+        total_cost += abs((price_with_tax + margin) * consumption)
+        total_weighted_price += abs(price_with_tax * consumption)
+        total_price += abs(price_with_tax)
+
+    return _create_usage_cost_summary(entry_count, total_consumption, total_cost, total_weighted_price, total_price)
+
+
+def _calculate_usage_cost_summary_vectorized(electricity, spot_prices, tax: float, margin: float) -> UsageCostSummary:
+    consumptions = numpy.asarray(electricity, dtype=numpy.float64)
+    prices = numpy.asarray(spot_prices, dtype=numpy.float64)
+    valid = ~(numpy.isnan(consumptions) | numpy.isnan(prices))
+    consumptions = consumptions[valid]
+    prices_with_tax = prices[valid] * (1 + tax)
+
+    return _create_usage_cost_summary(
+        int(valid.sum()),
+        float(numpy.abs(consumptions).sum()),
+        float(numpy.abs((prices_with_tax + margin) * consumptions).sum()),
+        float(numpy.abs(prices_with_tax * consumptions).sum()),
+        float(numpy.abs(prices_with_tax).sum()),
+    )
+
+
+def _create_usage_cost_summary(
+    entry_count: int, total_consumption: float, total_cost: float, total_weighted_price: float, total_price: float
+) -> UsageCostSummary:
+    if entry_count == 0:
+        return UsageCostSummary(0.0, 0.0, 0.0, 0.0, 0.0, 0)
+    average_price = total_price / entry_count
+    if total_consumption == 0:
+        weighted_average_price = 0.0
+        impact = 0.0
+    else:
+        weighted_average_price = total_weighted_price / total_consumption
+        impact = (total_weighted_price - average_price * total_consumption) / total_consumption
+    return UsageCostSummary(
+        total_consumption, total_cost / 100, weighted_average_price, average_price, impact, entry_count
+    )
+
+
+def calculate_total_consumption(measurements: Measurements) -> float:
+    """Calculate the total consumption (kWh) of all entries that have a consumption."""
+    electricity, _ = _get_consumption_and_price_columns(measurements)
+    if _import_numpy() is not None:
+        return float(numpy.nansum(numpy.abs(numpy.asarray(electricity, dtype=numpy.float64))))
+    return sum(abs(consumption) for consumption in electricity if not math.isnan(consumption))
+
+
+def calculate_total_spot_cost(measurements: Measurements, tax: float, margin: float) -> float:
+    """Calculate the total cost (eur) of the consumption with spot prices including tax and margin."""
+    return calculate_usage_cost_summary(measurements, tax, margin).total_spot_cost
+
+
+def calculate_impact_of_usage(measurements: Measurements, tax: float) -> float:
+    """Calculate the price impact (c/kWh) of your usage.
+
+    According to Helen, the impact is calculated with formula (A-B) / E = c/kWh, where
+    A = the sum of consumption multiplied with the price of each entry (i.e. your weighted average price)
+    B = total consumption multiplied with the average price of the whole period
+    E = total consumption
+    """
+    return calculate_usage_cost_summary(measurements, tax, 0.0).impact
+
+
+def _get_consumption_and_price_columns(measurements) -> tuple:
+    """Get the consumption and spot price values as float columns where NaN marks a missing value."""
+    if isinstance(measurements, MeasurementsWithSpotPriceResponse):
+        return measurements.columns["electricity"], measurements.columns["electricity_spot_prices"]
+    electricity = array("d")
+    spot_prices = array("d")
+    for entry in measurements:
+        electricity.append(math.nan if entry.electricity is None else entry.electricity)
+        spot_prices.append(math.nan if entry.electricity_spot_prices is None else entry.electricity_spot_prices)
+    return electricity, spot_prices
@@ -1,5 +1,10 @@
+import argparse
 import json
+import logging
+import os
+import sys
 from cmd import Cmd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
 from getpass import getpass
 
@@ -7,34 +12,52 @@ from helenservice.api_exceptions import InvalidDeliverySiteException
 
 from .api_client import HelenApiClient
 from .const import RESOLUTION_HOUR, RESOLUTION_QUARTER
-from .price_client import HelenPriceClient
-from .utils import get_month_date_range_by_date
+from .helen_session import HelenSession
+from .measurement_writer import EXPORT_FORMATS, OUTPUT_CSV, OUTPUT_FORMATS, write_measurements
+from .metrics import get_default_metrics
+from .price_client import HelenExchangePrices, HelenPriceClient
+from .utils import get_month_date_range_by_date, json_serializer
 
-
-def _json_serializer(value):
-    if isinstance(value, datetime):
-        return value.strftime("%Y%m%d%H%M%S")
-    else:
-        return value.__dict__
+# The default output format of the measurement commands, indented JSON of the whole range
+OUTPUT_JSON = "json"
 
 
 class HelenCLIPrompt(Cmd):
     prompt = "helen-cli> "
     intro = "Type ? to list commands"
 
-    helen_price_client = HelenPriceClient()
-
     tax = 0.255  # 25.5%
-    margin = helen_price_client.get_exchange_prices().margin
-    api_client = HelenApiClient(tax, margin)
 
-    def __init__(self, username, password):
+    def __init__(self, session_file=None):
+        """Create the clients without any network access. The exchange margin is scraped from helen.fi
+        in the background, so it can run while the user logs in. Call `login()` before `cmdloop()`."""
         super().__init__()
-        self.api_client.login_and_init(username, password)
+        self._session_file = session_file
+        self.helen_price_client = HelenPriceClient()
+        self.api_client = HelenApiClient(self.tax)
+        self._background_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="helen-cli")
+        self._exchange_prices_future = self._background_executor.submit(self.helen_price_client.get_exchange_prices)
+
+    def login(self, username, password):
+        """Login to Oma Helen, or restore the session from the session file if it is still valid"""
+        self.api_client.login_and_init(username, password, self._session_file)
+        return self
+
+    def _get_exchange_prices(self) -> HelenExchangePrices:
+        """Wait for the background margin scrape and apply the margin to the api client. If the
+        background scrape failed, the prices are scraped again."""
+        try:
+            self._exchange_prices_future.result()
+        except Exception as e:
+            logging.warning("Background lookup of the exchange margin failed: %s", e)
+        exchange_prices = self.helen_price_client.get_exchange_prices()
+        self.api_client.set_margin(exchange_prices.margin)
+        return exchange_prices
 
     def do_exit(self, input=None):
         """Exit the CLI"""
 
+        self._background_executor.shutdown(wait=False, cancel_futures=True)
         self.api_client.close()
         print("Bye")
         return True
@@ -107,6 +130,7 @@ class HelenCLIPrompt(Cmd):
                 if start_date > end_date:
                     print("Start date must be before end date")
                     raise ValueError()
+                self._get_exchange_prices()
                 price = self.api_client.calculate_total_costs_by_spot_prices_between_dates(start_date, end_date)
                 print(price)
             except ValueError:
@@ -140,7 +164,7 @@ class HelenCLIPrompt(Cmd):
 
         year = date.today().year
         monthly_measurements = self.api_client.get_monthly_measurements_by_year(year)
-        monthly_measurements_json = json.dumps(monthly_measurements, default=lambda o: o.__dict__, indent=2)
+        monthly_measurements_json = json.dumps(monthly_measurements, default=json_serializer, indent=2)
         print(monthly_measurements_json)
 
     def do_get_daily_measurements_json(self, input=None):
@@ -151,30 +175,49 @@ class HelenCLIPrompt(Cmd):
         daily_measurements = self.api_client.get_daily_measurements_between_dates(
             previous_month_last_day_date, wanted_month_last_day_date
         )
-        daily_measurements_json = json.dumps(daily_measurements, default=lambda o: o.__dict__, indent=2)
+        daily_measurements_json = json.dumps(daily_measurements, default=json_serializer, indent=2)
         print(daily_measurements_json)
 
     def do_get_contract_data_json(self, input=None):
         """Get all your contracts as JSON (includes terminated contracts)"""
 
         contract_data_json = self.api_client.get_contract_data_json()
-        contract_data_json_pretty = json.dumps(contract_data_json, default=lambda o: o.__dict__, indent=2)
+        contract_data_json_pretty = json.dumps(contract_data_json, default=json_serializer, indent=2)
         print(contract_data_json_pretty)
 
     def do_get_market_prices_json(self, input=None):
         """Get prices for the Market Price contract type as JSON"""
 
         price = self.helen_price_client.get_market_price_prices()
-        price_json = json.dumps(price, default=_json_serializer, indent=2)
+        price_json = json.dumps(price, default=json_serializer, indent=2)
         print(price_json)
 
     def do_get_exchange_margin_price_json(self, input=None):
         """Get margin price for the Exchange Electricity contract type as JSON"""
 
-        price = self.helen_price_client.get_exchange_prices()
-        price_json = json.dumps(price, default=_json_serializer, indent=2)
+        price = self._get_exchange_prices()
+        price_json = json.dumps(price, default=json_serializer, indent=2)
         print(price_json)
 
+    def do_stats(self, input=None):
+        """Show the request counts, latencies and sizes of each endpoint and the hit rates of the caches
+        since the CLI was started. Use 'stats json' for all metrics as JSON or 'stats prometheus' for the
+        Prometheus text format.
+
+        Usage example:
+        stats
+        """
+        output_format = str(input or "").strip()
+        metrics = get_default_metrics()
+        if output_format == "json":
+            print(json.dumps(metrics.snapshot(), indent=2))
+        elif output_format == "prometheus":
+            print(metrics.to_prometheus(), end="")
+        elif output_format == "":
+            print(_format_metrics(metrics.snapshot()))
+        else:
+            print("Please provide no format, 'json' or 'prometheus'")
+
     def do_get_contract_base_price(self, input=None):
         """Helper to get the contract base price from your contract data. To see the whole contract data as JSON, use get_contract_data_json"""
 
@@ -247,7 +290,7 @@ class HelenCLIPrompt(Cmd):
             try:
                 target_date = datetime.strptime(str(input).strip(), '%Y-%m-%d').date()
                 spot_prices = self.api_client.get_spot_prices_from_chart_data(target_date)
-                spot_prices_json = json.dumps(spot_prices, default=lambda o: o.__dict__, indent=2)
+                spot_prices_json = json.dumps(spot_prices, default=json_serializer, indent=2)
                 print(spot_prices_json)
             except ValueError:
                 print("Please provide a valid date in format 'YYYY-mm-dd'")
@@ -255,59 +298,186 @@ class HelenCLIPrompt(Cmd):
     def do_get_hourly_measurements_with_spot_prices_json(self, input=None):
         """Get the measurements with spot prices for each hour between given dates
         The provided dates should be presented in format 'YYYY-mm-dd'
+        Optionally give the output format: json (default), compact, ndjson or csv. The compact, ndjson
+        and csv formats are printed month by month as the measurements arrive.
 
         Usage example:
         get_hourly_measurements_with_spot_prices_json 2025-09-01 2025-09-08
+        get_hourly_measurements_with_spot_prices_json 2025-01-01 2025-08-31 csv
         """
-        if input is None:
-            print("Please provide proper start and end dates in format 'YYYY-mm-dd'")
-        else:
-            try:
-                start_date_str, end_date_str = str(input).split(' ')
-                start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
-                end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
-                if start_date > end_date:
-                    print("Start date must be before end date")
-                    raise ValueError()
-                measurements_with_spot_prices = self.api_client.get_measurements_with_spot_prices(
-                    start_date, end_date, RESOLUTION_HOUR
-                )
-                measurements_json = json.dumps(measurements_with_spot_prices, default=lambda o: o.__dict__, indent=2)
-                print(measurements_json)
-            except ValueError:
-                print("Please provide proper start and end dates in format 'YYYY-mm-dd'")
+        self._print_measurements_with_spot_prices(input, RESOLUTION_HOUR)
 
     def do_get_quarterly_measurements_with_spot_prices_json(self, input=None):
         """Get the measurements with spot prices for each quarter between given dates
         The provided dates should be presented in format 'YYYY-mm-dd'
+        Optionally give the output format: json (default), compact, ndjson or csv. The compact, ndjson
+        and csv formats are printed month by month as the measurements arrive.
 
         Usage example:
         get_quarterly_measurements_with_spot_prices_json 2025-09-01 2025-09-08
+        get_quarterly_measurements_with_spot_prices_json 2025-01-01 2025-08-31 ndjson
         """
+        self._print_measurements_with_spot_prices(input, RESOLUTION_QUARTER)
+
+    def _print_measurements_with_spot_prices(self, input, resolution):
         if input is None:
             print("Please provide proper start and end dates in format 'YYYY-mm-dd'")
+            return
+        try:
+            start_date_str, end_date_str, *output_format = str(input).split(' ')
+            if len(output_format) > 1:
+                raise ValueError()
+            output_format = output_format[0] if output_format else OUTPUT_JSON
+            start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
+            end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
+            if start_date > end_date:
+                print("Start date must be before end date")
+                raise ValueError()
+        except ValueError:
+            print("Please provide proper start and end dates in format 'YYYY-mm-dd'")
+            return
+        if output_format not in (OUTPUT_JSON, *OUTPUT_FORMATS):
+            print(f"Please provide an output format: {OUTPUT_JSON}, {', '.join(OUTPUT_FORMATS)}")
+            return
+        if output_format == OUTPUT_JSON:
+            measurements_with_spot_prices = self.api_client.get_measurements_with_spot_prices(
+                start_date, end_date, resolution
+            )
+            measurements_json = json.dumps(measurements_with_spot_prices, default=json_serializer, indent=2)
+            print(measurements_json)
         else:
-            try:
-                start_date_str, end_date_str = str(input).split(' ')
-                start_date = datetime.strptime(start_date_str, '%Y-%m-%d').date()
-                end_date = datetime.strptime(end_date_str, '%Y-%m-%d').date()
-                if start_date > end_date:
-                    print("Start date must be before end date")
-                    raise ValueError()
-                measurements_with_spot_prices = self.api_client.get_measurements_with_spot_prices(
-                    start_date, end_date, RESOLUTION_QUARTER
-                )
-                measurements_json = json.dumps(measurements_with_spot_prices, default=lambda o: o.__dict__, indent=2)
-                print(measurements_json)
-            except ValueError:
-                print("Please provide proper start and end dates in format 'YYYY-mm-dd'")
+            write_measurements(
+                self.api_client.iter_measurements_with_spot_prices(start_date, end_date, resolution),
+                output_format,
+                sys.stdout,
+            )
+
+
+def _format_metrics(snapshot: dict) -> str:
+    lines = [f"{'endpoint':<60}{'requests':>10}{'errors':>8}{'retries':>8}{'avg ms':>10}{'KiB':>10}"]
+    for endpoint, metrics in sorted(snapshot["endpoints"].items()):
+        average_ms = metrics["latency_sum"] / metrics["count"] * 1000 if metrics["count"] else 0.0
+        lines.append(
+            f"{endpoint:<60}{metrics['count']:>10}{metrics['errors']:>8}{metrics['retries']:>8}"
+            f"{average_ms:>10.1f}{metrics['response_bytes'] / 1024:>10.1f}"
+        )
+    lines.append("")
+    lines.append(f"{'cache':<60}{'hits':>10}{'stale':>8}{'misses':>8}{'evicted':>10}{'hit rate':>10}")
+    for cache, counters in sorted(snapshot["caches"].items()):
+        hits = counters["hits"] + counters["stale_hits"]
+        lookups = hits + counters["misses"]
+        hit_rate = f"{hits / lookups:.0%}" if lookups else "-"
+        lines.append(
+            f"{cache:<60}{counters['hits']:>10}{counters['stale_hits']:>8}{counters['misses']:>8}"
+            f"{counters['evictions']:>10}{hit_rate:>10}"
+        )
+    return "\n".join(lines)
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(prog="oma-helen-cli", description="Oma Helen API library and CLI")
+    parser.add_argument(
+        "--session-file",
+        default=os.environ.get("OMA_HELEN_SESSION_FILE"),
+        help="Save the session into this file and reuse it while the access token is valid, so that "
+        "later runs can skip the login. Defaults to the OMA_HELEN_SESSION_FILE environment variable.",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    serve_parser = subparsers.add_parser(
+        "serve",
+        help="Serve the API as JSON endpoints over one logged in session",
+        description="Serve the API as JSON endpoints over one logged in session. The credentials are read from "
+        "the OMA_HELEN_USERNAME and OMA_HELEN_PASSWORD environment variables or prompted.",
+    )
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    serve_parser.add_argument("--port", type=int, default=8080, help="Port to listen on (default: 8080)")
+    serve_parser.add_argument(
+        "--workers", type=int, default=8, help="How many requests are handled concurrently (default: 8)"
+    )
+    export_parser = subparsers.add_parser(
+        "export",
+        help="Export the quarter-hour measurements with spot prices of the whole contract into a file",
+        description="Export the quarter-hour measurements with spot prices from the start of the contract to today. "
+        "The progress is saved into a checkpoint file, so an interrupted export resumes where it stopped and running "
+        "the same export again later appends only the new days. The credentials are read from the OMA_HELEN_USERNAME "
+        "and OMA_HELEN_PASSWORD environment variables or prompted.",
+    )
+    export_parser.add_argument("path", help="Output file, or output directory for parquet")
+    export_parser.add_argument(
+        "--format", choices=EXPORT_FORMATS, default=OUTPUT_CSV, help="Output format (default: csv)"
+    )
+    export_parser.add_argument(
+        "--checkpoint", help="Checkpoint file of the export (default: the output path with a .checkpoint suffix)"
+    )
+    export_parser.add_argument(
+        "--start", type=date.fromisoformat, help="First day in format YYYY-mm-dd (default: start of the contract)"
+    )
+    export_parser.add_argument("--end", type=date.fromisoformat, help="Last day in format YYYY-mm-dd (default: today)")
+    export_parser.add_argument("--gsrn", help="GSRN or delivery site id (default: the latest active delivery site)")
+    export_parser.add_argument(
+        "--workers", type=int, default=4, help="How many months are downloaded concurrently (default: 4)"
+    )
+    return parser.parse_args()
+
+
+def _read_credentials() -> tuple[str, str]:
+    username = os.environ.get("OMA_HELEN_USERNAME")
+    password = os.environ.get("OMA_HELEN_PASSWORD")
+    if username is None or password is None:
+        print("Log in to Oma Helen")
+    if username is None:
+        username = input("Username: ")
+    if password is None:
+        password = getpass()
+    return username, password
+
+
+def _export(args):
+    # Imported here, so that the interactive prompt does not pay for the imports of the subcommands
+    from .export import export_measurements
+
+    username = password = None
+    if args.session_file is None or HelenSession.restore(args.session_file) is None:
+        username, password = _read_credentials()
+    # The client bounds its concurrent requests too, so it must allow as many as there are workers
+    api_client = HelenApiClient(max_fetch_workers=args.workers).login_and_init(username, password, args.session_file)
+    try:
+        result = export_measurements(
+            api_client,
+            args.path,
+            args.format,
+            args.checkpoint or f"{args.path.rstrip(os.sep)}.checkpoint",
+            args.start,
+            args.end,
+            args.gsrn,
+            args.workers,
+        )
+    finally:
+        api_client.close()
+    resumed = f", resumed from {result.resumed_from}" if result.resumed_from else ""
+    print(f"Exported {result.rows} rows from {result.start_date} to {result.end_date} into {result.path}{resumed}")
 
 
 def main():
-    print("Log in to Oma Helen")
-    username = input("Username: ")
-    password = getpass()
-    HelenCLIPrompt(username, password).cmdloop()
+    args = _parse_args()
+    if args.command == "serve":
+        from .server import serve
+
+        # The credentials are needed to renew the session when it expires
+        username, password = _read_credentials()
+        serve(username, password, args.session_file, args.host, args.port, args.workers)
+        return
+    if args.command == "export":
+        _export(args)
+        return
+
+    cli_prompt = HelenCLIPrompt(args.session_file)
+    username = password = None
+    if args.session_file is None or HelenSession.restore(args.session_file) is None:
+        print("Log in to Oma Helen")
+        username = input("Username: ")
+        password = getpass()
+    cli_prompt.login(username, password).cmdloop()
 
 
 if __name__ == "__main__":
@@ -3,3 +3,29 @@ HTTP_READ_TIMEOUT = 30
 # Resolution constants for API requests
 RESOLUTION_HOUR = "hour"
 RESOLUTION_QUARTER = "quarter"
+RESOLUTION_DAY = "day"
+RESOLUTION_MONTH = "month"
+
+# Length of each series entry of the resolutions that have a fixed length
+RESOLUTION_SECONDS = {RESOLUTION_QUARTER: 15 * 60, RESOLUTION_HOUR: 60 * 60}
+
+# Resolutions whose series can be split at Helsinki midnight into per-day segments
+DAY_SEGMENTABLE_RESOLUTIONS = (RESOLUTION_QUARTER, RESOLUTION_HOUR, RESOLUTION_DAY)
+
+# Measurements of a day may still change until this many days have passed, e.g. today and yesterday
+MEASUREMENTS_SETTLING_DAYS = 2
+
+# Long quarter and hour ranges are fetched in chunks of these sizes
+CHUNKED_RESOLUTIONS = (RESOLUTION_QUARTER, RESOLUTION_HOUR)
+CHUNK_MONTH = "month"
+CHUNK_WEEK = "week"
+
+# Size of the chunks in which streamed responses are read
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Coarser resolutions that can be rolled up locally from cached finer measurements, finest source first
+ROLL_UP_SOURCE_RESOLUTIONS = {
+    RESOLUTION_HOUR: (RESOLUTION_QUARTER,),
+    RESOLUTION_DAY: (RESOLUTION_QUARTER, RESOLUTION_HOUR),
+    RESOLUTION_MONTH: (RESOLUTION_QUARTER, RESOLUTION_HOUR),
+}
@@ -0,0 +1,109 @@
+import logging
+from datetime import datetime
+
+CONTRACT_DATETIME_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+
+class ContractProducts:
+    """The energy and transfer products of a contract with their components resolved for lookups"""
+
+    def __init__(self, contract: dict):
+        products = contract.get("products") or []
+        self.energy_product: dict = next(filter(lambda p: p["product_type"] == "energy", products), None)
+        self.transfer_product: dict = next(filter(lambda p: p["product_type"] == "transfer", products), None)
+        self.energy_components, self.energy_base_price_component = self._index_components(self.energy_product)
+        self.transfer_components, self.transfer_base_price_component = self._index_components(self.transfer_product)
+
+    @staticmethod
+    def _index_components(product: dict) -> tuple:
+        """Map the component names of a product to the components and find the base price component.
+        The first component wins if there are several with the same name."""
+        components_by_name = {}
+        base_price_component = None
+        for component in product["components"] if product else []:
+            components_by_name.setdefault(component["name"], component)
+            if base_price_component is None and component["is_base_price"]:
+                base_price_component = component
+        return components_by_name, base_price_component
+
+
+class ContractIndex:
+    """Active contracts of a contract list indexed by GSRN and delivery site id.
+
+    A contract is considered active if:
+    - It has no end_date or end_date is in the future
+    - Its start_date is not in the future
+    - Its domain is not 'electricity-production'
+
+    If several active contracts share a GSRN or a delivery site id, the newest one is used.
+    The index is not modified after it has been built, so it can be shared between threads.
+    """
+
+    def __init__(self, contracts: list, now: datetime = None):
+        now = datetime.now() if now is None else now
+        active_contracts = []
+        for contract in contracts:
+            start_date = datetime.strptime(contract["start_date"], CONTRACT_DATETIME_FORMAT)
+            if _is_active_contract(contract, start_date, now):
+                active_contracts.append((start_date, contract))
+        active_contracts.sort(key=lambda start_date_and_contract: start_date_and_contract[0], reverse=True)
+
+        # Newest first
+        self.active_contracts: tuple = tuple(contract for _, contract in active_contracts)
+        self._contracts_by_gsrn = {}
+        self._contracts_by_delivery_site_id = {}
+        self._products_by_contract_id = {}
+        for contract in self.active_contracts:
+            self._contracts_by_gsrn.setdefault(str(contract["gsrn"]), contract)
+            self._contracts_by_delivery_site_id.setdefault(str(contract["delivery_site"]["id"]), contract)
+            self._products_by_contract_id[id(contract)] = ContractProducts(contract)
+
+    @property
+    def latest_contract(self) -> dict:
+        """The active contract with the latest start date"""
+        if not self.active_contracts:
+            logging.error("No contracts found")
+            return None
+        return self.active_contracts[0]
+
+    @property
+    def gsrn_ids(self) -> list[str]:
+        return [str(contract["gsrn"]) for contract in self.active_contracts]
+
+    @property
+    def delivery_site_ids(self) -> list[str]:
+        return [str(contract["delivery_site"]["id"]) for contract in self.active_contracts]
+
+    def get_by_gsrn(self, gsrn: str) -> dict:
+        return self._contracts_by_gsrn.get(str(gsrn))
+
+    def get_by_delivery_site_id(self, delivery_site_id: str) -> dict:
+        return self._contracts_by_delivery_site_id.get(str(delivery_site_id))
+
+    def find(self, site_id: str) -> dict:
+        """Find the active contract by a GSRN (18 numbers long) or by a delivery site id (7 numbers long)"""
+        if site_id is None:
+            return None
+        site_id = str(site_id)
+        if len(site_id) == 18:
+            return self.get_by_gsrn(site_id)
+        return self.get_by_delivery_site_id(site_id)
+
+    def get_products(self, contract: dict) -> ContractProducts:
+        """Get the resolved products of a contract. Contracts that are not in the index are resolved on the fly."""
+        products = self._products_by_contract_id.get(id(contract))
+        return ContractProducts(contract) if products is None else products
+
+
+def _is_active_contract(contract: dict, start_date: datetime, now: datetime) -> bool:
+    # Check if contract has started (start_date is not in future)
+    if start_date > now:
+        return False
+
+    # Check if contract hasn't ended (end_date is None or in future)
+    end_date_str = contract.get("end_date")
+    if end_date_str is not None and datetime.strptime(end_date_str, CONTRACT_DATETIME_FORMAT) < now:
+        return False
+
+    # Check domain
+    return contract.get("domain") != "electricity-production"
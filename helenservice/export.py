@@ -0,0 +1,202 @@
+import json
+import logging
+import os
+from datetime import date, timedelta
+
+from .api_client import HelenApiClient
+from .api_response import MEASUREMENT_VALUE_FIELDS, MeasurementsWithSpotPriceResponse
+from .cache_policy import DATA_IMMUTABLE, CachePolicy
+from .const import CHUNK_MONTH, RESOLUTION_QUARTER
+from .measurement_writer import (
+    EXPORT_FORMATS,
+    OUTPUT_CSV,
+    OUTPUT_PARQUET,
+    write_csv_header,
+    write_csv_rows,
+    write_ndjson_rows,
+)
+from .utils import get_local_today, map_ahead, plan_date_chunks
+
+CHECKPOINT_VERSION = 1
+
+
+class ExportResult:
+    """What an export wrote. `rows` counts all rows in the output, including rows written before a resume."""
+
+    def __init__(self, path: str, start_date: date, end_date: date, rows: int, resumed_from: date = None):
+        self.path = path
+        self.start_date = start_date
+        self.end_date = end_date
+        self.rows = rows
+        self.resumed_from = resumed_from
+
+
+def export_measurements(
+    client: HelenApiClient,
+    path: str,
+    output_format: str = OUTPUT_CSV,
+    checkpoint_file: str = None,
+    start_date: date = None,
+    end_date: date = None,
+    gsrn: str = None,
+    max_workers: int = 4,
+) -> ExportResult:
+    """Export the quarter-hour measurements with spot prices of a delivery site, e.g. its whole history.
+
+    The range from `start_date` to `end_date` is fetched one month at a time, at most `max_workers`
+    months concurrently, and each month is written as soon as it arrives and the months before it
+    have been written. CSV and NDJSON are written into one file. Parquet is written into a directory
+    with one file per month, and needs pyarrow.
+
+    With a checkpoint file, the progress is saved after each month whose days do not change anymore.
+    Calling again with the same arguments resumes from the checkpoint: rows written after it are
+    dropped and fetched again, so the output has no duplicates. Once an export is complete, calling
+    again appends only the days that are new or were still changing.
+
+    Args:
+        client: A logged in client
+        path: The output file, or the output directory for Parquet
+        output_format: "csv", "ndjson" or "parquet" (default: "csv")
+        checkpoint_file: Where the progress is saved (default: no checkpoint)
+        start_date: The first day (default: the start date of the contract)
+        end_date: The last day (default: today)
+        gsrn: GSRN or delivery site id to use instead of the selected delivery site
+        max_workers: How many months are fetched concurrently (default: 4). The requests of the client are
+            also bounded by its `max_fetch_workers`, so create the client with at least as many workers.
+    """
+    if output_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{output_format}'. Use one of: {', '.join(EXPORT_FORMATS)}")
+    if output_format == OUTPUT_PARQUET:
+        _import_pyarrow()
+    start_date = client.get_contract_start_date(gsrn) if start_date is None else start_date
+    end_date = get_local_today() if end_date is None else end_date
+    export_key = {"site": gsrn, "format": output_format, "start_date": start_date.isoformat()}
+
+    checkpoint = _read_checkpoint(checkpoint_file, export_key)
+    if checkpoint is None:
+        next_date, rows, size, resumed_from = start_date, 0, 0, None
+    else:
+        next_date = resumed_from = date.fromisoformat(checkpoint["next_date"])
+        rows = checkpoint["rows"]
+        size = checkpoint["size"]
+        logging.info("Resuming the export into %s from %s", path, next_date)
+
+    cache_policy = CachePolicy()
+    sink = _ParquetSink(path) if output_format == OUTPUT_PARQUET else _TextSink(path, output_format, size)
+    try:
+        chunks = plan_date_chunks(next_date, end_date, CHUNK_MONTH) if next_date <= end_date else []
+        months = map_ahead(
+            lambda chunk: (
+                chunk,
+                client.get_measurements_with_spot_prices(chunk[0], chunk[1], RESOLUTION_QUARTER, gsrn),
+            ),
+            chunks,
+            max_workers,
+        )
+        for (chunk_start, chunk_end), response in months:
+            rows += sink.write(chunk_start, response)
+            logging.debug("Exported %s - %s into %s", chunk_start, chunk_end, path)
+            if checkpoint_file is not None and cache_policy.classify_day(chunk_end) == DATA_IMMUTABLE:
+                next_date = chunk_end + timedelta(days=1)
+                _write_checkpoint(
+                    checkpoint_file, dict(export_key, next_date=next_date.isoformat(), rows=rows, size=sink.size)
+                )
+    finally:
+        sink.close()
+    return ExportResult(path, start_date, end_date, rows, resumed_from)
+
+
+class _TextSink:
+    """Appends CSV or NDJSON rows to a file, which is first truncated to the size it had at the checkpoint."""
+
+    def __init__(self, path: str, output_format: str, size: int):
+        if size and (not os.path.exists(path) or os.path.getsize(path) < size):
+            raise ValueError(
+                f"The export file '{path}' is shorter than its checkpoint. Remove the checkpoint to start over"
+            )
+        self._file = open(path, "r+" if size else "w", encoding="utf-8", newline="")
+        self._file.truncate(size)
+        self._file.seek(size)
+        self._output_format = output_format
+        if not size and output_format == OUTPUT_CSV:
+            write_csv_header(self._file)
+        self.size = self._file.tell()
+
+    def write(self, chunk_start: date, response: MeasurementsWithSpotPriceResponse) -> int:
+        if self._output_format == OUTPUT_CSV:
+            rows = write_csv_rows(response, self._file)
+        else:
+            rows = write_ndjson_rows(response, self._file)
+        # The checkpoint must not point past data that is not on disk yet
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.size = self._file.tell()
+        return rows
+
+    def close(self):
+        self._file.close()
+
+
+class _ParquetSink:
+    """Writes each month into its own Parquet file in a directory, named by the first day of the month."""
+
+    size = 0
+
+    def __init__(self, path: str):
+        self._path = path
+        self._pyarrow = _import_pyarrow()
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, chunk_start: date, response: MeasurementsWithSpotPriceResponse) -> int:
+        pyarrow = self._pyarrow
+        timestamp_type = pyarrow.timestamp("s", tz="UTC")
+        table = pyarrow.table(
+            {
+                "start": pyarrow.array(response.starts, type=timestamp_type),
+                "stop": pyarrow.array(response.stops, type=timestamp_type),
+                **{
+                    field: pyarrow.array(response.columns[field], type=pyarrow.float64(), from_pandas=True)
+                    for field in MEASUREMENT_VALUE_FIELDS
+                },
+            }
+        )
+        # Write into a temporary file first, so an interrupted write never leaves a partial month behind
+        file_path = os.path.join(self._path, f"{chunk_start.isoformat()}.parquet")
+        pyarrow.parquet.write_table(table, file_path + ".tmp")
+        os.replace(file_path + ".tmp", file_path)
+        return table.num_rows
+
+    def close(self):
+        pass
+
+
+def _import_pyarrow():
+    """Import pyarrow only when Parquet is written, as importing it is slow."""
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise ImportError("Exporting to Parquet requires pyarrow. Install it with 'pip install pyarrow'") from None
+    return pyarrow
+
+
+def _read_checkpoint(checkpoint_file: str, export_key: dict) -> dict:
+    if checkpoint_file is None or not os.path.exists(checkpoint_file):
+        return None
+    with open(checkpoint_file) as f:
+        checkpoint = json.load(f)
+    if checkpoint.get("version") != CHECKPOINT_VERSION or any(
+        checkpoint.get(key) != value for key, value in export_key.items()
+    ):
+        raise ValueError(
+            f"The checkpoint '{checkpoint_file}' belongs to another export. Remove it or use another checkpoint file"
+        )
+    return checkpoint
+
+
+def _write_checkpoint(checkpoint_file: str, checkpoint: dict):
+    """Replace the checkpoint atomically, so an interruption leaves either the old or the new checkpoint."""
+    temporary_file = checkpoint_file + ".tmp"
+    with open(temporary_file, "w") as f:
+        json.dump(dict(checkpoint, version=CHECKPOINT_VERSION), f)
+    os.replace(temporary_file, checkpoint_file)
@@ -1,5 +1,10 @@
+import base64
+import json
 import logging
+import os
 import re
+import stat
+from datetime import datetime, timedelta, timezone
 
 from bs4 import BeautifulSoup
 from requests import Request, Response, Session
@@ -7,12 +12,16 @@ from requests import Request, Response, Session
 from helenservice.api_exceptions import HelenAuthenticationException
 
 from .const import HTTP_READ_TIMEOUT
+from .login_page_parser import LoginPageFields, extract_login_page_fields
+from .metrics import get_default_metrics
 
 
 class HelenSession:
     HELEN_LOGIN_HOST = "https://login.helen.fi"
     TUPAS_LOGIN_URL = "https://www.helen.fi/hcc/TupasLoginFrame?service=account&locale=fi"
     LOGIN_API_VERSION = "v21"
+    # Parse the login flow pages with the lightweight extractor instead of BeautifulSoup when possible
+    USE_FAST_LOGIN_PAGE_PARSER = True
 
     _session: Session = None
 
@@ -27,6 +36,7 @@ class HelenSession:
         :rtype: .HelenSession
         """
         self._session = Session()
+        get_default_metrics().instrument_session(self._session)
         logging.debug("Logging in to Oma Helen")
         try:
             login_response = self._send_login_request(username, password)
@@ -52,6 +62,89 @@ class HelenSession:
 
         return access_token
 
+    def get_access_token_expiry(self) -> datetime:
+        """Get the expiry time of the access-token decoded from the `exp` claim of the JWT.
+        Returns None if the token has no readable expiry time.
+        """
+        return _decode_jwt_expiry(self.get_access_token())
+
+    def is_access_token_valid(self, leeway: timedelta = timedelta(minutes=1)) -> bool:
+        """Check that there is an access-token and it does not expire within the given leeway"""
+        if self._session is None or self._session.cookies.get("access-token") is None:
+            return False
+        expiry = self.get_access_token_expiry()
+        return expiry is not None and datetime.now(timezone.utc) + leeway < expiry
+
+    def save(self, path: str):
+        """Save the access-token into a file that only the current user can read, so that it can be
+        reused by later processes with `restore()` until the token expires.
+        """
+        cookie = next(cookie for cookie in self._session.cookies if cookie.name == "access-token")
+        session_data = {
+            "access_token": cookie.value,
+            "domain": cookie.domain,
+            "path": cookie.path,
+        }
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        file_descriptor = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(file_descriptor, "w") as session_file:
+            if os.name == "posix":
+                os.fchmod(session_file.fileno(), 0o600)
+            json.dump(session_data, session_file)
+        logging.debug("Saved the Oma Helen session to %s", path)
+
+    @classmethod
+    def restore(cls, path: str):
+        """Restore a session saved with `save()`. Returns None if the file does not exist, is readable
+        by other users or its access-token has expired.
+
+        :param path: The path of the session file.
+        :return: HelenSession or None.
+        :rtype: .HelenSession
+        """
+        if not os.path.isfile(path):
+            return None
+        if os.name == "posix" and os.stat(path).st_mode & (stat.S_IRWXG | stat.S_IRWXO):
+            logging.warning("Ignoring the session file %s because other users can access it", path)
+            return None
+        try:
+            with open(path) as session_file:
+                session_data = json.load(session_file)
+            helen_session = cls()
+            helen_session._session = Session()
+            get_default_metrics().instrument_session(helen_session._session)
+            helen_session._session.cookies.set(
+                "access-token",
+                session_data["access_token"],
+                domain=session_data.get("domain", ""),
+                path=session_data.get("path", "/"),
+            )
+        except (OSError, ValueError, KeyError):
+            logging.warning("Ignoring the session file %s because it could not be read", path)
+            return None
+        if not helen_session.is_access_token_valid():
+            logging.debug("The saved Oma Helen session has expired")
+            helen_session.close()
+            return None
+        logging.debug("Restored the Oma Helen session from %s", path)
+        return helen_session
+
+    @classmethod
+    def restore_or_login(cls, username, password, session_file: str = None):
+        """Restore a still valid session from the session file, or login and save the new session
+        into the session file. Without a session file this is the same as `login()`.
+
+        :return: HelenSession.
+        :rtype: .HelenSession
+        """
+        helen_session = cls.restore(session_file) if session_file is not None else None
+        if helen_session is None:
+            helen_session = cls().login(username, password)
+            if session_file is not None:
+                helen_session.save(session_file)
+        return helen_session
+
     def close(self):
         """Close down the session for the Oma Helen web service"""
         if self._session is not None:
@@ -94,14 +187,37 @@ class HelenSession:
     def _get_tupas_response(self):
         return self._session.get(self.TUPAS_LOGIN_URL, timeout=HTTP_READ_TIMEOUT)
 
+    def _parse_login_page(self, html: str, input_names: tuple = (), need_form: bool = True, need_anchor: bool = False):
+        """Extract the form, anchor and input values needed from a login flow page. Uses the lightweight
+        extractor and falls back to BeautifulSoup if the extractor cannot find everything."""
+        if self.USE_FAST_LOGIN_PAGE_PARSER:
+            fields = extract_login_page_fields(html, input_names, need_form, need_anchor)
+            if (
+                (not need_form or (fields.form_action is not None and fields.form_method is not None))
+                and (not need_anchor or fields.anchor_href is not None)
+                and all(fields.inputs.get(name) is not None for name in input_names)
+            ):
+                return fields
+            logging.debug("Falling back to BeautifulSoup to parse the login page")
+
+        soup = BeautifulSoup(html, "html.parser")
+        fields = LoginPageFields()
+        if need_form:
+            fields.form_action = self._get_html_form_url(soup)
+            fields.form_method = self._get_html_form_method(soup)
+        if need_anchor:
+            fields.anchor_href = soup.find("a").attrs['href']
+        fields.inputs = {name: self._get_html_input_value(soup, name) for name in input_names}
+        return fields
+
     def _send_login_request(self, username, password):
         tupas_response = self._get_tupas_response()
-        tupas_soup = BeautifulSoup(tupas_response.text, "html.parser")
-        authorization_url = self._get_html_form_url(tupas_soup)
-        authorization_form_method = self._get_html_form_method(tupas_soup)
+        tupas_page = self._parse_login_page(tupas_response.text)
+        authorization_url = tupas_page.form_action
+        authorization_form_method = tupas_page.form_method
         authorization_response = self._make_url_request(authorization_url, authorization_form_method)
-        authorization_soup = BeautifulSoup(authorization_response.text, "html.parser")
-        login_url = self.HELEN_LOGIN_HOST + self._get_html_form_url(authorization_soup)
+        authorization_page = self._parse_login_page(authorization_response.text)
+        login_url = self.HELEN_LOGIN_HOST + authorization_page.form_action
 
         login_payload = {"username": username, "password": password}
         return self._make_url_request(login_url, "POST", login_payload)
@@ -111,24 +227,33 @@ class HelenSession:
         return fixed_url.replace("omahelen", "oma.helen")
 
     def _proceed_to_main_page_from_login_response(self, response: Response):
-        access_granted_soup = BeautifulSoup(response.text, "html.parser")
-        continue_url = self._get_html_form_url(access_granted_soup)
-        continue_param_code = self._get_html_input_value(access_granted_soup, "code")
-        continue_param_state = self._get_html_input_value(access_granted_soup, "state")
-        continue_params = {"code": continue_param_code, "state": continue_param_state}
+        access_granted_page = self._parse_login_page(response.text, ("code", "state"))
+        continue_url = access_granted_page.form_action
+        continue_params = {"code": access_granted_page.inputs["code"], "state": access_granted_page.inputs["state"]}
         proceed_link_page_response = self._make_url_request(continue_url, "GET", params=continue_params)
 
-        proceed_link_page_soup = BeautifulSoup(proceed_link_page_response.text, "html.parser")
-        proceed_link_page_link_url = proceed_link_page_soup.find("a").attrs['href']
+        proceed_link_page = self._parse_login_page(proceed_link_page_response.text, need_form=False, need_anchor=True)
+        proceed_link_page_link_url = proceed_link_page.anchor_href
         auth_response = self._make_url_request(self._fix_oma_helen_api_url(proceed_link_page_link_url), "GET")
 
-        auth_response_soup = BeautifulSoup(auth_response.text, "html.parser")
-        auth_response_url = self._get_html_form_url(auth_response_soup)
-        auth_response_param_code = self._get_html_input_value(auth_response_soup, "code")
-        auth_response_param_state = self._get_html_input_value(auth_response_soup, "state")
+        auth_response_page = self._parse_login_page(auth_response.text, ("code", "state"))
+        auth_response_url = auth_response_page.form_action
         auth_response_params = {
-            "code": auth_response_param_code,
-            "state": auth_response_param_state,
+            "code": auth_response_page.inputs["code"],
+            "state": auth_response_page.inputs["state"],
         }
 
         self._make_url_request(auth_response_url, "GET", params=auth_response_params)
+
+
+def _decode_jwt_expiry(token: str) -> datetime:
+    """Decode the `exp` claim of a JWT without verifying its signature. Returns None if the
+    token is not a JWT or has no `exp` claim.
+    """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        expiry = json.loads(base64.urlsafe_b64decode(payload))["exp"]
+        return datetime.fromtimestamp(int(expiry), timezone.utc)
+    except (IndexError, ValueError, KeyError, TypeError):
+        return None
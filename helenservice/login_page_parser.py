@@ -0,0 +1,65 @@
+from html.parser import HTMLParser
+
+
+class LoginPageFields:
+    """The parts of a login flow page that HelenSession needs to continue the login"""
+
+    def __init__(self):
+        self.form_action: str = None
+        self.form_method: str = None
+        self.inputs: dict = {}
+        self.anchor_href: str = None
+
+
+class _LoginPageParser(HTMLParser):
+    """Collects the first form, the first anchor and the values of the wanted inputs of a page,
+    and stops once everything that was asked for has been found."""
+
+    def __init__(self, input_names: tuple, need_form: bool, need_anchor: bool):
+        super().__init__(convert_charrefs=True)
+        self.fields = LoginPageFields()
+        self._input_names = set(input_names)
+        self._need_form = need_form
+        self._need_anchor = need_anchor
+
+    @property
+    def done(self) -> bool:
+        return (
+            (not self._need_form or self.fields.form_action is not None)
+            and (not self._need_anchor or self.fields.anchor_href is not None)
+            and self._input_names.issubset(self.fields.inputs)
+        )
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "form" and self.fields.form_action is None:
+            attributes = dict(attrs)
+            self.fields.form_action = attributes.get("action")
+            self.fields.form_method = attributes.get("method")
+        elif tag == "a" and self.fields.anchor_href is None:
+            self.fields.anchor_href = dict(attrs).get("href")
+        elif tag == "input":
+            attributes = dict(attrs)
+            name = attributes.get("name")
+            if name in self._input_names and name not in self.fields.inputs:
+                self.fields.inputs[name] = attributes.get("value")
+
+    handle_startendtag = handle_starttag
+
+
+def extract_login_page_fields(
+    html: str, input_names: tuple = (), need_form: bool = True, need_anchor: bool = False, chunk_size: int = 8192
+) -> LoginPageFields:
+    """Extract the first form's action and method, the first anchor's href and the values of the
+    given inputs from a page without building a DOM tree. The page is parsed in chunks and parsing
+    stops as soon as everything that was asked for has been found.
+
+    Fields that could not be found are left as None or missing from `inputs`.
+    """
+    parser = _LoginPageParser(input_names, need_form, need_anchor)
+    for position in range(0, len(html), chunk_size):
+        parser.feed(html[position : position + chunk_size])
+        if parser.done:
+            break
+    else:
+        parser.close()
+    return parser.fields
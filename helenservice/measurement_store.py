@@ -0,0 +1,93 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import closing, contextmanager
+from datetime import date, datetime
+from pathlib import Path
+
+from .api_response import MeasurementsWithSpotPriceResponse
+
+
+def get_default_cache_dir() -> Path:
+    """Resolve the cache directory for oma-helen-cli, honoring XDG_CACHE_HOME."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(Path.home(), ".cache")
+    return Path(cache_home) / "oma-helen-cli"
+
+
+class MeasurementStore:
+    """Persistent SQLite store for measurements with spot prices.
+
+    Measurements are stored as one row per GSRN, resolution and Helsinki calendar day. Only
+    days whose data will not change anymore should be written to the store.
+    """
+
+    DATABASE_FILE_NAME = "measurements.sqlite3"
+
+    def __init__(self, path: str = None):
+        if path is None:
+            path = get_default_cache_dir() / self.DATABASE_FILE_NAME
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS measurement_days (
+                    gsrn TEXT NOT NULL,
+                    resolution TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    fetched_at TEXT NOT NULL,
+                    PRIMARY KEY (gsrn, resolution, day)
+                )
+                """
+            )
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def get_days(self, gsrn: str, resolution: str, days: list[date]) -> dict[date, MeasurementsWithSpotPriceResponse]:
+        """Get the stored measurements of the given days. Days that are not stored are left out."""
+        if not days:
+            return {}
+        placeholders = ",".join("?" for _ in days)
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT day, payload FROM measurement_days "
+                f"WHERE gsrn = ? AND resolution = ? AND day IN ({placeholders})",
+                [str(gsrn), resolution, *(day.isoformat() for day in days)],
+            ).fetchall()
+        logging.debug("Found %d/%d days of '%s' measurements from the store", len(rows), len(days), resolution)
+        return {
+            date.fromisoformat(day): MeasurementsWithSpotPriceResponse.from_dict(json.loads(payload))
+            for day, payload in rows
+        }
+
+    def put_days(self, gsrn: str, resolution: str, days: dict[date, MeasurementsWithSpotPriceResponse]):
+        """Store the measurements of the given days, replacing any previously stored data."""
+        if not days:
+            return
+        fetched_at = datetime.now().isoformat()
+        rows = [
+            (str(gsrn), resolution, day.isoformat(), json.dumps(response.to_dict()), fetched_at)
+            for day, response in days.items()
+        ]
+        with self._connect() as connection:
+            connection.executemany("INSERT OR REPLACE INTO measurement_days VALUES (?, ?, ?, ?, ?)", rows)
+
+    def clear(self, gsrn: str = None):
+        """Remove stored measurements of a single GSRN, or everything if no GSRN is given."""
+        with self._connect() as connection:
+            if gsrn is None:
+                connection.execute("DELETE FROM measurement_days")
+            else:
+                connection.execute("DELETE FROM measurement_days WHERE gsrn = ?", [str(gsrn)])
+
+    @contextmanager
+    def _connect(self):
+        """Open a short-lived connection that commits on success. Access is serialized with a lock."""
+        with self._lock, closing(sqlite3.connect(self._path)) as connection, connection:
+            yield connection
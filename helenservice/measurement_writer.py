@@ -0,0 +1,141 @@
+import csv
+import json
+import math
+from collections.abc import Iterable, Iterator
+from typing import TextIO
+
+from .api_response import MEASUREMENT_VALUE_FIELDS, MeasurementsWithSpotPriceResponse
+from .utils import format_epoch_utc_timestamp
+
+OUTPUT_COMPACT_JSON = "compact"
+OUTPUT_NDJSON = "ndjson"
+OUTPUT_CSV = "csv"
+OUTPUT_FORMATS = (OUTPUT_COMPACT_JSON, OUTPUT_NDJSON, OUTPUT_CSV)
+# Formats of export_measurements, which writes Parquet itself
+OUTPUT_PARQUET = "parquet"
+EXPORT_FORMATS = (OUTPUT_CSV, OUTPUT_NDJSON, OUTPUT_PARQUET)
+
+# Columns of the rows of the NDJSON and CSV outputs
+MEASUREMENT_ROW_FIELDS = ("start", "stop") + MEASUREMENT_VALUE_FIELDS
+
+# Reused, as json.dumps with non-default arguments creates a new encoder for each call
+_compact_encoder = json.JSONEncoder(separators=(",", ":"))
+
+
+def iter_measurement_rows(response: MeasurementsWithSpotPriceResponse) -> Iterator[tuple]:
+    """Yield the rows of a response as tuples of MEASUREMENT_ROW_FIELDS, with missing values as None.
+    Unlike `response.series`, no row objects are created."""
+    columns = [response.columns[field] for field in MEASUREMENT_VALUE_FIELDS]
+    previous_stop = None
+    for index, (start, stop) in enumerate(zip(response.starts, response.stops)):
+        # Consecutive rows share the boundary timestamp, so most start times need no formatting
+        if previous_stop is not None and previous_stop[0] == start:
+            start_text = previous_stop[1]
+        else:
+            start_text = format_epoch_utc_timestamp(start)
+        stop_text = format_epoch_utc_timestamp(stop)
+        previous_stop = (stop, stop_text)
+        values = [column[index] for column in columns]
+        yield (start_text, stop_text, *[None if math.isnan(value) else value for value in values])
+
+
+def write_measurements(responses: Iterable[MeasurementsWithSpotPriceResponse], output_format: str, file: TextIO) -> int:
+    """Write measurements in the given format as each response of consecutive time ranges arrives,
+    e.g. from HelenApiClient.iter_measurements_with_spot_prices. Returns the number of rows written.
+
+    "ndjson" writes one JSON object per row and "csv" one line per row with a header line. "compact"
+    writes the same structure as the API response without whitespace. The output is flushed after
+    each response, so only one response at a time is held in memory.
+    """
+    if output_format == OUTPUT_NDJSON:
+        return _write_ndjson(responses, file)
+    if output_format == OUTPUT_CSV:
+        return _write_csv(responses, file)
+    if output_format == OUTPUT_COMPACT_JSON:
+        return _write_compact_json(responses, file)
+    raise ValueError(f"Unknown output format '{output_format}'. Use one of: {', '.join(OUTPUT_FORMATS)}")
+
+
+def write_ndjson_rows(response: MeasurementsWithSpotPriceResponse, file: TextIO) -> int:
+    """Write the rows of a response as NDJSON. Returns the number of rows written."""
+    row_count = 0
+    for row in iter_measurement_rows(response):
+        file.write(_compact_encoder.encode(dict(zip(MEASUREMENT_ROW_FIELDS, row))))
+        file.write("\n")
+        row_count += 1
+    return row_count
+
+
+def write_csv_header(file: TextIO):
+    csv.writer(file, lineterminator="\n").writerow(MEASUREMENT_ROW_FIELDS)
+
+
+def write_csv_rows(response: MeasurementsWithSpotPriceResponse, file: TextIO) -> int:
+    """Write the rows of a response as CSV lines without a header. Returns the number of rows written."""
+    writer = csv.writer(file, lineterminator="\n")
+    row_count = 0
+    for row in iter_measurement_rows(response):
+        writer.writerow(row)
+        row_count += 1
+    return row_count
+
+
+def _write_ndjson(responses: Iterable[MeasurementsWithSpotPriceResponse], file: TextIO) -> int:
+    row_count = 0
+    for response in responses:
+        row_count += write_ndjson_rows(response, file)
+        file.flush()
+    return row_count
+
+
+def _write_csv(responses: Iterable[MeasurementsWithSpotPriceResponse], file: TextIO) -> int:
+    write_csv_header(file)
+    row_count = 0
+    for response in responses:
+        row_count += write_csv_rows(response, file)
+        file.flush()
+    return row_count
+
+
+def _write_compact_json(responses: Iterable[MeasurementsWithSpotPriceResponse], file: TextIO) -> int:
+    """Write the series as it arrives. The fields that are only known after the last response are written
+    after the series, as the order of the fields of a JSON object does not matter."""
+    row_count = 0
+    is_started = False
+    stop = None
+    data_start_times = {}
+    data_stop_times = {}
+    missing_series = []
+    for response in responses:
+        if not is_started:
+            is_started = True
+            header = {
+                "start": response.start,
+                "resolution": response.resolution,
+                "units": response.units,
+                "ids": response.ids,
+            }
+            file.write(_compact_encoder.encode(header)[:-1])
+            file.write(',"series":[')
+        for row in iter_measurement_rows(response):
+            if row_count:
+                file.write(",")
+            file.write(_compact_encoder.encode(dict(zip(MEASUREMENT_ROW_FIELDS, row))))
+            row_count += 1
+        file.flush()
+        stop = response.stop
+        for key, value in response.data_start_times.items():
+            data_start_times.setdefault(key, value)
+        data_stop_times.update(response.data_stop_times)
+        missing_series.extend(series for series in response.missing_series if series not in missing_series)
+    if not is_started:
+        file.write('{"series":[')
+    trailer = {
+        "stop": stop,
+        "data_start_times": data_start_times,
+        "data_stop_times": data_stop_times,
+        "missing_series": missing_series,
+    }
+    file.write("]," + _compact_encoder.encode(trailer)[1:])
+    file.write("\n")
+    return row_count
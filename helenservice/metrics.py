@@ -0,0 +1,255 @@
+import logging
+import math
+import re
+import threading
+from collections.abc import Callable
+from urllib.parse import urlparse
+
+from cachetools import TTLCache
+from requests import Response, Session
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)
+
+# Cache events
+CACHE_HIT = "hits"
+CACHE_STALE_HIT = "stale_hits"
+CACHE_MISS = "misses"
+CACHE_EVICTION = "evictions"
+CACHE_EVENTS = (CACHE_HIT, CACHE_STALE_HIT, CACHE_MISS, CACHE_EVICTION)
+
+# Events passed to listeners
+EVENT_REQUEST = "request"
+EVENT_CACHE = "cache"
+
+_ID_PATTERN = re.compile(r"(?<=/)\d{6,}(?=/|$)")
+_DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def get_endpoint_name(url: str) -> str:
+    """Name the endpoint of a URL by its host and path, with ids and dates replaced by placeholders,
+    e.g. 'api.omahelen.fi/v26/chart-data/{id}/electricity'."""
+    parsed_url = urlparse(url)
+    path = _DATE_PATTERN.sub("{date}", _ID_PATTERN.sub("{id}", parsed_url.path))
+    return f"{parsed_url.netloc}{path}"
+
+
+class _EndpointMetrics:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.retries = 0
+        self.response_bytes = 0
+        self.latency_sum = 0.0
+        self.latency_buckets = [0] * len(LATENCY_BUCKETS)
+
+
+class HelenMetrics:
+    """Request and cache metrics of the clients.
+
+    Records the count, errors, retries, response bytes and a latency histogram of each endpoint,
+    and the hits, stale hits, misses and evictions of each cache. Read the metrics with `snapshot`
+    or `to_prometheus`, or add a listener to be called on each recorded event. Thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: dict[str, _EndpointMetrics] = {}
+        self._caches: dict[str, dict[str, int]] = {}
+        self._listeners: list[Callable] = []
+
+    def add_listener(self, listener: Callable[[str, str, dict], None]):
+        """Call `listener(event, name, values)` on each recorded event. The event is "request" with the
+        endpoint name, or "cache" with the cache name. Listeners are called on the recording thread."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, str, dict], None]):
+        with self._lock:
+            self._listeners.remove(listener)
+
+    def record_request(
+        self, endpoint: str, duration: float, response_bytes: int = 0, retries: int = 0, error: bool = False
+    ):
+        """Record a request to an endpoint that took `duration` seconds."""
+        with self._lock:
+            metrics = self._endpoints.get(endpoint)
+            if metrics is None:
+                metrics = self._endpoints[endpoint] = _EndpointMetrics()
+            metrics.count += 1
+            metrics.errors += int(error)
+            metrics.retries += retries
+            metrics.response_bytes += response_bytes
+            metrics.latency_sum += duration
+            metrics.latency_buckets[next(i for i, bound in enumerate(LATENCY_BUCKETS) if duration <= bound)] += 1
+            listeners = list(self._listeners)
+        values = {"duration": duration, "response_bytes": response_bytes, "retries": retries, "error": error}
+        self._notify(listeners, EVENT_REQUEST, endpoint, values)
+
+    def record_cache(self, cache: str, event: str, count: int = 1):
+        """Record `count` hits, stale hits, misses or evictions of a cache."""
+        if count <= 0:
+            return
+        with self._lock:
+            counters = self._caches.get(cache)
+            if counters is None:
+                counters = self._caches[cache] = dict.fromkeys(CACHE_EVENTS, 0)
+            counters[event] += count
+            listeners = list(self._listeners)
+        self._notify(listeners, EVENT_CACHE, cache, {"event": event, "count": count})
+
+    def instrument_session(self, session: Session):
+        """Record every response of a requests Session, including each redirect of a redirect chain."""
+        session.hooks["response"].append(self._record_response)
+
+    def snapshot(self) -> dict:
+        """Get a JSON serializable copy of the metrics."""
+        with self._lock:
+            return {
+                "endpoints": {
+                    endpoint: {
+                        "count": metrics.count,
+                        "errors": metrics.errors,
+                        "retries": metrics.retries,
+                        "response_bytes": metrics.response_bytes,
+                        "latency_sum": metrics.latency_sum,
+                        "latency_buckets": {
+                            _format_bound(bound): count
+                            for bound, count in zip(LATENCY_BUCKETS, metrics.latency_buckets)
+                        },
+                    }
+                    for endpoint, metrics in self._endpoints.items()
+                },
+                "caches": {cache: dict(counters) for cache, counters in self._caches.items()},
+            }
+
+    def to_prometheus(self) -> str:
+        """Export the metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        endpoints = snapshot["endpoints"]
+        lines = []
+
+        def add_counter(name: str, help_text: str, label: str, values: dict):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for label_value, value in values.items():
+                lines.append(f'{name}{{{label}="{_escape_label(label_value)}"}} {value}')
+
+        add_counter(
+            "helen_requests_total",
+            "Requests sent to each endpoint.",
+            "endpoint",
+            {endpoint: metrics["count"] for endpoint, metrics in endpoints.items()},
+        )
+        add_counter(
+            "helen_request_errors_total",
+            "Requests that failed or got an error status.",
+            "endpoint",
+            {endpoint: metrics["errors"] for endpoint, metrics in endpoints.items()},
+        )
+        add_counter(
+            "helen_request_retries_total",
+            "Retries of requests to each endpoint.",
+            "endpoint",
+            {endpoint: metrics["retries"] for endpoint, metrics in endpoints.items()},
+        )
+        add_counter(
+            "helen_response_bytes_total",
+            "Bytes received from each endpoint.",
+            "endpoint",
+            {endpoint: metrics["response_bytes"] for endpoint, metrics in endpoints.items()},
+        )
+
+        lines.append("# HELP helen_request_duration_seconds Latency of the requests to each endpoint.")
+        lines.append("# TYPE helen_request_duration_seconds histogram")
+        for endpoint, metrics in endpoints.items():
+            label = _escape_label(endpoint)
+            cumulative_count = 0
+            for bound, count in metrics["latency_buckets"].items():
+                cumulative_count += count
+                lines.append(
+                    f'helen_request_duration_seconds_bucket{{endpoint="{label}",le="{bound}"}} {cumulative_count}'
+                )
+            lines.append(f'helen_request_duration_seconds_sum{{endpoint="{label}"}} {metrics["latency_sum"]}')
+            lines.append(f'helen_request_duration_seconds_count{{endpoint="{label}"}} {metrics["count"]}')
+
+        for event in CACHE_EVENTS:
+            add_counter(
+                f"helen_cache_{event}_total",
+                f"Cache {event.replace('_', ' ')} of each cache.",
+                "cache",
+                {cache: counters[event] for cache, counters in snapshot["caches"].items()},
+            )
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+            self._caches.clear()
+
+    def _record_response(self, response: Response, *args, **kwargs):
+        if kwargs.get("stream"):
+            # The body of a streamed response has not been read yet
+            response_bytes = int(response.headers.get("Content-Length", 0) or 0)
+        else:
+            response_bytes = len(response.content or b"")
+        retry_history = getattr(getattr(response.raw, "retries", None), "history", None) or ()
+        self.record_request(
+            get_endpoint_name(response.url),
+            response.elapsed.total_seconds(),
+            response_bytes,
+            len(retry_history),
+            response.status_code >= 400,
+        )
+
+    def _notify(self, listeners: list, event: str, name: str, values: dict):
+        for listener in listeners:
+            try:
+                listener(event, name, values)
+            except Exception:
+                logging.warning("Metrics listener failed", exc_info=True)
+
+
+class InstrumentedTTLCache(TTLCache):
+    """TTLCache that records its hits, misses and evictions, e.g. for use with `cachedmethod`"""
+
+    def __init__(self, maxsize: int, ttl: float, name: str, metrics: HelenMetrics):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self._name = name
+        self._metrics = metrics
+        self._evicting = False
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        if not self._evicting:
+            self._metrics.record_cache(self._name, CACHE_HIT)
+        return value
+
+    def __missing__(self, key):
+        self._metrics.record_cache(self._name, CACHE_MISS)
+        raise KeyError(key)
+
+    def popitem(self):
+        self._evicting = True
+        try:
+            item = super().popitem()
+        finally:
+            self._evicting = False
+        self._metrics.record_cache(self._name, CACHE_EVICTION)
+        return item
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == math.inf else repr(bound)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_default_metrics = HelenMetrics()
+
+
+def get_default_metrics() -> HelenMetrics:
+    """Get the metrics that are shared by all clients that are not given metrics of their own."""
+    return _default_metrics
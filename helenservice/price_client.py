@@ -1,9 +1,10 @@
 from datetime import date, datetime, timedelta
 
 from bs4 import BeautifulSoup
-from requests import get
 
 from .const import HTTP_READ_TIMEOUT
+from .single_flight import SingleFlight, single_flight
+from .transport import HelenTransport, get_default_transport
 
 
 class VattenfallPriceClient:
@@ -11,9 +12,12 @@ class VattenfallPriceClient:
     DAILY_AVERAGE_PRICES_URL = "https://www.vattenfall.fi/api/price/spot/average/{start_date}/{end_date}?lang=fi"
     HEADERS = {'User-Agent': 'Mozilla/5.0'}
 
+    def __init__(self, transport: HelenTransport = None):
+        self._transport = get_default_transport() if transport is None else transport
+
     def get_hourly_prices_for_day(self, day: date):
         url = self.HOURLY_PRICES_URL.format(date=day)
-        response = get(url, headers=self.HEADERS)
+        response = self._transport.get(url, headers=self.HEADERS)
         if response.status_code == 200:
             return response.json()
         else:
@@ -21,7 +25,7 @@ class VattenfallPriceClient:
 
     def get_daily_average_prices_between_dates(self, start_date: date, end_date: date):
         url = self.DAILY_AVERAGE_PRICES_URL.format(start_date=start_date, end_date=end_date)
-        response = get(url, headers=self.HEADERS)
+        response = self._transport.get(url, headers=self.HEADERS)
         if response.status_code == 200:
             return response.json()
         else:
@@ -54,6 +58,11 @@ class HelenPriceClient:
     _helen_market_price_prices: HelenMarketPrices = None
     _helen_exchange_prices: HelenExchangePrices = None
 
+    def __init__(self, transport: HelenTransport = None):
+        self._transport = get_default_transport() if transport is None else transport
+        # Concurrent scrapes of the same page wait for one request
+        self._single_flight = SingleFlight()
+
     def _are_market_price_prices_valid(self):
         return self._is_helen_prices_valid(self._helen_market_price_prices)
 
@@ -69,10 +78,11 @@ class HelenPriceClient:
         were_market_prices_scraped_within_hour = now - timedelta(hours=1) <= helen_prices.timestamp <= now
         return were_market_prices_scraped_within_hour
 
+    @single_flight(lambda self: self._single_flight)
     def _scrape_market_price_prices(self):
         kwh_substring = " c/kWh"
 
-        price_site_response = get(self.MARKET_PRICE_ELECTRICITY_URL, timeout=HTTP_READ_TIMEOUT)
+        price_site_response = self._transport.get(self.MARKET_PRICE_ELECTRICITY_URL, timeout=HTTP_READ_TIMEOUT)
         price_site_soup = BeautifulSoup(price_site_response.text, "html.parser")
 
         element = price_site_soup.select_one(f'td:-soup-contains("{kwh_substring}")')
@@ -106,8 +116,9 @@ class HelenPriceClient:
         self._helen_market_price_prices = HelenMarketPrices(last_month_price, current_month_price, next_month_price)
         return self._helen_market_price_prices
 
+    @single_flight(lambda self: self._single_flight)
     def _scrape_exchange_prices(self):
-        price_site_response = get(self.EXCHANGE_ELECTRICITY_URL, timeout=HTTP_READ_TIMEOUT)
+        price_site_response = self._transport.get(self.EXCHANGE_ELECTRICITY_URL, timeout=HTTP_READ_TIMEOUT)
         price_site_soup = BeautifulSoup(price_site_response.text, "html.parser")
 
         element = price_site_soup.select_one('span.product-info-block__data--price')
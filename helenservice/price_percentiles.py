@@ -0,0 +1,83 @@
+import math
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+
+from .spot_price_index import SpotPriceIndex
+
+
+class PricePercentileIndex:
+    """Order statistics of spot prices over many days, e.g. the last 90 days.
+
+    All prices are kept in one sorted array, so rank and percentile queries are binary searches
+    and quantiles are looked up by position. The prices of a day are inserted into the array in
+    place as the day arrives, and adding a day again replaces its prices. Missing prices are left out.
+    """
+
+    def __init__(self, vat: bool = True, max_days: int = None):
+        """
+        Args:
+            vat: Use the prices with VAT (default: True)
+            max_days: Keep only this many of the latest days, dropping older days as new days are
+                added (default: keep all days)
+        """
+        self._vat = vat
+        self._max_days = max_days
+        self._sorted_prices = array("d")
+        self._prices_by_day: dict[date, list[float]] = {}
+
+    @property
+    def days(self) -> list[date]:
+        return sorted(self._prices_by_day)
+
+    def __len__(self):
+        return len(self._sorted_prices)
+
+    def add_day(self, day: date, prices: SpotPriceIndex):
+        """Add or replace the prices of a day."""
+        if day in self._prices_by_day:
+            self.remove_day(day)
+        values = prices.prices_vat if self._vat else prices.prices
+        day_prices = [value for value in values if not math.isnan(value)]
+        self._prices_by_day[day] = day_prices
+        for price in day_prices:
+            insort(self._sorted_prices, price)
+        if self._max_days is not None:
+            for old_day in self.days[: -self._max_days]:
+                self.remove_day(old_day)
+
+    def remove_day(self, day: date):
+        """Remove the prices of a day, if it has been added."""
+        for price in self._prices_by_day.pop(day, ()):
+            del self._sorted_prices[bisect_left(self._sorted_prices, price)]
+
+    def rank(self, price: float) -> int:
+        """Get the number of prices lower than the given price."""
+        return bisect_left(self._sorted_prices, price)
+
+    def percentile_of(self, price: float) -> float:
+        """Get the percentage (0-100) of prices that are lower than or equal to the given price."""
+        self._check_not_empty()
+        return bisect_right(self._sorted_prices, price) / len(self._sorted_prices) * 100
+
+    def is_among_cheapest(self, price: float, percent: float) -> bool:
+        """Tell whether the price is within the cheapest `percent` percent of the prices, e.g. 20."""
+        return self.percentile_of(price) <= percent
+
+    def quantile(self, q: float) -> float:
+        """Get the q-quantile (0-1) of the prices, interpolating linearly between the closest prices."""
+        self._check_not_empty()
+        if not 0 <= q <= 1:
+            raise ValueError("Quantile must be between 0 and 1")
+        position = q * (len(self._sorted_prices) - 1)
+        lower_index = math.floor(position)
+        upper_index = min(lower_index + 1, len(self._sorted_prices) - 1)
+        lower = self._sorted_prices[lower_index]
+        return lower + (self._sorted_prices[upper_index] - lower) * (position - lower_index)
+
+    def median(self) -> float:
+        return self.quantile(0.5)
+
+    def _check_not_empty(self):
+        if not self._sorted_prices:
+            raise ValueError("No prices have been added")
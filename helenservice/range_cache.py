@@ -0,0 +1,46 @@
+from datetime import date
+
+from .api_response import MeasurementsWithSpotPriceResponse
+from .cache_policy import CachePolicy, PolicyCache
+from .metrics import HelenMetrics
+
+
+class DayRangeCache:
+    """In-memory cache for measurements split into Helsinki calendar days.
+
+    Entries are keyed by GSRN, resolution and day, so any date range can be assembled from
+    previously fetched days regardless of the ranges the days were originally fetched with.
+    Each day expires according to the cache policy, so complete days that do not change anymore
+    are kept until they are evicted by newer entries.
+    """
+
+    def __init__(
+        self, maxsize: int = 4096, cache_policy: CachePolicy = None, name: str = None, metrics: HelenMetrics = None
+    ):
+        self._cache = PolicyCache(maxsize, cache_policy, name=name, metrics=metrics)
+
+    def get_days(
+        self, gsrn: str, resolution: str, days: list[date], stale_days: list[date] = None
+    ) -> dict[date, MeasurementsWithSpotPriceResponse]:
+        """Get the cached measurements of the given days. Days that are not cached are left out.
+
+        If a `stale_days` list is given, expired days that can still be served while they are
+        revalidated are returned too and added to the list. Otherwise they are left out.
+        """
+        found_days = {}
+        for day in days:
+            response, is_stale = self._cache.get((str(gsrn), resolution, day))
+            if response is None or (is_stale and stale_days is None):
+                continue
+            if is_stale:
+                stale_days.append(day)
+            found_days[day] = response
+        return found_days
+
+    def put_days(self, gsrn: str, resolution: str, days: dict[date, MeasurementsWithSpotPriceResponse]):
+        """Cache the measurements of the given days, replacing any previously cached data."""
+        for day, response in days.items():
+            self._cache.put((str(gsrn), resolution, day), response, day, response.is_complete())
+
+    def clear(self):
+        self._cache.clear()
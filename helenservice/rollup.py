@@ -0,0 +1,116 @@
+import math
+from array import array
+from datetime import date
+
+from .api_response import MEASUREMENT_VALUE_FIELDS, MeasurementsWithSpotPriceResponse
+from .const import RESOLUTION_DAY, RESOLUTION_HOUR, RESOLUTION_MONTH
+from .utils import get_local_date_of_epoch, get_local_day_bounds, parse_utc_timestamp_to_epoch
+
+# Values that are summed into a bucket, the rest are averaged
+SUMMED_FIELDS = ("electricity",)
+PRICE_FIELDS = ("electricity_spot_prices_vat", "electricity_spot_prices")
+
+
+def roll_up_measurements(
+    measurements: MeasurementsWithSpotPriceResponse, resolution: str, weight_prices_by_consumption: bool = False
+) -> MeasurementsWithSpotPriceResponse:
+    """Aggregate measurements of a finer resolution into hour, day or month buckets.
+
+    Buckets follow Helsinki calendar boundaries, so days are 23 or 25 hours long when daylight
+    saving time starts or ends. Consumption is summed and the other values are averaged over the
+    entries that have a value. Like the API, spot prices are averaged as such by default; pass
+    `weight_prices_by_consumption` to weight them by the consumption of each entry instead.
+    Buckets at the edges are clipped to the range of the given measurements.
+
+    Args:
+        measurements: Measurements of a finer resolution than `resolution`, e.g. "quarter"
+        resolution: The resolution to roll up to, "hour", "day" or "month"
+        weight_prices_by_consumption: Weight the spot prices by consumption (default: False)
+
+    Returns:
+        A new MeasurementsWithSpotPriceResponse of the given resolution.
+    """
+    if resolution not in (RESOLUTION_HOUR, RESOLUTION_DAY, RESOLUTION_MONTH):
+        raise ValueError(f"Cannot roll up measurements to resolution '{resolution}'")
+
+    range_start = parse_utc_timestamp_to_epoch(measurements.start)
+    range_stop = parse_utc_timestamp_to_epoch(measurements.stop)
+    starts = array("q")
+    stops = array("q")
+    columns = {field: array("d") for field in MEASUREMENT_VALUE_FIELDS}
+    source_starts = measurements.starts
+    source_columns = [(field, measurements.columns[field]) for field in MEASUREMENT_VALUE_FIELDS]
+    consumptions = measurements.columns["electricity"]
+
+    bucket_start = bucket_stop = None
+    first_index = 0
+    for index in range(len(source_starts) + 1):
+        if index < len(source_starts) and bucket_stop is not None and source_starts[index] < bucket_stop:
+            continue
+        if bucket_stop is not None:
+            starts.append(max(bucket_start, range_start))
+            stops.append(min(bucket_stop, range_stop))
+            for field, column in source_columns:
+                if field in SUMMED_FIELDS:
+                    value = _sum(column, first_index, index)
+                elif field in PRICE_FIELDS and weight_prices_by_consumption:
+                    value = _weighted_average(column, consumptions, first_index, index)
+                else:
+                    value = _average(column, first_index, index)
+                columns[field].append(value)
+        if index < len(source_starts):
+            bucket_start, bucket_stop = _get_bucket_bounds(source_starts[index], resolution)
+            first_index = index
+
+    return MeasurementsWithSpotPriceResponse.from_columns(
+        measurements.start,
+        measurements.stop,
+        resolution,
+        dict(measurements.units),
+        dict(measurements.ids),
+        starts,
+        stops,
+        columns,
+    )
+
+
+def _get_bucket_bounds(epoch: int, resolution: str) -> tuple[int, int]:
+    """Get the epoch start (inclusive) and stop (exclusive) of the Helsinki hour, day or month of a moment."""
+    if resolution == RESOLUTION_HOUR:
+        # Helsinki is offset from UTC by whole hours, so its hours start on UTC hours
+        bucket_start = epoch - epoch % 3600
+        return bucket_start, bucket_start + 3600
+    day = get_local_date_of_epoch(epoch)
+    if resolution == RESOLUTION_DAY:
+        bucket_start, bucket_stop = get_local_day_bounds(day)
+    else:
+        next_month = date(day.year + 1, 1, 1) if day.month == 12 else date(day.year, day.month + 1, 1)
+        bucket_start, _ = get_local_day_bounds(day.replace(day=1))
+        bucket_stop, _ = get_local_day_bounds(next_month)
+    return int(bucket_start.timestamp()), int(bucket_stop.timestamp())
+
+
+def _sum(column: array, first_index: int, last_index: int) -> float:
+    values = [value for value in column[first_index:last_index] if not math.isnan(value)]
+    return math.fsum(values) if values else math.nan
+
+
+def _average(column: array, first_index: int, last_index: int) -> float:
+    values = [value for value in column[first_index:last_index] if not math.isnan(value)]
+    return math.fsum(values) / len(values) if values else math.nan
+
+
+def _weighted_average(column: array, weights: array, first_index: int, last_index: int) -> float:
+    """Average weighted by the absolute weights. Falls back to the plain average if there is nothing to weight by."""
+    total_weight = 0.0
+    total = 0.0
+    for index in range(first_index, last_index):
+        value = column[index]
+        weight = weights[index]
+        if math.isnan(value) or math.isnan(weight):
+            continue
+        total_weight += abs(weight)
+        total += value * abs(weight)
+    if total_weight == 0:
+        return _average(column, first_index, last_index)
+    return total / total_weight
@@ -0,0 +1,147 @@
+import heapq
+import math
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+from typing import Union
+
+from .spot_price_index import Moment, SpotPriceIndex, SpotPriceSpan, to_epoch
+
+# How long something runs, as a timedelta or as a number of price intervals
+Duration = Union[timedelta, int]
+
+
+class ScheduledRun:
+    """The price intervals chosen for a run, in chronological order, and their prices (c/kWh)"""
+
+    def __init__(self, spans: list[SpotPriceSpan], total_price: float):
+        self.spans = spans
+        self.total_price = total_price
+        self.average_price = total_price / len(spans)
+
+    @property
+    def start(self) -> int:
+        return self.spans[0].start
+
+    @property
+    def stop(self) -> int:
+        return self.spans[-1].stop
+
+
+class Appliance:
+    """Something to run on the cheapest prices, e.g. EV charging or water heating.
+
+    Args:
+        name: Name of the appliance, used as the key of its schedule
+        duration: How long it runs
+        earliest: When it can start at the earliest (default: any time)
+        deadline: When it has to be done at the latest (default: any time)
+        contiguous: Whether it has to run in one go, or can run in any intervals (default: True)
+    """
+
+    def __init__(
+        self, name: str, duration: Duration, earliest: Moment = None, deadline: Moment = None, contiguous: bool = True
+    ):
+        self.name = name
+        self.duration = duration
+        self.earliest = earliest
+        self.deadline = deadline
+        self.contiguous = contiguous
+
+
+class PriceScheduler:
+    """Finds the cheapest times to run things on spot prices.
+
+    Prefix sums of the prices and the lengths of gapless runs of priced intervals are computed once,
+    so finding the cheapest contiguous window is a single O(n) sliding window pass however long the
+    window is, and many appliances can be scheduled on the same prices in one batch. Intervals without
+    a price are never chosen, and windows do not span gaps between intervals.
+    """
+
+    def __init__(self, prices: SpotPriceIndex, vat: bool = True):
+        """
+        Args:
+            prices: The spot prices, e.g. from HelenApiClient.get_spot_price_index
+            vat: Compare the prices with VAT (default: True)
+        """
+        self._prices = prices
+        self._values = prices.prices_vat if vat else prices.prices
+        # Sum of the prices before each interval, and how many priced intervals end at each interval without gaps
+        self._prefix_sums = [0.0]
+        self._run_lengths = []
+        previous_stop = None
+        for start, stop, value in zip(prices.starts, prices.stops, self._values):
+            if math.isnan(value):
+                self._prefix_sums.append(self._prefix_sums[-1])
+                self._run_lengths.append(0)
+            else:
+                self._prefix_sums.append(self._prefix_sums[-1] + value)
+                is_continued = previous_stop == start and self._run_lengths and self._run_lengths[-1] > 0
+                self._run_lengths.append(self._run_lengths[-1] + 1 if is_continued else 1)
+            previous_stop = stop
+
+    def find_cheapest_window(
+        self, duration: Duration, earliest: Moment = None, deadline: Moment = None
+    ) -> ScheduledRun:
+        """Find the cheapest contiguous run of the given duration that starts at `earliest` or later and
+        ends by `deadline`. Returns None if no run fits."""
+        interval_count = self._get_interval_count(duration)
+        first_index, last_index = self._get_index_range(earliest, deadline)
+        best_total = math.inf
+        best_index = None
+        for index in range(first_index + interval_count - 1, last_index):
+            if self._run_lengths[index] < interval_count:
+                continue
+            total = self._prefix_sums[index + 1] - self._prefix_sums[index + 1 - interval_count]
+            if total < best_total:
+                best_total = total
+                best_index = index + 1 - interval_count
+        if best_index is None:
+            return None
+        return self._create_run(range(best_index, best_index + interval_count), best_total)
+
+    def find_cheapest_intervals(
+        self, duration: Duration, earliest: Moment = None, deadline: Moment = None
+    ) -> ScheduledRun:
+        """Find the cheapest intervals, not necessarily contiguous, that add up to the given duration
+        between `earliest` and `deadline`. Returns None if there are not enough priced intervals."""
+        interval_count = self._get_interval_count(duration)
+        first_index, last_index = self._get_index_range(earliest, deadline)
+        priced_indexes = (index for index in range(first_index, last_index) if not math.isnan(self._values[index]))
+        cheapest_indexes = heapq.nsmallest(interval_count, priced_indexes, key=self._values.__getitem__)
+        if len(cheapest_indexes) < interval_count:
+            return None
+        cheapest_indexes.sort()
+        return self._create_run(cheapest_indexes, math.fsum(self._values[index] for index in cheapest_indexes))
+
+    def schedule(self, appliances: list[Appliance]) -> dict[str, ScheduledRun]:
+        """Find the cheapest run of each appliance independently. Runs are None for appliances that do not fit."""
+        return {
+            appliance.name: (
+                self.find_cheapest_window(appliance.duration, appliance.earliest, appliance.deadline)
+                if appliance.contiguous
+                else self.find_cheapest_intervals(appliance.duration, appliance.earliest, appliance.deadline)
+            )
+            for appliance in appliances
+        }
+
+    def _get_interval_count(self, duration: Duration) -> int:
+        if isinstance(duration, timedelta):
+            if not self._prices.starts:
+                return 1
+            interval_length = self._prices.stops[0] - self._prices.starts[0]
+            interval_count = math.ceil(duration.total_seconds() / interval_length)
+        else:
+            interval_count = duration
+        if interval_count < 1:
+            raise ValueError("Duration must be at least one interval")
+        return interval_count
+
+    def _get_index_range(self, earliest: Moment, deadline: Moment) -> tuple[int, int]:
+        """Get the range of indexes of the intervals that start at `earliest` or later and end by `deadline`."""
+        first_index = 0 if earliest is None else bisect_left(self._prices.starts, to_epoch(earliest))
+        last_index = len(self._prices) if deadline is None else bisect_right(self._prices.stops, to_epoch(deadline))
+        return first_index, last_index
+
+    def _create_run(self, indexes, total_price: float) -> ScheduledRun:
+        spans = [self._prices.get_span(index) for index in indexes]
+        return ScheduledRun(spans, total_price)
@@ -0,0 +1,240 @@
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from requests import RequestException
+
+from .api_client import HelenApiClient
+from .api_exceptions import HelenAuthenticationException, InvalidApiResponseException, InvalidDeliverySiteException
+from .const import RESOLUTION_HOUR
+from .metrics import get_default_metrics
+from .price_client import HelenPriceClient
+from .utils import json_serializer
+
+
+class HelenService:
+    """The operations of HelenApiClient and HelenPriceClient exposed by the serve mode.
+
+    All requests share one logged in client, and so also its session and caches. The session is
+    renewed with the given credentials when it expires.
+    """
+
+    def __init__(
+        self,
+        api_client: HelenApiClient,
+        price_client: HelenPriceClient,
+        username: str = None,
+        password: str = None,
+        session_file: str = None,
+    ):
+        self._api_client = api_client
+        self._price_client = price_client
+        self._username = username
+        self._password = password
+        self._session_file = session_file
+        self._login_lock = threading.Lock()
+        self.routes = {
+            "/health": self.get_health,
+            "/contracts": self.get_contracts,
+            "/delivery-sites": self.get_delivery_sites,
+            "/contract": self.get_contract,
+            "/measurements": self.get_measurements,
+            "/spot-prices": self.get_spot_prices,
+            "/usage-cost-summary": self.get_usage_cost_summary,
+            "/transfer-fees": self.get_transfer_fees,
+            "/prices/market": self.get_market_prices,
+            "/prices/exchange": self.get_exchange_prices,
+            "/stats": self.get_stats,
+        }
+
+    def login(self):
+        """Login, or restore the session from the session file if it is still valid"""
+        with self._login_lock:
+            self._api_client.login_and_init(self._username, self._password, self._session_file)
+
+    def ensure_session(self):
+        """Login again if the session has expired"""
+        if self._api_client.is_session_valid():
+            return
+        with self._login_lock:
+            if not self._api_client.is_session_valid():
+                logging.info("Oma Helen session has expired. Logging in again")
+                self._api_client.login_and_init(self._username, self._password, self._session_file)
+
+    def get_health(self, params: dict):
+        return {"status": "ok", "session_valid": self._api_client.is_session_valid()}
+
+    def get_contracts(self, params: dict):
+        return self._api_client.get_contract_data_json()
+
+    def get_delivery_sites(self, params: dict):
+        return {
+            "delivery_site_ids": self._api_client.get_all_delivery_site_ids(),
+            "gsrn_ids": self._api_client.get_all_gsrn_ids(),
+        }
+
+    def get_contract(self, params: dict):
+        gsrn = _get_param(params, "gsrn")
+        return {
+            "contract_type": self._api_client.get_contract_type(gsrn),
+            "base_price": self._api_client.get_contract_base_price(gsrn),
+            "energy_unit_price": self._api_client.get_contract_energy_unit_price(gsrn),
+            "transfer_fee": self._api_client.get_transfer_fee(gsrn),
+            "transfer_base_price": self._api_client.get_transfer_base_price(gsrn),
+        }
+
+    def get_measurements(self, params: dict):
+        start, end = _get_date_range_params(params)
+        resolution = _get_param(params, "resolution", RESOLUTION_HOUR)
+        return self._api_client.get_measurements_with_spot_prices(start, end, resolution, _get_param(params, "gsrn"))
+
+    def get_spot_prices(self, params: dict):
+        return self._api_client.get_spot_prices_from_chart_data(_get_date_param(params, "date"))
+
+    def get_usage_cost_summary(self, params: dict):
+        start, end = _get_date_range_params(params)
+        resolution = _get_param(params, "resolution", RESOLUTION_HOUR)
+        return self._api_client.calculate_usage_cost_summary_between_dates(
+            start, end, resolution, _get_param(params, "gsrn")
+        )
+
+    def get_transfer_fees(self, params: dict):
+        start, end = _get_date_range_params(params)
+        return {
+            "transfer_fees": self._api_client.calculate_transfer_fees_between_dates(
+                start, end, _get_param(params, "gsrn")
+            )
+        }
+
+    def get_market_prices(self, params: dict):
+        return self._price_client.get_market_price_prices()
+
+    def get_exchange_prices(self, params: dict):
+        return self._price_client.get_exchange_prices()
+
+    def get_stats(self, params: dict):
+        return get_default_metrics().snapshot()
+
+
+def _get_param(params: dict, name: str, default: str = None) -> str:
+    values = params.get(name)
+    return values[0] if values else default
+
+
+def _get_date_param(params: dict, name: str) -> date:
+    value = _get_param(params, name)
+    if value is None:
+        raise ValueError(f"Missing query parameter '{name}'")
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f"Query parameter '{name}' should be a date in format 'YYYY-mm-dd'") from None
+
+
+def _get_date_range_params(params: dict) -> tuple[date, date]:
+    start = _get_date_param(params, "start")
+    end = _get_date_param(params, "end")
+    if start > end:
+        raise ValueError("Start date must be before end date")
+    return start, end
+
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class HelenRequestHandler(BaseHTTPRequestHandler):
+    server_version = "oma-helen-cli"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/metrics":
+            self._send(HTTPStatus.OK, get_default_metrics().to_prometheus().encode(), PROMETHEUS_CONTENT_TYPE)
+            return
+        route = self.server.helen_service.routes.get(url.path.rstrip("/") or "/")
+        if route is None:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": f"Unknown path {url.path}"})
+            return
+        try:
+            if route not in (self.server.helen_service.get_health, self.server.helen_service.get_stats):
+                self.server.helen_service.ensure_session()
+            result = route(parse_qs(url.query))
+        # requests' JSONDecodeError is also a ValueError, so upstream failures are handled first
+        except (RequestException, InvalidApiResponseException, HelenAuthenticationException) as e:
+            logging.exception("Request to Oma Helen failed")
+            self._send_json(HTTPStatus.BAD_GATEWAY, {"error": str(e)})
+        except (ValueError, InvalidDeliverySiteException) as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+        except Exception:
+            logging.exception("Handling %s failed", url.path)
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Internal server error"})
+        else:
+            self._send_json(HTTPStatus.OK, result)
+
+    def _send_json(self, status: HTTPStatus, body):
+        self._send(status, json.dumps(body, default=json_serializer).encode(), "application/json")
+
+    def _send(self, status: HTTPStatus, payload: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        logging.info("%s - %s", self.address_string(), format % args)
+
+
+class HelenHTTPServer(HTTPServer):
+    """HTTP server that handles requests on a bounded pool of worker threads"""
+
+    def __init__(self, server_address: tuple, helen_service: HelenService, max_workers: int = 8):
+        super().__init__(server_address, HelenRequestHandler)
+        self.helen_service = helen_service
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="helen-serve")
+
+    def process_request(self, request, client_address):
+        self._executor.submit(self._process_request_in_worker, request, client_address)
+
+    def _process_request_in_worker(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=True)
+
+
+def serve(
+    username: str,
+    password: str,
+    session_file: str = None,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    max_workers: int = 8,
+):
+    """Login to Oma Helen and serve the API as JSON endpoints until interrupted."""
+    api_client = HelenApiClient()
+    price_client = HelenPriceClient()
+    helen_service = HelenService(api_client, price_client, username, password, session_file)
+    helen_service.login()
+    try:
+        api_client.set_margin(price_client.get_exchange_prices().margin)
+    except Exception as e:
+        logging.warning("Could not look up the exchange margin, using the default margin: %s", e)
+    server = HelenHTTPServer((host, port), helen_service, max_workers)
+    print(f"Serving Oma Helen API on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
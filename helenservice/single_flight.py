@@ -0,0 +1,57 @@
+import functools
+import threading
+from concurrent.futures import Future
+
+from cachetools.keys import hashkey
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one call.
+
+    The first caller of a key runs the function, and callers that arrive while it is still running
+    wait for it and get the same result or exception. Once the call has finished, the next caller
+    of the key runs the function again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict = {}
+
+    def do(self, key, function, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = Future()
+        if not is_leader:
+            return call.result()
+
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+def single_flight(group):
+    """Decorator that coalesces concurrent calls of a method with equal arguments.
+
+    Use it under `cachedmethod` so that concurrent cache misses of the same key send only one
+    upstream request, e.g. `single_flight(lambda self: self._single_flight)`.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = (method.__name__, hashkey(*args, **kwargs))
+            return group(self).do(key, method, self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
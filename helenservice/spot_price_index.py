@@ -0,0 +1,143 @@
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from typing import Union
+
+from .api_response import MeasurementsWithSpotPriceResponse, SpotPriceChartResponse
+from .utils import HELSINKI_TZ, parse_utc_timestamp_to_epoch
+
+# A moment as an aware datetime, a naive Helsinki time or epoch seconds
+Moment = Union[datetime, int, float]
+
+
+class SpotPriceSpan:
+    """The spot prices (c/kWh) of one interval from `start` (inclusive) to `stop` (exclusive) in epoch seconds"""
+
+    __slots__ = ("start", "stop", "price", "price_vat")
+
+    def __init__(self, start: int, stop: int, price: float = None, price_vat: float = None):
+        self.start = start
+        self.stop = stop
+        self.price = price
+        self.price_vat = price_vat
+
+    @property
+    def start_time(self) -> datetime:
+        return datetime.fromtimestamp(self.start, timezone.utc)
+
+    @property
+    def stop_time(self) -> datetime:
+        return datetime.fromtimestamp(self.stop, timezone.utc)
+
+
+class SpotPriceIndex:
+    """Spot prices indexed by time for fast lookups.
+
+    The timestamps are parsed once into epoch second arrays, so finding the price at a moment is
+    a binary search and slicing by time does not parse or compare timestamp strings. Missing
+    prices are stored as NaN and returned as None.
+    """
+
+    def __init__(self, starts: array, stops: array, prices: array, prices_vat: array):
+        self.starts = starts
+        self.stops = stops
+        self.prices = prices
+        self.prices_vat = prices_vat
+
+    @classmethod
+    def from_chart_response(cls, response: SpotPriceChartResponse) -> "SpotPriceIndex":
+        starts = array("q")
+        stops = array("q")
+        prices = array("d")
+        prices_vat = array("d")
+        for entry in response.series:
+            starts.append(parse_utc_timestamp_to_epoch(entry.start))
+            stops.append(parse_utc_timestamp_to_epoch(entry.stop))
+            prices.append(math.nan if entry.electricity_spot_prices is None else entry.electricity_spot_prices)
+            prices_vat.append(
+                math.nan if entry.electricity_spot_prices_vat is None else entry.electricity_spot_prices_vat
+            )
+        return cls(starts, stops, prices, prices_vat)
+
+    @classmethod
+    def from_measurements(cls, response: MeasurementsWithSpotPriceResponse) -> "SpotPriceIndex":
+        """Index the spot prices of measurements. The columns of the response are shared, not copied."""
+        return cls(
+            response.starts,
+            response.stops,
+            response.columns["electricity_spot_prices"],
+            response.columns["electricity_spot_prices_vat"],
+        )
+
+    @classmethod
+    def concat(cls, indexes: list["SpotPriceIndex"]) -> "SpotPriceIndex":
+        """Combine indexes of consecutive time ranges, e.g. of consecutive days."""
+        combined = cls(array("q"), array("q"), array("d"), array("d"))
+        for index in indexes:
+            combined.starts.extend(index.starts)
+            combined.stops.extend(index.stops)
+            combined.prices.extend(index.prices)
+            combined.prices_vat.extend(index.prices_vat)
+        return combined
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self) -> Iterator[SpotPriceSpan]:
+        for index in range(len(self.starts)):
+            yield self.get_span(index)
+
+    def find_index(self, moment: Moment) -> int:
+        """Get the index of the interval that contains the moment, or -1 if no interval contains it."""
+        epoch = to_epoch(moment)
+        index = bisect_right(self.starts, epoch) - 1
+        if index < 0 or epoch >= self.stops[index]:
+            return -1
+        return index
+
+    def price_at(self, moment: Moment, vat: bool = True) -> float:
+        """Get the spot price (c/kWh) at a moment, with or without VAT. Returns None if there is no price."""
+        index = self.find_index(moment)
+        if index < 0:
+            return None
+        price = (self.prices_vat if vat else self.prices)[index]
+        return None if math.isnan(price) else price
+
+    def span_at(self, moment: Moment) -> SpotPriceSpan:
+        """Get the interval that contains the moment, or None."""
+        index = self.find_index(moment)
+        return None if index < 0 else self.get_span(index)
+
+    def slice(self, start: Moment = None, stop: Moment = None) -> "SpotPriceIndex":
+        """Get the intervals that overlap the time range from `start` (inclusive) to `stop` (exclusive)."""
+        first_index = 0 if start is None else bisect_right(self.stops, to_epoch(start))
+        last_index = len(self.starts) if stop is None else bisect_left(self.starts, to_epoch(stop))
+        last_index = max(first_index, last_index)
+        return SpotPriceIndex(
+            self.starts[first_index:last_index],
+            self.stops[first_index:last_index],
+            self.prices[first_index:last_index],
+            self.prices_vat[first_index:last_index],
+        )
+
+    def get_span(self, index: int) -> SpotPriceSpan:
+        """Get the interval at the given position."""
+        price = self.prices[index]
+        price_vat = self.prices_vat[index]
+        return SpotPriceSpan(
+            self.starts[index],
+            self.stops[index],
+            None if math.isnan(price) else price,
+            None if math.isnan(price_vat) else price_vat,
+        )
+
+
+def to_epoch(moment: Moment) -> float:
+    """Convert a moment into epoch seconds. Naive datetimes are taken as Helsinki time."""
+    if isinstance(moment, datetime):
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=HELSINKI_TZ)
+        return moment.timestamp()
+    return moment
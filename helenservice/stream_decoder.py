@@ -0,0 +1,128 @@
+import codecs
+import json
+from collections.abc import Iterable, Iterator
+from typing import Union
+
+from .api_exceptions import InvalidApiResponseException
+from .api_response import MeasurementsWithSpotPriceResponse
+
+_WHITESPACE = " \t\n\r"
+
+# Response attributes that can be read from the top level object of a chart-data response
+_RESPONSE_FIELDS = (
+    "start",
+    "stop",
+    "resolution",
+    "units",
+    "ids",
+    "data_start_times",
+    "data_stop_times",
+    "missing_series",
+)
+
+
+class _JsonStreamReader:
+    """Reads JSON values one by one from a stream of text chunks.
+
+    Only the unread tail of the stream and the next chunk are kept in memory.
+    """
+
+    def __init__(self, chunks: Iterable[Union[str, bytes]]):
+        self._chunks = iter(chunks)
+        self._utf8_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        self._exhausted = False
+
+    def _read_chunk(self) -> bool:
+        """Append the next chunk to the unread tail of the buffer. Returns False at the end of the stream."""
+        if self._exhausted:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._exhausted = True
+            chunk = self._utf8_decoder.decode(b"", final=True)
+        elif isinstance(chunk, bytes):
+            chunk = self._utf8_decoder.decode(chunk)
+        self._buffer = self._buffer[self._position :] + chunk
+        self._position = 0
+        return True
+
+    def peek(self) -> str:
+        """Get the next character that is not whitespace without consuming it."""
+        while True:
+            while self._position < len(self._buffer) and self._buffer[self._position] in _WHITESPACE:
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._read_chunk():
+                raise InvalidApiResponseException("Response ended before the JSON document was complete")
+
+    def expect(self, character: str):
+        if self.peek() != character:
+            raise InvalidApiResponseException(
+                f"Expected '{character}' but found '{self._buffer[self._position]}' in the response"
+            )
+        self._position += 1
+
+    def skip_if(self, character: str) -> bool:
+        if self.peek() == character:
+            self._position += 1
+            return True
+        return False
+
+    def read_value(self):
+        """Decode the next JSON value. If the value is cut by the end of the buffer, more chunks are read."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError as e:
+                if self._read_chunk():
+                    continue
+                raise InvalidApiResponseException(f"Response is not valid JSON: {e}") from e
+            # A number or a literal at the end of the buffer may continue in the next chunk
+            if end == len(self._buffer) and self._read_chunk():
+                continue
+            self._position = end
+            return value
+
+    def iter_array(self) -> Iterator:
+        """Decode the values of an array one by one."""
+        self.expect("[")
+        if self.skip_if("]"):
+            return
+        while True:
+            yield self.read_value()
+            if self.skip_if("]"):
+                return
+            self.expect(",")
+
+
+def decode_measurements_with_spot_prices(chunks: Iterable[Union[str, bytes]]) -> MeasurementsWithSpotPriceResponse:
+    """Decode a chart-data measurements response from a stream of chunks, e.g. `response.iter_content()`.
+
+    The series entries are decoded one at a time and appended straight into the columns of the
+    response, so the whole JSON tree is never held in memory.
+    """
+    response = MeasurementsWithSpotPriceResponse(None, None, None, {}, {}, {}, {}, [])
+    reader = _JsonStreamReader(chunks)
+    reader.expect("{")
+    if reader.skip_if("}"):
+        return response
+    while True:
+        key = reader.read_value()
+        reader.expect(":")
+        if key == "series":
+            for entry in reader.iter_array():
+                response.append_entry(entry)
+        else:
+            value = reader.read_value()
+            if key == "missing_series" and value is None:
+                value = []
+            if key in _RESPONSE_FIELDS:
+                setattr(response, key, value)
+        if reader.skip_if("}"):
+            return response
+        reader.expect(",")
@@ -0,0 +1,106 @@
+import logging
+import threading
+import time
+
+from requests import RequestException, Response, Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .const import HTTP_READ_TIMEOUT
+from .metrics import HelenMetrics, get_default_metrics, get_endpoint_name
+
+
+class HelenTransport:
+    """Shared HTTP transport for API calls.
+
+    Uses a keep-alive requests Session with a connection pool per host, so consecutive calls
+    to the same host reuse connections instead of paying a new TCP and TLS handshake. GET
+    requests are retried with exponential backoff on 429 and 5xx responses and on connection
+    errors. The transport is thread-safe and can be shared between clients, which then also
+    share its cookies. `with_own_cookies` creates a transport that shares only the pool.
+    """
+
+    RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        timeout: float = HTTP_READ_TIMEOUT,
+        metrics: HelenMetrics = None,
+        adapter: HTTPAdapter = None,
+    ):
+        """
+        Args:
+            pool_connections: How many hosts to keep connection pools for (default: 10)
+            pool_maxsize: How many connections to keep open per host (default: 10)
+            pool_block: Whether to wait for a free connection instead of opening extra connections
+                when all pooled connections of a host are in use, i.e. to enforce `pool_maxsize` as a
+                hard per-host limit (default: False)
+            max_retries: How many times a failed request is retried (default: 3)
+            backoff_factor: Backoff factor in seconds for the exponential delay between retries (default: 0.5)
+            timeout: Default timeout in seconds for requests (default: HTTP_READ_TIMEOUT)
+            metrics: Where the latency, size and retries of each request are recorded (default: the metrics
+                shared by all clients)
+            adapter: The connection pools and retry policy of another transport to share. The pool and
+                retry arguments are ignored when it is given (default: new pools)
+        """
+        self._timeout = timeout
+        self._metrics = get_default_metrics() if metrics is None else metrics
+        if adapter is None:
+            retry = Retry(
+                total=max_retries,
+                backoff_factor=backoff_factor,
+                status_forcelist=self.RETRY_STATUS_CODES,
+                allowed_methods=frozenset(["GET"]),
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block, max_retries=retry
+            )
+        self._adapter = adapter
+        self._session = Session()
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._metrics.instrument_session(self._session)
+
+    def with_own_cookies(self) -> "HelenTransport":
+        """Create a transport that shares the connection pools, retry policy and metrics of this transport,
+        but has a session and cookies of its own."""
+        return HelenTransport(timeout=self._timeout, metrics=self._metrics, adapter=self._adapter)
+
+    def get(self, url: str, params: dict = None, headers: dict = None, timeout: float = None, **kwargs) -> Response:
+        """Send a GET request through the pooled session."""
+        started = time.perf_counter()
+        try:
+            return self._session.get(
+                url, params=params, headers=headers, timeout=self._timeout if timeout is None else timeout, **kwargs
+            )
+        except RequestException:
+            # Responses are recorded by the session hook, failures without a response here
+            self._metrics.record_request(get_endpoint_name(url), time.perf_counter() - started, error=True)
+            raise
+
+    def close(self):
+        """Close all pooled connections, also those of the transports that share the pools"""
+        self._session.close()
+        logging.debug("HelenTransport was closed")
+
+
+_default_transport: HelenTransport = None
+_default_transport_lock = threading.Lock()
+
+
+def get_default_transport() -> HelenTransport:
+    """Get a transport for a client that is not given a transport of its own. The transports of all
+    such clients share one connection pool per host, but each has its own cookies, so that e.g. two
+    accounts in one process do not see each other's cookies."""
+    global _default_transport
+    with _default_transport_lock:
+        if _default_transport is None:
+            _default_transport = HelenTransport()
+    return _default_transport.with_own_cookies()
@@ -1,5 +1,14 @@
 import calendar
-from datetime import date
+import time
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from .const import CHUNK_MONTH, CHUNK_WEEK
+
+HELSINKI_TZ = ZoneInfo("Europe/Helsinki")
 
 
 def get_month_date_range_by_date(date_param: date) -> tuple[date, date]:
@@ -12,3 +21,159 @@ def get_month_date_range_by_date(date_param: date) -> tuple[date, date]:
     )
 
     return wanted_month_first_day, wanted_month_last_day
+
+
+def json_serializer(value):
+    """`default` for json.dumps that serializes the response models and prices of this library"""
+    if isinstance(value, datetime):
+        return value.strftime("%Y%m%d%H%M%S")
+    elif hasattr(value, "to_dict"):
+        return value.to_dict()
+    else:
+        return value.__dict__
+
+
+def get_local_today() -> date:
+    """
+    Get the current date in Helsinki time, which is the calendar the Oma Helen API uses.
+    """
+    return datetime.now(HELSINKI_TZ).date()
+
+
+def get_local_day_bounds(day: date) -> tuple[datetime, datetime]:
+    """
+    Get the UTC start (inclusive) and stop (exclusive) of a Helsinki calendar day.
+    Days are 23 or 25 hours long when daylight saving time starts or ends.
+    """
+    local_start = datetime.combine(day, datetime.min.time()).replace(tzinfo=HELSINKI_TZ)
+    local_stop = datetime.combine(day + timedelta(days=1), datetime.min.time()).replace(tzinfo=HELSINKI_TZ)
+    return local_start.astimezone(timezone.utc), local_stop.astimezone(timezone.utc)
+
+
+def get_utc_time_range(start_date: date, end_date: date) -> tuple[str, str]:
+    """
+    Convert a local date range to UTC midnight boundaries, matching the Oma Helen API.
+
+    The API uses midnight Helsinki time as interval boundaries. Because Helsinki is
+    UTC+2 (winter) or UTC+3 (summer), midnight of a given date in Helsinki maps to
+    21:00Z or 22:00Z of the *previous* UTC calendar day. Both start and stop use
+    this convention, producing a half-open interval [start_date, end_date+1).
+
+    Args:
+        start_date: First day of the range (inclusive)
+        end_date: Last day of the range (inclusive)
+
+    Returns:
+        tuple of (start_time, stop_time) as ISO 8601 strings with UTC offset.
+    """
+    # Midnight of start_date in Helsinki (= 21:00Z or 22:00Z of the previous UTC day)
+    utc_start, _ = get_local_day_bounds(start_date)
+    # Midnight of the day after end_date in Helsinki (exclusive upper bound)
+    _, utc_end = get_local_day_bounds(end_date)
+
+    return (utc_start.isoformat(), utc_end.isoformat())
+
+
+def parse_utc_timestamp(timestamp: str) -> datetime:
+    """
+    Parse an API timestamp such as '2025-10-06T21:00:00Z' into an aware UTC datetime.
+    """
+    return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).astimezone(timezone.utc)
+
+
+def format_utc_timestamp(value: datetime) -> str:
+    """
+    Format an aware datetime the same way the API does, e.g. '2025-10-06T21:00:00Z'.
+    """
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def parse_utc_timestamp_to_epoch(timestamp: str) -> int:
+    """
+    Parse an API timestamp such as '2025-10-06T21:00:00Z' into epoch seconds.
+    """
+    if timestamp.endswith("Z"):
+        return int(datetime.fromisoformat(timestamp[:-1]).replace(tzinfo=timezone.utc).timestamp())
+    return int(parse_utc_timestamp(timestamp).timestamp())
+
+
+def format_epoch_utc_timestamp(epoch: int) -> str:
+    """
+    Format epoch seconds the same way the API formats timestamps, e.g. '2025-10-06T21:00:00Z'.
+    """
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(epoch))
+
+
+def get_local_date_of_utc_timestamp(timestamp: str) -> date:
+    """
+    Get the Helsinki calendar day an API timestamp falls on.
+    """
+    return parse_utc_timestamp(timestamp).astimezone(HELSINKI_TZ).date()
+
+
+def get_local_date_of_epoch(epoch: int) -> date:
+    """
+    Get the Helsinki calendar day of a moment given in epoch seconds.
+    """
+    return datetime.fromtimestamp(epoch, HELSINKI_TZ).date()
+
+
+def iter_dates(start_date: date, end_date: date) -> Iterator[date]:
+    """
+    Iterate over each date between the given dates (both inclusive).
+    """
+    day = start_date
+    while day <= end_date:
+        yield day
+        day += timedelta(days=1)
+
+
+def group_consecutive_dates(dates: Iterable[date]) -> list[tuple[date, date]]:
+    """
+    Group dates into (first, last) ranges of consecutive days.
+    """
+    ranges = []
+    for day in sorted(dates):
+        if ranges and ranges[-1][1] + timedelta(days=1) == day:
+            ranges[-1] = (ranges[-1][0], day)
+        else:
+            ranges.append((day, day))
+    return ranges
+
+
+def plan_date_chunks(start_date: date, end_date: date, chunk_size: str = CHUNK_MONTH) -> list[tuple[date, date]]:
+    """
+    Split a date range (both inclusive) into consecutive (first, last) chunks that end on a
+    calendar month ("month") or an ISO week ("week") boundary. Each chunk maps to Helsinki
+    midnight boundaries with get_utc_time_range.
+    """
+    if chunk_size not in (CHUNK_MONTH, CHUNK_WEEK):
+        raise ValueError(f"Unknown chunk size '{chunk_size}'. Use 'month' or 'week'")
+    chunks = []
+    chunk_start = start_date
+    while chunk_start <= end_date:
+        if chunk_size == CHUNK_MONTH:
+            _, chunk_end = get_month_date_range_by_date(chunk_start)
+        else:
+            chunk_end = chunk_start + timedelta(days=6 - chunk_start.weekday())
+        chunk_end = min(chunk_end, end_date)
+        chunks.append((chunk_start, chunk_end))
+        chunk_start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def map_ahead(function: Callable, items: Iterable, max_workers: int) -> Iterator:
+    """
+    Call the function for each item on a bounded thread pool and yield the results in the order of
+    the items. At most `max_workers` calls run ahead of the consumer, so only a few results are held
+    in memory however many items there are.
+    """
+    max_workers = max(1, max_workers)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
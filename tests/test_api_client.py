@@ -1,12 +1,18 @@
 import json
-from datetime import date
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
 from unittest.mock import Mock, patch
 
 import pytest
 
 from helenservice.api_client import HelenApiClient
+from helenservice.api_exceptions import InvalidDeliverySiteException
 from helenservice.api_response import MeasurementsWithSpotPriceResponse, SpotPriceChartResponse
+from helenservice.calculations import UsageCostSummary
 from helenservice.const import HTTP_READ_TIMEOUT, RESOLUTION_HOUR
+from helenservice.contract_index import ContractIndex
 
 
 class TestHelenApiClient:
@@ -62,7 +68,7 @@ class TestHelenApiClient:
         mock_response = Mock()
         mock_response.json.return_value = mock_measurement_spot_day_response
 
-        with patch("requests.get", return_value=mock_response) as mock_get:
+        with patch("requests.Session.get", return_value=mock_response) as mock_get:
             result = api_client.get_daily_measurements_between_dates(start_date, end_date)
 
             mock_get.assert_called_once()
@@ -85,7 +91,7 @@ class TestHelenApiClient:
         mock_response = Mock()
         mock_response.json.return_value = mock_measurement_spot_hour_response
 
-        with patch("requests.get", return_value=mock_response) as mock_get:
+        with patch("requests.Session.get", return_value=mock_response) as mock_get:
             result = api_client.get_measurements_between_dates(start_date, end_date, RESOLUTION_HOUR)
 
             mock_get.assert_called_once()
@@ -106,7 +112,7 @@ class TestHelenApiClient:
         mock_response = Mock()
         mock_response.json.return_value = mock_measurement_spot_day_response
 
-        with patch("requests.get", return_value=mock_response) as mock_get:
+        with patch("requests.Session.get", return_value=mock_response) as mock_get:
             result = api_client.get_monthly_measurements_by_year(year)
 
             mock_get.assert_called_once()
@@ -126,7 +132,7 @@ class TestHelenApiClient:
         mock_response = Mock()
         mock_response.json.return_value = mock_chart_data_response
 
-        with patch("requests.get", return_value=mock_response) as mock_get:
+        with patch("requests.Session.get", return_value=mock_response) as mock_get:
             result = api_client.get_spot_prices_from_chart_data(target_date)
 
             # Verify the request was made correctly
@@ -147,7 +153,7 @@ class TestHelenApiClient:
         mock_response = Mock()
         mock_response.json.return_value = mock_contracts_response
 
-        with patch("requests.get", return_value=mock_response) as mock_get:
+        with patch("requests.Session.get", return_value=mock_response) as mock_get:
             result = api_client.get_contract_data_json()
 
             # Verify the request was made correctly
@@ -179,7 +185,7 @@ class TestHelenApiClient:
 
         # Mock the _refresh_api_client_state method to avoid contract lookup
         with patch.object(api_client, '_refresh_api_client_state'):
-            with patch("requests.get", return_value=mock_chart_response) as mock_get:
+            with patch("requests.Session.get", return_value=mock_chart_response) as mock_get:
                 result = api_client.get_measurements_with_spot_prices(start_date, end_date, "hour")
 
             # Verify the request was made correctly
@@ -224,7 +230,7 @@ class TestHelenApiClient:
 
         # Mock the _refresh_api_client_state method to avoid contract lookup
         with patch.object(api_client, '_refresh_api_client_state'):
-            with patch("requests.get", return_value=mock_chart_response) as mock_get:
+            with patch("requests.Session.get", return_value=mock_chart_response) as mock_get:
                 result = api_client.get_measurements_with_spot_prices(start_date, end_date, "quarter")
 
             # Verify the request was made correctly
@@ -252,3 +258,174 @@ class TestHelenApiClient:
             assert hasattr(first_series, 'ambient_humidity')
             assert first_series.ambient_temperature is None
             assert first_series.ambient_humidity is None
+
+    def test_get_measurements_with_spot_prices_reuses_cached_days(
+        self, api_client, mock_measurement_spot_quarter_response
+    ):
+        """Test that overlapping ranges only fetch the days that are not cached yet."""
+        mock_response = Mock()
+        mock_response.json.return_value = mock_measurement_spot_quarter_response
+
+        with patch("requests.Session.get", return_value=mock_response) as mock_get:
+            api_client.get_measurements_with_spot_prices(date(2025, 10, 7), date(2025, 10, 7), "quarter")
+            cached = api_client.get_measurements_with_spot_prices(date(2025, 10, 7), date(2025, 10, 7), "quarter")
+            extended = api_client.get_measurements_with_spot_prices(date(2025, 10, 6), date(2025, 10, 7), "quarter")
+
+            assert mock_get.call_count == 2
+            gap_params = mock_get.call_args[1]["params"]
+            assert gap_params["start"] == "2025-10-05T21:00:00+00:00"
+            assert gap_params["stop"] == "2025-10-06T21:00:00+00:00"
+
+            assert len(cached.series) == 96
+            assert extended.start == "2025-10-05T21:00:00Z"
+            assert extended.stop == "2025-10-07T21:00:00Z"
+            assert extended.series[0].start == "2025-10-06T21:00:00Z"
+
+    def test_get_measurements_with_spot_prices_fetches_long_ranges_in_chunks(
+        self, api_client, mock_measurement_spot_quarter_response
+    ):
+        """Test that a long quarter range is fetched as one request per month."""
+        mock_response = Mock()
+        mock_response.json.return_value = mock_measurement_spot_quarter_response
+
+        with patch("requests.Session.get", return_value=mock_response) as mock_get:
+            result = api_client.get_measurements_with_spot_prices(date(2025, 8, 1), date(2025, 10, 7), "quarter")
+
+            assert mock_get.call_count == 3
+            requested_ranges = sorted(
+                (call[1]["params"]["start"], call[1]["params"]["stop"]) for call in mock_get.call_args_list
+            )
+            assert requested_ranges == [
+                ("2025-07-31T21:00:00+00:00", "2025-08-31T21:00:00+00:00"),
+                ("2025-08-31T21:00:00+00:00", "2025-09-30T21:00:00+00:00"),
+                ("2025-09-30T21:00:00+00:00", "2025-10-07T21:00:00+00:00"),
+            ]
+            assert result.start == "2025-07-31T21:00:00Z"
+            assert result.stop == "2025-10-07T21:00:00Z"
+
+    def test_iter_measurements_with_spot_prices_yields_chunks_in_order(
+        self, api_client, mock_measurement_spot_quarter_response
+    ):
+        """Test that a long quarter range is yielded one month at a time in chronological order."""
+
+        def get_chunk(url, params=None, **kwargs):
+            mock_response = Mock()
+            mock_response.json.return_value = dict(
+                mock_measurement_spot_quarter_response, start=params["start"], stop=params["stop"], series=[]
+            )
+            return mock_response
+
+        api_client._max_fetch_workers = 2
+        with patch("requests.Session.get", side_effect=get_chunk) as mock_get:
+            responses = list(
+                api_client.iter_measurements_with_spot_prices(date(2025, 8, 1), date(2025, 10, 7), "quarter")
+            )
+
+        assert mock_get.call_count == 3
+        assert [(response.start, response.stop) for response in responses] == [
+            ("2025-07-31T21:00:00+00:00", "2025-08-31T21:00:00+00:00"),
+            ("2025-08-31T21:00:00+00:00", "2025-09-30T21:00:00+00:00"),
+            ("2025-09-30T21:00:00+00:00", "2025-10-07T21:00:00+00:00"),
+        ]
+
+    def test_calculate_usage_cost_summaries_for_sites(
+        self, api_client, mock_measurement_spot_quarter_response, mock_contracts_response
+    ):
+        """Test that every site is fetched by its GSRN without changing the selected delivery site."""
+        contracts = mock_contracts_response["contracts"]
+        contracts[0]["end_date"] = None
+        api_client._contract_index = ContractIndex(contracts, datetime(2025, 10, 1))
+        selected_contract = api_client._selected_contract
+        mock_response = Mock()
+        mock_response.json.return_value = mock_measurement_spot_quarter_response
+
+        with patch.object(api_client, '_refresh_api_client_state'):
+            with patch("requests.Session.get", return_value=mock_response) as mock_get:
+                summaries = api_client.calculate_usage_cost_summaries_for_sites(
+                    date(2025, 10, 7), date(2025, 10, 7), ["654321", "643007572987654321"], "quarter"
+                )
+
+            assert mock_get.call_count == 2
+            requested_urls = sorted(call[0][0] for call in mock_get.call_args_list)
+            assert "643007572123456789" in requested_urls[0]
+            assert "643007572987654321" in requested_urls[1]
+            assert list(summaries.keys()) == ["654321", "643007572987654321"]
+            assert all(isinstance(summary, UsageCostSummary) for summary in summaries.values())
+            assert summaries["654321"].entry_count == 96
+            assert api_client._selected_contract is selected_contract
+
+            with pytest.raises(InvalidDeliverySiteException):
+                api_client.get_measurements_with_spot_prices_for_sites(
+                    date(2025, 10, 7), date(2025, 10, 7), ["1234567"]
+                )
+
+    def test_sites_and_chunks_together_stay_within_max_fetch_workers(
+        self, api_client, mock_measurement_spot_quarter_response, mock_contracts_response
+    ):
+        """Test that the chunks fetched by each site worker do not multiply the concurrent requests."""
+        contracts = mock_contracts_response["contracts"]
+        contracts[0]["end_date"] = None
+        api_client._contract_index = ContractIndex(contracts, datetime(2025, 10, 1))
+        api_client._max_fetch_workers = 2
+        api_client._fetch_semaphore = threading.BoundedSemaphore(2)
+        in_flight = []
+        peak_in_flight = []
+        lock = threading.Lock()
+
+        def get_chunk(url, params=None, **kwargs):
+            with lock:
+                in_flight.append(url)
+                peak_in_flight.append(len(in_flight))
+            time.sleep(0.02)
+            with lock:
+                in_flight.remove(url)
+            mock_response = Mock()
+            mock_response.json.return_value = dict(
+                mock_measurement_spot_quarter_response, start=params["start"], stop=params["stop"], series=[]
+            )
+            return mock_response
+
+        with patch.object(api_client, '_refresh_api_client_state'):
+            with patch("requests.Session.get", side_effect=get_chunk) as mock_get:
+                api_client.get_measurements_with_spot_prices_for_sites(
+                    date(2025, 8, 1), date(2025, 10, 7), ["643007572123456789", "643007572987654321"], "quarter"
+                )
+
+        assert mock_get.call_count == 6
+        assert max(peak_in_flight) <= 2
+
+    def test_one_client_serves_threads_with_per_call_gsrn(
+        self, api_client, mock_measurement_spot_quarter_response, mock_contracts_response
+    ):
+        """Test that threads can fetch different delivery sites in parallel through one client."""
+        contracts = mock_contracts_response["contracts"]
+        contracts[0]["end_date"] = None
+        api_client._contract_index = ContractIndex(contracts, datetime(2025, 10, 1))
+        selected_contract = api_client._selected_contract
+        gsrn_ids = ["643007572123456789", "643007572987654321"]
+        calls = [(gsrn, day) for gsrn in gsrn_ids for day in (date(2025, 10, 6), date(2025, 10, 7))]
+        all_requests_in_flight = threading.Barrier(len(calls), timeout=5)
+        requested_urls = []
+
+        def get(url, **kwargs):
+            requested_urls.append(url)
+            all_requests_in_flight.wait()
+            response = Mock()
+            response.json.return_value = mock_measurement_spot_quarter_response
+            return response
+
+        with patch.object(api_client, '_refresh_api_client_state'):
+            with patch("requests.Session.get", side_effect=get):
+                with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+                    results = list(
+                        executor.map(
+                            lambda call: api_client.get_measurements_with_spot_prices(
+                                call[1], call[1], "quarter", gsrn=call[0]
+                            ),
+                            calls,
+                        )
+                    )
+
+        assert sorted(url.split("/")[-2] for url in requested_urls) == sorted(gsrn for gsrn, _ in calls)
+        assert all(len(result.series) == 96 for result in results)
+        assert api_client._selected_contract is selected_contract
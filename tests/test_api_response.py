@@ -0,0 +1,59 @@
+import json
+import math
+
+import pytest
+
+from helenservice.api_response import MeasurementsWithSpotPriceResponse
+
+
+class TestMeasurementsWithSpotPriceResponse:
+    """Test cases for the columnar measurements response."""
+
+    @pytest.fixture
+    def mock_measurement_spot_hour_response(self):
+        """Load the test measurement with spot prices response (hourly)."""
+        with open("tests/resources/measurement_spot_hour_response.json") as f:
+            return json.load(f)
+
+    @pytest.fixture
+    def mock_measurement_spot_quarter_response(self):
+        """Load the test measurement with spot prices response (quarterly)."""
+        with open("tests/resources/measurement_spot_quarter_response.json") as f:
+            return json.load(f)
+
+    def test_columns(self, mock_measurement_spot_quarter_response):
+        """Test that values are stored in columns with NaN for missing values."""
+        response = MeasurementsWithSpotPriceResponse(**mock_measurement_spot_quarter_response)
+
+        assert len(response.starts) == len(response.stops) == 96
+        assert response.stops[0] - response.starts[0] == 15 * 60
+        assert response.columns["electricity"][0] == 1.006
+        assert response.columns["electricity_spot_prices"][0] == 14.934
+        assert math.isnan(response.columns["ambient_temperature"][0])
+
+    def test_series_view(self, mock_measurement_spot_hour_response):
+        """Test that the series view returns rows matching the API response."""
+        response = MeasurementsWithSpotPriceResponse(**mock_measurement_spot_hour_response)
+        expected_series = mock_measurement_spot_hour_response["series"]
+
+        assert len(response.series) == len(expected_series)
+        assert [entry.__dict__ for entry in response.series] == expected_series
+        assert response.series[-1].__dict__ == expected_series[-1]
+        assert [entry.start for entry in response.series[2:4]] == [entry["start"] for entry in expected_series[2:4]]
+
+    def test_missing_values_are_none_in_series_view(self, mock_measurement_spot_quarter_response):
+        """Test that NaN values are exposed as None in the series view."""
+        response = MeasurementsWithSpotPriceResponse(**mock_measurement_spot_quarter_response)
+
+        first_series = response.series[0]
+        assert first_series.ambient_temperature is None
+        assert first_series.ambient_humidity is None
+
+    def test_to_dict_round_trip(self, mock_measurement_spot_hour_response):
+        """Test that converting to a dict and back keeps the data intact."""
+        response = MeasurementsWithSpotPriceResponse(**mock_measurement_spot_hour_response)
+
+        restored = MeasurementsWithSpotPriceResponse.from_dict(json.loads(json.dumps(response.to_dict())))
+
+        assert restored.to_dict() == response.to_dict()
+        assert restored.data_start_times == mock_measurement_spot_hour_response["data_start_times"]
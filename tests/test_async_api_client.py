@@ -0,0 +1,102 @@
+import asyncio
+import json
+import threading
+from datetime import date
+from unittest.mock import Mock, patch
+
+import pytest
+
+from helenservice.api_response import SpotPriceChartResponse
+from helenservice.async_api_client import AsyncHelenApiClient
+from helenservice.cache_policy import CachePolicy
+from helenservice.transport import HelenTransport
+
+
+class TestAsyncHelenApiClient:
+    """Test cases for AsyncHelenApiClient methods."""
+
+    @pytest.fixture
+    def async_api_client(self):
+        """Create a test async API client instance."""
+        client = AsyncHelenApiClient()
+        sync_client = client.sync_client
+        sync_client._session = Mock()
+        sync_client._session.get_access_token.return_value = "mock_token"
+        sync_client._selected_delivery_site_id = "123456789"
+        sync_client._selected_contract = {
+            "delivery_site": {"id": "123456789"},
+            "domain": None,
+            "gsrn": "643007572123456789",
+        }
+        sync_client._all_active_contracts = [sync_client._selected_contract]
+        return client
+
+    @pytest.fixture
+    def mock_chart_data_response(self):
+        """Load the test chart data response."""
+        with open("tests/resources/chart_data_response.json") as f:
+            return json.load(f)
+
+    def test_get_spot_prices_from_chart_data_concurrently(self, async_api_client, mock_chart_data_response):
+        """Test that concurrently awaited requests are in flight at the same time."""
+        barrier = threading.Barrier(2, timeout=5)
+        mock_response = Mock()
+        mock_response.json.return_value = mock_chart_data_response
+
+        def get(*args, **kwargs):
+            # Both requests must reach the barrier before either of them can return
+            barrier.wait()
+            return mock_response
+
+        async def get_two_days():
+            return await asyncio.gather(
+                async_api_client.get_spot_prices_from_chart_data(date(2025, 10, 6)),
+                async_api_client.get_spot_prices_from_chart_data(date(2025, 10, 7)),
+            )
+
+        with patch("requests.Session.get", side_effect=get) as mock_get:
+            results = asyncio.run(get_two_days())
+
+            assert mock_get.call_count == 2
+            assert all(isinstance(result, SpotPriceChartResponse) for result in results)
+
+    def test_get_contract_data_json(self, async_api_client):
+        """Test that async calls share the cache of the underlying client."""
+        mock_response = Mock()
+        mock_response.json.return_value = {"contracts": [{"contract_id": "1"}]}
+
+        async def get_contract_data_twice():
+            first = await async_api_client.get_contract_data_json()
+            second = await async_api_client.get_contract_data_json()
+            return first, second
+
+        with patch("requests.Session.get", return_value=mock_response) as mock_get:
+            first, second = asyncio.run(get_contract_data_twice())
+
+            mock_get.assert_called_once()
+            assert first == second == [{"contract_id": "1"}]
+
+    def test_close_closes_the_underlying_client(self, async_api_client):
+        """Test that closing also shuts down the revalidation executor of the underlying client."""
+        sync_client = async_api_client.sync_client
+
+        asyncio.run(async_api_client.close())
+
+        sync_client._session.close.assert_called_once()
+        with pytest.raises(RuntimeError):
+            sync_client._revalidation_executor.submit(print)
+
+    def test_options_are_passed_to_the_underlying_client(self):
+        transport = Mock(spec=HelenTransport)
+        cache_policy = CachePolicy(live_ttl=60)
+
+        client = AsyncHelenApiClient(
+            margin=0.5, transport=transport, cache_policy=cache_policy, max_fetch_workers=2, roll_up_resolutions=True
+        )
+
+        sync_client = client.sync_client
+        assert sync_client._margin == 0.5
+        assert sync_client._transport is transport
+        assert sync_client._cache_policy is cache_policy
+        assert sync_client._max_fetch_workers == 2
+        assert sync_client._roll_up_resolutions
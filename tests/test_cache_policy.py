@@ -0,0 +1,104 @@
+import json
+from datetime import date
+from unittest.mock import Mock, patch
+
+import pytest
+
+from helenservice.api_client import HelenApiClient
+from helenservice.cache_policy import DATA_IMMUTABLE, DATA_LIVE, DATA_SETTLING, CachePolicy, PolicyCache
+
+TODAY = date(2025, 10, 8)
+
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCachePolicy:
+    def test_classify_day(self):
+        policy = CachePolicy()
+
+        assert policy.classify_day(date(2025, 10, 6), TODAY) == DATA_IMMUTABLE
+        assert policy.classify_day(date(2025, 10, 7), TODAY) == DATA_SETTLING
+        assert policy.classify_day(TODAY, TODAY) == DATA_LIVE
+        assert policy.classify_day(date(2025, 10, 9), TODAY) == DATA_LIVE
+
+    def test_entries_expire_by_data_class(self):
+        timer = FakeTimer()
+        cache = PolicyCache(16, CachePolicy(settling_ttl=3600, live_ttl=300, live_stale_ttl=600), timer)
+
+        with patch("helenservice.cache_policy.get_local_today", return_value=TODAY):
+            cache.put("immutable", 1, date(2025, 10, 1))
+            cache.put("settling", 2, date(2025, 10, 7))
+            cache.put("live", 3, TODAY)
+
+        timer.now += 301
+        assert cache.get("live") == (3, True)
+        assert cache.get("settling") == (2, False)
+
+        timer.now += 600
+        assert cache.get("live") == (None, False)
+
+        timer.now += 3600
+        assert cache.get("settling") == (None, False)
+        assert cache.get("immutable") == (1, False)
+
+    def test_incomplete_immutable_entries_expire_like_settling_entries(self):
+        timer = FakeTimer()
+        cache = PolicyCache(16, CachePolicy(settling_ttl=3600), timer)
+
+        with patch("helenservice.cache_policy.get_local_today", return_value=TODAY):
+            cache.put("partial", 1, date(2025, 10, 1), is_complete=False)
+
+        assert cache.get("partial") == (1, False)
+        timer.now += 3601
+        assert cache.get("partial") == (None, False)
+
+
+class TestHelenApiClientCachePolicy:
+    @pytest.fixture
+    def timer(self):
+        return FakeTimer()
+
+    @pytest.fixture
+    def api_client(self, timer):
+        client = HelenApiClient()
+        client._session = Mock()
+        client._session.get_access_token.return_value = "mock_token"
+        client._spot_price_cache = PolicyCache(16, client._cache_policy, timer)
+        return client
+
+    def _spot_price_response(self) -> Mock:
+        with open("tests/resources/chart_data_response.json") as f:
+            chart_data = json.load(f)
+        response = Mock()
+        response.json.return_value = chart_data
+        return response
+
+    def test_past_spot_prices_are_fetched_once(self, api_client, timer):
+        with patch("requests.Session.get", return_value=self._spot_price_response()) as mock_get:
+            api_client.get_spot_prices_from_chart_data(date(2025, 10, 1))
+            timer.now += 30 * 24 * 3600
+            api_client.get_spot_prices_from_chart_data(date(2025, 10, 1))
+
+        assert mock_get.call_count == 1
+
+    def test_live_spot_prices_are_revalidated_in_background(self, api_client, timer):
+        responses = [self._spot_price_response(), self._spot_price_response()]
+
+        with patch("helenservice.cache_policy.get_local_today", return_value=TODAY):
+            with patch("requests.Session.get", side_effect=responses) as mock_get:
+                first = api_client.get_spot_prices_from_chart_data(TODAY)
+                timer.now += api_client._cache_policy.live_ttl + 1
+                stale = api_client.get_spot_prices_from_chart_data(TODAY)
+                # Wait for the revalidation on the single background thread
+                api_client._revalidation_executor.submit(lambda: None).result()
+                revalidated = api_client.get_spot_prices_from_chart_data(TODAY)
+
+        assert stale is first
+        assert revalidated is not first
+        assert mock_get.call_count == 2
@@ -0,0 +1,86 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from helenservice import calculations
+from helenservice.api_response import MeasurementsWithSpotPriceResponse
+from helenservice.calculations import (
+    calculate_impact_of_usage,
+    calculate_total_consumption,
+    calculate_total_spot_cost,
+    calculate_usage_cost_summary,
+)
+
+
+class TestCalculations:
+    """Test cases for the consumption and cost calculations."""
+
+    TAX = 0.255
+    MARGIN = 0.38
+
+    @pytest.fixture
+    def measurements(self):
+        """Load the test measurement with spot prices response (hourly)."""
+        with open("tests/resources/measurement_spot_hour_response.json") as f:
+            return MeasurementsWithSpotPriceResponse(**json.load(f))
+
+    def _valid_entries(self, measurements):
+        return [
+            entry
+            for entry in measurements.series
+            if entry.electricity is not None and entry.electricity_spot_prices is not None
+        ]
+
+    def test_calculate_total_spot_cost(self, measurements):
+        """Test that the total spot cost matches the per-entry sum in euros."""
+        expected = sum(
+            abs((entry.electricity_spot_prices * (1 + self.TAX) + self.MARGIN) * entry.electricity)
+            for entry in self._valid_entries(measurements)
+        )
+
+        assert calculate_total_spot_cost(measurements, self.TAX, self.MARGIN) == pytest.approx(expected / 100)
+
+    def test_calculate_impact_of_usage(self, measurements):
+        """Test that the impact of usage follows the (A-B) / E formula."""
+        entries = self._valid_entries(measurements)
+        weighted = sum(abs(entry.electricity_spot_prices * (1 + self.TAX) * entry.electricity) for entry in entries)
+        average = sum(abs(entry.electricity_spot_prices * (1 + self.TAX)) for entry in entries) / len(entries)
+        consumption = sum(abs(entry.electricity) for entry in entries)
+
+        impact = calculate_impact_of_usage(measurements, self.TAX)
+
+        assert impact == pytest.approx((weighted - average * consumption) / consumption)
+
+    def test_calculations_accept_series_entries(self, measurements):
+        """Test that a plain list of series entries gives the same result as the response."""
+        from_response = calculate_usage_cost_summary(measurements, self.TAX, self.MARGIN)
+        from_entries = calculate_usage_cost_summary(list(measurements.series), self.TAX, self.MARGIN)
+
+        assert from_entries.__dict__ == pytest.approx(from_response.__dict__)
+        assert calculate_total_consumption(measurements) == pytest.approx(from_response.total_consumption)
+
+    def test_pure_python_and_numpy_results_match(self, measurements, monkeypatch):
+        """Test that the vectorized calculation gives the same result as the pure Python one."""
+        pytest.importorskip("numpy")
+        vectorized = calculate_usage_cost_summary(measurements, self.TAX, self.MARGIN)
+        monkeypatch.setattr(calculations, "numpy", None)
+        pure_python = calculate_usage_cost_summary(measurements, self.TAX, self.MARGIN)
+
+        assert vectorized.__dict__ == pytest.approx(pure_python.__dict__)
+
+    def test_empty_measurements(self):
+        """Test that calculations over no data return zeros."""
+        summary = calculate_usage_cost_summary([], self.TAX, self.MARGIN)
+
+        assert summary.total_consumption == 0.0
+        assert summary.total_spot_cost == 0.0
+        assert summary.impact == 0.0
+
+    def test_numpy_is_imported_on_first_calculation(self):
+        """Importing the package must not pay for importing NumPy"""
+        code = "import sys, helenservice; print('numpy' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+        assert result.stdout.strip() == "False"
@@ -0,0 +1,132 @@
+import argparse
+import json
+import threading
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+
+from helenservice.api_response import MeasurementsWithSpotPriceResponse
+from helenservice.cli import HelenCLIPrompt, _export
+from helenservice.metrics import HelenMetrics
+from helenservice.price_client import HelenExchangePrices
+
+
+class TestHelenCLIPrompt:
+    def test_startup_does_not_wait_for_exchange_margin(self):
+        """The prompt is created while the margin scrape is still running"""
+        scrape_may_finish = threading.Event()
+
+        def slow_exchange_prices_scrape(self):
+            scrape_may_finish.wait(5)
+            return 0.45
+
+        with patch("helenservice.price_client.HelenPriceClient._scrape_exchange_prices", slow_exchange_prices_scrape):
+            cli_prompt = HelenCLIPrompt()
+            assert not cli_prompt._exchange_prices_future.done()
+            scrape_may_finish.set()
+            exchange_prices = cli_prompt._get_exchange_prices()
+
+        assert isinstance(exchange_prices, HelenExchangePrices)
+        assert exchange_prices.margin == 0.45
+        assert cli_prompt.api_client._margin == 0.45
+
+    def test_exchange_margin_is_scraped_again_if_background_scrape_failed(self):
+        with patch(
+            "helenservice.price_client.HelenPriceClient._scrape_exchange_prices",
+            side_effect=[ConnectionError("helen.fi is down"), 0.5],
+        ):
+            cli_prompt = HelenCLIPrompt()
+            exchange_prices = cli_prompt._get_exchange_prices()
+
+        assert exchange_prices.margin == 0.5
+        assert cli_prompt.api_client._margin == 0.5
+
+    def test_spot_cost_command_applies_exchange_margin(self, capsys):
+        with patch("helenservice.price_client.HelenPriceClient._scrape_exchange_prices", return_value=0.6):
+            cli_prompt = HelenCLIPrompt()
+            with patch.object(
+                cli_prompt.api_client, "calculate_total_costs_by_spot_prices_between_dates", return_value=12.3
+            ) as calculate:
+                cli_prompt.do_calculate_spot_cost_between_dates("2025-09-01 2025-09-30")
+
+        calculate.assert_called_once()
+        assert cli_prompt.api_client._margin == 0.6
+        assert capsys.readouterr().out.strip() == "12.3"
+
+    def test_stats_command(self, capsys):
+        with patch("helenservice.price_client.HelenPriceClient._scrape_exchange_prices", return_value=0.6):
+            cli_prompt = HelenCLIPrompt()
+        metrics = HelenMetrics()
+        metrics.record_request("api.omahelen.fi/v25/contract/list", 0.2, 2048)
+        metrics.record_cache("contract_list", "hits", 3)
+        metrics.record_cache("contract_list", "misses")
+
+        with patch("helenservice.cli.get_default_metrics", return_value=metrics):
+            cli_prompt.do_stats()
+            table = capsys.readouterr().out
+            cli_prompt.do_stats("prometheus")
+            prometheus_text = capsys.readouterr().out
+
+        assert "api.omahelen.fi/v25/contract/list" in table
+        assert "200.0" in table
+        assert "75%" in table
+        assert 'helen_cache_misses_total{cache="contract_list"} 1' in prometheus_text
+
+    def test_measurements_command_streams_csv(self, capsys):
+        with patch("helenservice.price_client.HelenPriceClient._scrape_exchange_prices", return_value=0.6):
+            cli_prompt = HelenCLIPrompt()
+        with open("tests/resources/measurement_spot_quarter_response.json") as f:
+            response = MeasurementsWithSpotPriceResponse(**json.load(f))
+
+        with patch.object(
+            cli_prompt.api_client, "iter_measurements_with_spot_prices", return_value=iter([response])
+        ) as iter_measurements:
+            cli_prompt.do_get_quarterly_measurements_with_spot_prices_json("2025-10-07 2025-10-07 csv")
+
+        iter_measurements.assert_called_once_with(date(2025, 10, 7), date(2025, 10, 7), "quarter")
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[0].startswith("start,stop,electricity")
+        assert len(lines) == 97
+
+    def test_measurements_command_rejects_unknown_format(self, capsys):
+        with patch("helenservice.price_client.HelenPriceClient._scrape_exchange_prices", return_value=0.6):
+            cli_prompt = HelenCLIPrompt()
+
+        cli_prompt.do_get_hourly_measurements_with_spot_prices_json("2025-10-07 2025-10-07 xml")
+
+        assert "json, compact, ndjson, csv" in capsys.readouterr().out
+
+    @pytest.mark.parametrize("input", ["", "2025-10-07", "2025-10-07 2025-10-08 csv extra"])
+    def test_measurements_command_rejects_wrong_number_of_arguments(self, capsys, input):
+        with patch("helenservice.price_client.HelenPriceClient._scrape_exchange_prices", return_value=0.6):
+            cli_prompt = HelenCLIPrompt()
+
+        with patch.object(cli_prompt.api_client, "get_measurements_with_spot_prices") as get_measurements:
+            cli_prompt.onecmd(f"get_hourly_measurements_with_spot_prices_json {input}")
+
+        get_measurements.assert_not_called()
+        assert "Please provide proper start and end dates" in capsys.readouterr().out
+
+
+class TestExportCommand:
+    def test_client_fetches_as_many_months_concurrently_as_there_are_workers(self, capsys):
+        args = argparse.Namespace(
+            session_file=None,
+            path="export.csv",
+            format="csv",
+            checkpoint=None,
+            start=date(2024, 1, 1),
+            end=date(2024, 12, 31),
+            gsrn=None,
+            workers=8,
+        )
+
+        with patch("helenservice.cli._read_credentials", return_value=("username", "password")):
+            with patch("helenservice.cli.HelenApiClient") as api_client_class:
+                with patch("helenservice.export.export_measurements") as export_measurements:
+                    export_measurements.return_value.resumed_from = None
+                    _export(args)
+
+        api_client_class.assert_called_once_with(max_fetch_workers=8)
+        assert export_measurements.call_args[0][-1] == 8
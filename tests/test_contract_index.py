@@ -0,0 +1,89 @@
+import copy
+import json
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+import pytest
+
+from helenservice.api_client import HelenApiClient
+from helenservice.contract_index import ContractIndex, ContractProducts
+
+NOW = datetime(2025, 10, 1)
+
+
+@pytest.fixture
+def contracts():
+    with open("tests/resources/contracts_response.json") as f:
+        return json.load(f)["contracts"]
+
+
+class TestContractIndex:
+    def test_only_active_contracts_are_indexed(self, contracts):
+        index = ContractIndex(contracts, NOW)
+
+        assert index.gsrn_ids == ["643007572987654321"]
+        assert index.delivery_site_ids == ["65656565"]
+        assert index.latest_contract["gsrn"] == "643007572987654321"
+        assert index.find("643007572123456789") is None
+        assert index.find("654321") is None
+
+    def test_newest_contract_wins_for_shared_gsrn(self, contracts):
+        renewed_contract = copy.deepcopy(contracts[1])
+        renewed_contract["start_date"] = "2025-08-01T00:00:00"
+        renewed_contract["end_date"] = None
+        index = ContractIndex([contracts[1], renewed_contract], NOW)
+
+        assert index.find("643007572987654321") is renewed_contract
+        assert index.find("65656565") is renewed_contract
+        assert index.latest_contract is renewed_contract
+
+    def test_production_and_future_contracts_are_not_active(self, contracts):
+        production_contract = copy.deepcopy(contracts[1])
+        production_contract["domain"] = "electricity-production"
+        future_contract = copy.deepcopy(contracts[1])
+        future_contract["start_date"] = "2025-11-01T00:00:00"
+
+        index = ContractIndex([production_contract, future_contract], NOW)
+
+        assert index.active_contracts == ()
+        assert index.latest_contract is None
+
+    def test_products_are_resolved(self, contracts):
+        index = ContractIndex(contracts, NOW)
+        products = index.get_products(index.latest_contract)
+
+        assert products.energy_product["id"] == "PERUSKIINT24_01MA"
+        assert products.energy_base_price_component["price"] == 4.04
+        assert products.energy_components["Energia"]["price"] == 8.69
+        assert products.transfer_product is None
+        assert products.transfer_components == {}
+        assert products.transfer_base_price_component is None
+
+    def test_contract_without_products(self):
+        products = ContractProducts({"gsrn": "643007572123456789"})
+
+        assert products.energy_product is None
+        assert products.energy_components == {}
+
+
+class TestHelenApiClientContractIndex:
+    def test_getters_reuse_the_index_of_a_cached_contract_list(self, contracts):
+        client = HelenApiClient()
+        client._session = Mock()
+        mock_response = Mock()
+        mock_response.json.return_value = {"contracts": contracts}
+
+        with patch("requests.Session.get", return_value=mock_response) as mock_get:
+            with patch("helenservice.contract_index.datetime") as mock_datetime:
+                mock_datetime.now.return_value = NOW
+                mock_datetime.strptime = datetime.strptime
+                assert client.get_contract_base_price() == 4.04
+                index = client._contract_index
+                assert client.get_contract_energy_unit_price() == 8.69
+                assert client.get_contract_type() == "PERUSKIINT24_01MA"
+                assert client.get_transfer_fee() == 0.0
+                assert client.get_transfer_base_price() == 0.0
+
+        mock_get.assert_called_once()
+        assert client._contract_index is index
+        assert client._selected_delivery_site_id == "643007572987654321"
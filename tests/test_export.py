@@ -0,0 +1,177 @@
+import csv
+import json
+import subprocess
+import sys
+from datetime import date
+from unittest.mock import Mock, patch
+
+import pytest
+
+from helenservice.api_client import HelenApiClient
+from helenservice.export import export_measurements
+from helenservice.utils import format_epoch_utc_timestamp, parse_utc_timestamp_to_epoch
+
+
+class TestExportMeasurements:
+    @pytest.fixture
+    def api_client(self):
+        """Create a test API client instance."""
+        client = HelenApiClient()
+        client._session = Mock()
+        client._session.get_access_token.return_value = "mock_token"
+        client._selected_delivery_site_id = "123456789"
+        client._selected_contract = {
+            "delivery_site": {"id": "123456789"},
+            "domain": None,
+            "gsrn": "643007572123456789",
+            "start_date": "2024-01-30T00:00:00",
+        }
+        client._all_active_contracts = [client._selected_contract]
+        return client
+
+    @pytest.fixture
+    def mock_measurement_spot_quarter_response(self):
+        """Load the test measurement with spot prices response (quarterly)."""
+        with open("tests/resources/measurement_spot_quarter_response.json") as f:
+            return json.load(f)
+
+    @pytest.fixture
+    def chart_data_api(self, mock_measurement_spot_quarter_response):
+        """Answer each request with a quarter series covering the requested range, and record the ranges"""
+        requested_ranges = []
+
+        def get(url, params=None, **kwargs):
+            requested_ranges.append((params["start"][:10], params["stop"][:10]))
+            start = parse_utc_timestamp_to_epoch(params["start"])
+            stop = parse_utc_timestamp_to_epoch(params["stop"])
+            series = [
+                {
+                    "start": format_epoch_utc_timestamp(quarter_start),
+                    "stop": format_epoch_utc_timestamp(quarter_start + 900),
+                    "electricity": 0.25,
+                    "electricity_spot_prices_vat": 5.0,
+                    "electricity_spot_prices": 4.0,
+                }
+                for quarter_start in range(start, stop, 900)
+            ]
+            mock_response = Mock()
+            mock_response.json.return_value = dict(
+                mock_measurement_spot_quarter_response, start=params["start"], stop=params["stop"], series=series
+            )
+            return mock_response
+
+        with patch("requests.Session.get", side_effect=get):
+            yield requested_ranges
+
+    def test_exports_from_contract_start_date(self, api_client, chart_data_api, tmp_path):
+        path = tmp_path / "export.csv"
+        checkpoint_file = tmp_path / "export.checkpoint"
+
+        result = export_measurements(
+            api_client, str(path), "csv", str(checkpoint_file), end_date=date(2024, 3, 2), max_workers=2
+        )
+
+        assert result.start_date == date(2024, 1, 30)
+        assert result.rows == 33 * 96
+        assert sorted(chart_data_api) == [
+            ("2024-01-29", "2024-01-31"),
+            ("2024-01-31", "2024-02-29"),
+            ("2024-02-29", "2024-03-02"),
+        ]
+        with open(path) as f:
+            rows = list(csv.DictReader(f))
+        assert len(rows) == result.rows
+        assert rows[0]["start"] == "2024-01-29T22:00:00Z"
+        assert rows[-1]["stop"] == "2024-03-02T22:00:00Z"
+        assert rows[0]["ambient_temperature"] == ""
+        with open(checkpoint_file) as f:
+            checkpoint = json.load(f)
+        assert checkpoint["next_date"] == "2024-03-03"
+        assert checkpoint["rows"] == result.rows
+
+    def test_interrupted_export_resumes_from_checkpoint(self, api_client, chart_data_api, tmp_path):
+        path = tmp_path / "export.ndjson"
+        checkpoint_file = tmp_path / "export.checkpoint"
+        get_measurements = api_client.get_measurements_with_spot_prices
+
+        def fail_in_march(start, *args):
+            if start.month == 3:
+                raise ConnectionError("Connection lost")
+            return get_measurements(start, *args)
+
+        with patch.object(api_client, "get_measurements_with_spot_prices", side_effect=fail_in_march):
+            with pytest.raises(ConnectionError):
+                export_measurements(
+                    api_client, str(path), "ndjson", str(checkpoint_file), date(2024, 1, 1), date(2024, 3, 31), None, 1
+                )
+        chart_data_api.clear()
+
+        result = export_measurements(
+            api_client, str(path), "ndjson", str(checkpoint_file), date(2024, 1, 1), date(2024, 3, 31), None, 1
+        )
+
+        assert result.resumed_from == date(2024, 3, 1)
+        assert chart_data_api == [("2024-02-29", "2024-03-31")]
+        with open(path) as f:
+            starts = [json.loads(line)["start"] for line in f]
+        # 31 March has only 23 hours
+        assert len(starts) == len(set(starts)) == 91 * 96 - 4 == result.rows
+        assert starts[0] == "2023-12-31T22:00:00Z"
+
+    def test_days_that_may_change_are_fetched_again(self, api_client, chart_data_api, tmp_path):
+        path = tmp_path / "export.csv"
+        checkpoint_file = tmp_path / "export.checkpoint"
+
+        with patch("helenservice.cache_policy.get_local_today", return_value=date(2024, 2, 10)):
+            first = export_measurements(
+                api_client, str(path), "csv", str(checkpoint_file), date(2024, 1, 1), date(2024, 2, 29)
+            )
+        api_client = HelenApiClient()
+        api_client._session = Mock()
+        api_client._session.get_access_token.return_value = "mock_token"
+        api_client._selected_contract = {"gsrn": "643007572123456789", "start_date": "2024-01-01T00:00:00"}
+        with patch("helenservice.cache_policy.get_local_today", return_value=date(2024, 2, 20)):
+            second = export_measurements(
+                api_client, str(path), "csv", str(checkpoint_file), date(2024, 1, 1), date(2024, 2, 29)
+            )
+
+        assert first.rows == second.rows == (31 + 29) * 96
+        assert second.resumed_from == date(2024, 2, 1)
+        assert chart_data_api[-1] == ("2024-01-31", "2024-02-29")
+        with open(path) as f:
+            starts = [row["start"] for row in csv.DictReader(f)]
+        assert len(starts) == len(set(starts)) == second.rows
+
+    def test_checkpoint_of_another_export_is_not_resumed(self, api_client, chart_data_api, tmp_path):
+        checkpoint_file = tmp_path / "export.checkpoint"
+        export_measurements(
+            api_client, str(tmp_path / "a.csv"), "csv", str(checkpoint_file), date(2024, 1, 1), date(2024, 1, 31)
+        )
+
+        with pytest.raises(ValueError):
+            export_measurements(
+                api_client, str(tmp_path / "a.ndjson"), "ndjson", str(checkpoint_file), date(2024, 1, 1)
+            )
+
+    def test_parquet(self, api_client, chart_data_api, tmp_path):
+        pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+        path = tmp_path / "export"
+
+        result = export_measurements(api_client, str(path), "parquet", None, date(2024, 1, 20), date(2024, 2, 5))
+
+        assert sorted(file.name for file in path.iterdir()) == ["2024-01-20.parquet", "2024-02-01.parquet"]
+        table = pyarrow_parquet.read_table(path)
+        assert table.num_rows == result.rows == 17 * 96
+        assert table.column("electricity")[0].as_py() == 0.25
+        assert table.column("ambient_temperature").null_count == table.num_rows
+
+    def test_unknown_format(self, api_client, tmp_path):
+        with pytest.raises(ValueError):
+            export_measurements(api_client, str(tmp_path / "export.xml"), "xml")
+
+    def test_pyarrow_is_imported_only_for_parquet(self):
+        """Importing the package and the CLI must not pay for importing pyarrow"""
+        code = "import sys, helenservice, helenservice.cli; print('pyarrow' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+        assert result.stdout.strip() == "False"
@@ -0,0 +1,74 @@
+import base64
+import json
+import os
+import stat
+import time
+
+import pytest
+from requests import Session
+
+from helenservice.helen_session import HelenSession
+
+
+def _create_jwt(claims: dict) -> str:
+    def encode(part: dict) -> str:
+        return base64.urlsafe_b64encode(json.dumps(part).encode()).decode().rstrip("=")
+
+    return f"{encode({'alg': 'RS256', 'typ': 'JWT'})}.{encode(claims)}.signature"
+
+
+class TestHelenSession:
+    """Test cases for saving and restoring HelenSession."""
+
+    def _create_session(self, access_token: str) -> HelenSession:
+        helen_session = HelenSession()
+        helen_session._session = Session()
+        helen_session._session.cookies.set("access-token", access_token, domain=".helen.fi", path="/")
+        return helen_session
+
+    def test_get_access_token_expiry(self):
+        """Test that the expiry time is decoded from the exp claim of the JWT."""
+        expiry = int(time.time()) + 3600
+        helen_session = self._create_session(_create_jwt({"sub": "user", "exp": expiry}))
+
+        assert helen_session.get_access_token_expiry().timestamp() == expiry
+        assert helen_session.is_access_token_valid()
+
+    def test_access_token_without_expiry(self):
+        """Test that a token that is not a JWT has no expiry and is not considered valid."""
+        helen_session = self._create_session("not-a-jwt")
+
+        assert helen_session.get_access_token_expiry() is None
+        assert not helen_session.is_access_token_valid()
+
+    def test_save_and_restore(self, tmp_path):
+        """Test that a saved session is restored with the same token and is only readable by the owner."""
+        access_token = _create_jwt({"exp": int(time.time()) + 3600})
+        session_file = tmp_path / "session.json"
+        self._create_session(access_token).save(session_file)
+
+        restored = HelenSession.restore(session_file)
+
+        assert restored is not None
+        assert restored.get_access_token() == access_token
+        if os.name == "posix":
+            assert stat.S_IMODE(os.stat(session_file).st_mode) == 0o600
+
+    def test_restore_expired_session(self, tmp_path):
+        """Test that an expired token is not restored."""
+        session_file = tmp_path / "session.json"
+        self._create_session(_create_jwt({"exp": int(time.time()) - 10})).save(session_file)
+
+        assert HelenSession.restore(session_file) is None
+
+    @pytest.mark.skipif(os.name != "posix", reason="file permissions are POSIX specific")
+    def test_restore_ignores_file_readable_by_others(self, tmp_path):
+        """Test that a session file that other users can read is not trusted."""
+        session_file = tmp_path / "session.json"
+        self._create_session(_create_jwt({"exp": int(time.time()) + 3600})).save(session_file)
+        os.chmod(session_file, 0o644)
+
+        assert HelenSession.restore(session_file) is None
+
+    def test_restore_missing_file(self, tmp_path):
+        assert HelenSession.restore(tmp_path / "missing.json") is None
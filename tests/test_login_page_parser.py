@@ -0,0 +1,70 @@
+from unittest.mock import patch
+
+import pytest
+from bs4 import BeautifulSoup
+
+from helenservice.helen_session import HelenSession
+from helenservice.login_page_parser import extract_login_page_fields
+
+
+def _read_login_page(name):
+    with open(f"tests/resources/login/{name}") as f:
+        return f.read().replace("{base}", "https://login.example.test")
+
+
+class TestLoginPageParser:
+    """Test cases for the lightweight login page extractor."""
+
+    @pytest.mark.parametrize("page", ["tupas.html", "authorize.html", "access_granted.html", "auth_response.html"])
+    def test_form_matches_beautifulsoup(self, page):
+        """Test that the form action, method and inputs match what BeautifulSoup finds."""
+        html = _read_login_page(page)
+        soup = BeautifulSoup(html, "html.parser")
+        input_names = ("code", "state") if soup.find("input", {"name": "code"}) else ()
+
+        fields = extract_login_page_fields(html, input_names)
+
+        assert fields.form_action == soup.find("form").attrs["action"]
+        assert fields.form_method == soup.find("form").attrs["method"]
+        for name in input_names:
+            assert fields.inputs[name] == soup.find("input", {"name": name}).get("value")
+
+    def test_anchor_matches_beautifulsoup(self):
+        html = _read_login_page("proceed.html")
+
+        fields = extract_login_page_fields(html, need_form=False, need_anchor=True)
+
+        assert fields.anchor_href == BeautifulSoup(html, "html.parser").find("a").attrs["href"]
+
+    def test_entities_are_unescaped(self):
+        fields = extract_login_page_fields(_read_login_page("access_granted.html"), ("code", "state"))
+
+        assert fields.inputs["code"] == "c0de-&-8d1f4e2a"
+
+    def test_missing_fields_are_none(self):
+        fields = extract_login_page_fields("<html><body><p>No form here</p></body></html>", ("code",), need_anchor=True)
+
+        assert fields.form_action is None
+        assert fields.anchor_href is None
+        assert "code" not in fields.inputs
+
+    def test_session_uses_extractor(self):
+        """Test that HelenSession does not build a BeautifulSoup tree when the extractor finds every field."""
+        html = _read_login_page("access_granted.html")
+
+        with patch("helenservice.helen_session.BeautifulSoup", wraps=BeautifulSoup) as mock_soup:
+            fields = HelenSession()._parse_login_page(html, ("code", "state"))
+
+            mock_soup.assert_not_called()
+            assert fields.form_action == "https://login.example.test/continue"
+
+    def test_session_falls_back_to_beautifulsoup(self):
+        """Test that HelenSession uses BeautifulSoup when the extractor cannot find every field."""
+        html = '<form action="/continue" method="get"><input name="code"></form>'
+
+        with patch("helenservice.helen_session.BeautifulSoup", wraps=BeautifulSoup) as mock_soup:
+            fields = HelenSession()._parse_login_page(html, ("code",))
+
+            mock_soup.assert_called_once()
+            assert fields.form_action == "/continue"
+            assert fields.inputs == {"code": None}
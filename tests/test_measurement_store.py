@@ -0,0 +1,130 @@
+import json
+from datetime import date
+from unittest.mock import Mock, patch
+
+import pytest
+
+from helenservice.api_client import HelenApiClient
+from helenservice.api_response import MeasurementsWithSpotPriceResponse
+from helenservice.const import RESOLUTION_QUARTER
+from helenservice.measurement_store import MeasurementStore
+
+
+class TestMeasurementStore:
+    """Test cases for the persistent measurement store."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        return MeasurementStore(tmp_path / "measurements.sqlite3")
+
+    @pytest.fixture
+    def mock_measurement_spot_quarter_response(self):
+        """Load the test measurement with spot prices response (quarterly)."""
+        with open("tests/resources/measurement_spot_quarter_response.json") as f:
+            return json.load(f)
+
+    def _create_api_client(self, store):
+        client = HelenApiClient(measurement_store=store)
+        client._session = Mock()
+        client._session.get_access_token.return_value = "mock_token"
+        client._selected_delivery_site_id = "123456789"
+        client._selected_contract = {"delivery_site": {"id": "123456789"}, "domain": None, "gsrn": "643007572123456789"}
+        return client
+
+    def test_split_by_local_day(self, mock_measurement_spot_quarter_response):
+        """Test that a response covering one Helsinki day is split into exactly that day."""
+        response = MeasurementsWithSpotPriceResponse(**mock_measurement_spot_quarter_response)
+
+        days = response.split_by_local_day()
+
+        assert list(days.keys()) == [date(2025, 10, 7)]
+        assert len(days[date(2025, 10, 7)].series) == 96
+        assert days[date(2025, 10, 7)].start == "2025-10-06T21:00:00Z"
+        assert days[date(2025, 10, 7)].stop == "2025-10-07T21:00:00Z"
+
+    def test_put_and_get_days(self, store, mock_measurement_spot_quarter_response):
+        """Test that stored days are returned as equal responses and missing days are left out."""
+        response = MeasurementsWithSpotPriceResponse(**mock_measurement_spot_quarter_response)
+        store.put_days("643007572123456789", RESOLUTION_QUARTER, response.split_by_local_day())
+
+        days = store.get_days("643007572123456789", RESOLUTION_QUARTER, [date(2025, 10, 6), date(2025, 10, 7)])
+
+        assert list(days.keys()) == [date(2025, 10, 7)]
+        assert days[date(2025, 10, 7)].to_dict()["series"] == response.to_dict()["series"]
+        assert store.get_days("643007572123456789", "hour", [date(2025, 10, 7)]) == {}
+
+    def test_settled_days_are_served_from_store(self, store, mock_measurement_spot_quarter_response):
+        """Test that a new client reads settled days from the store instead of the API."""
+        mock_response = Mock()
+        mock_response.json.return_value = mock_measurement_spot_quarter_response
+
+        with patch("requests.Session.get", return_value=mock_response) as mock_get:
+            first = self._create_api_client(store).get_measurements_with_spot_prices(
+                date(2025, 10, 7), date(2025, 10, 7), RESOLUTION_QUARTER
+            )
+            second = self._create_api_client(store).get_measurements_with_spot_prices(
+                date(2025, 10, 7), date(2025, 10, 7), RESOLUTION_QUARTER
+            )
+
+            mock_get.assert_called_once()
+            assert len(first.series) == len(second.series) == 96
+            assert second.start == "2025-10-06T21:00:00Z"
+            assert second.stop == "2025-10-07T21:00:00Z"
+
+    def test_unsettled_days_are_fetched_again(self, store, mock_measurement_spot_quarter_response):
+        """Test that days which may still change are never served from the store."""
+        mock_response = Mock()
+        mock_response.json.return_value = mock_measurement_spot_quarter_response
+
+        with patch("helenservice.cache_policy.get_local_today", return_value=date(2025, 10, 8)):
+            with patch("requests.Session.get", return_value=mock_response) as mock_get:
+                self._create_api_client(store).get_measurements_with_spot_prices(
+                    date(2025, 10, 7), date(2025, 10, 7), RESOLUTION_QUARTER
+                )
+                self._create_api_client(store).get_measurements_with_spot_prices(
+                    date(2025, 10, 7), date(2025, 10, 7), RESOLUTION_QUARTER
+                )
+
+                assert mock_get.call_count == 2
+
+    def test_partial_days_are_not_served_from_store(self, store, mock_measurement_spot_quarter_response):
+        """Test that a settled day with missing measurements is fetched again instead of stored for good."""
+        partial_response = dict(mock_measurement_spot_quarter_response)
+        partial_response["series"] = [
+            dict(entry, electricity=None) if index >= 90 else entry
+            for index, entry in enumerate(mock_measurement_spot_quarter_response["series"])
+        ]
+        empty_response = dict(mock_measurement_spot_quarter_response, series=[])
+        responses = [Mock(), Mock(), Mock()]
+        responses[0].json.return_value = empty_response
+        responses[1].json.return_value = partial_response
+        responses[2].json.return_value = mock_measurement_spot_quarter_response
+
+        with patch("requests.Session.get", side_effect=responses) as mock_get:
+            for _ in range(3):
+                self._create_api_client(store).get_measurements_with_spot_prices(
+                    date(2025, 10, 7), date(2025, 10, 7), RESOLUTION_QUARTER
+                )
+            stored = self._create_api_client(store).get_measurements_with_spot_prices(
+                date(2025, 10, 7), date(2025, 10, 7), RESOLUTION_QUARTER
+            )
+
+            assert mock_get.call_count == 3
+            assert stored.is_complete()
+            assert len(stored.series) == 96
+
+    def test_is_complete(self, mock_measurement_spot_quarter_response):
+        response = MeasurementsWithSpotPriceResponse(**mock_measurement_spot_quarter_response)
+        day = response.split_by_local_day()[date(2025, 10, 7)]
+
+        assert response.is_complete()
+        assert day.is_complete()
+        assert not MeasurementsWithSpotPriceResponse(
+            **dict(mock_measurement_spot_quarter_response, series=[])
+        ).is_complete()
+        assert not MeasurementsWithSpotPriceResponse(
+            **dict(mock_measurement_spot_quarter_response, series=mock_measurement_spot_quarter_response["series"][1:])
+        ).is_complete()
+        assert not MeasurementsWithSpotPriceResponse(
+            **dict(mock_measurement_spot_quarter_response, resolution="hour")
+        ).is_complete()
@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+
+import pytest
+
+from helenservice.api_response import MeasurementsWithSpotPriceResponse
+from helenservice.measurement_writer import MEASUREMENT_ROW_FIELDS, write_measurements
+
+
+class TestMeasurementWriter:
+    @pytest.fixture
+    def mock_measurement_spot_quarter_response(self):
+        """Load the test measurement with spot prices response (quarterly)."""
+        with open("tests/resources/measurement_spot_quarter_response.json") as f:
+            return json.load(f)
+
+    @pytest.fixture
+    def halves(self, mock_measurement_spot_quarter_response):
+        """The quarter response split into two responses of consecutive time ranges"""
+        series = mock_measurement_spot_quarter_response["series"]
+        middle = series[48]["start"]
+        return [
+            MeasurementsWithSpotPriceResponse(
+                **dict(mock_measurement_spot_quarter_response, stop=middle, series=series[:48])
+            ),
+            MeasurementsWithSpotPriceResponse(
+                **dict(mock_measurement_spot_quarter_response, start=middle, series=series[48:])
+            ),
+        ]
+
+    def test_ndjson(self, halves, mock_measurement_spot_quarter_response):
+        output = io.StringIO()
+
+        row_count = write_measurements(iter(halves), "ndjson", output)
+
+        lines = output.getvalue().splitlines()
+        assert row_count == len(lines) == 96
+        first_row = json.loads(lines[0])
+        assert list(first_row) == list(MEASUREMENT_ROW_FIELDS)
+        assert first_row["start"] == "2025-10-06T21:00:00Z"
+        assert first_row["stop"] == "2025-10-06T21:15:00Z"
+        assert first_row["electricity"] == 1.006
+        assert first_row["ambient_temperature"] is None
+        assert json.loads(lines[48])["start"] == mock_measurement_spot_quarter_response["series"][48]["start"]
+
+    def test_csv(self, halves):
+        output = io.StringIO()
+
+        row_count = write_measurements(iter(halves), "csv", output)
+
+        rows = list(csv.reader(io.StringIO(output.getvalue())))
+        assert row_count == 96
+        assert rows[0] == list(MEASUREMENT_ROW_FIELDS)
+        assert rows[1] == ["2025-10-06T21:00:00Z", "2025-10-06T21:15:00Z", "1.006", "18.74217", "14.934", "", ""]
+        assert len(rows) == 97
+
+    def test_compact_json_matches_whole_response(self, halves, mock_measurement_spot_quarter_response):
+        output = io.StringIO()
+
+        write_measurements(iter(halves), "compact", output)
+
+        expected = MeasurementsWithSpotPriceResponse(**mock_measurement_spot_quarter_response).to_dict()
+        assert json.loads(output.getvalue()) == expected
+        assert "\n" not in output.getvalue().rstrip("\n")
+
+    def test_compact_json_without_responses(self):
+        output = io.StringIO()
+
+        assert write_measurements(iter([]), "compact", output) == 0
+        assert json.loads(output.getvalue())["series"] == []
+
+    def test_rows_are_flushed_per_response(self, halves):
+        """The rows of a response are written before the next response is requested"""
+        output = io.StringIO()
+
+        def responses():
+            yield halves[0]
+            assert len(output.getvalue().splitlines()) == 48
+            yield halves[1]
+
+        assert write_measurements(responses(), "ndjson", output) == 96
+
+    def test_unknown_format(self, halves):
+        with pytest.raises(ValueError):
+            write_measurements(iter(halves), "xml", io.StringIO())
@@ -0,0 +1,137 @@
+import threading
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from cachetools import cachedmethod
+
+from helenservice.cache_policy import PolicyCache
+from helenservice.metrics import HelenMetrics, InstrumentedTTLCache, get_endpoint_name
+from helenservice.transport import HelenTransport
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        status = 500 if self.path.startswith("/fail") else 200
+        body = b'{"contracts": []}'
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHelenMetrics:
+    def test_endpoint_name(self):
+        assert (
+            get_endpoint_name("https://api.omahelen.fi/v26/chart-data/643007572123456789/electricity?start=x")
+            == "api.omahelen.fi/v26/chart-data/{id}/electricity"
+        )
+        assert get_endpoint_name("https://www.helen.fi/prices/2025-10-07") == "www.helen.fi/prices/{date}"
+        assert get_endpoint_name("https://api.omahelen.fi/v25/contract/list") == "api.omahelen.fi/v25/contract/list"
+
+    def test_record_request(self):
+        metrics = HelenMetrics()
+        metrics.record_request("api/contract/list", 0.07, 1024)
+        metrics.record_request("api/contract/list", 3.0, 512, retries=2, error=True)
+
+        endpoint = metrics.snapshot()["endpoints"]["api/contract/list"]
+
+        assert endpoint["count"] == 2
+        assert endpoint["errors"] == 1
+        assert endpoint["retries"] == 2
+        assert endpoint["response_bytes"] == 1536
+        assert endpoint["latency_sum"] == pytest.approx(3.07)
+        assert endpoint["latency_buckets"]["0.1"] == 1
+        assert endpoint["latency_buckets"]["5.0"] == 1
+        assert sum(endpoint["latency_buckets"].values()) == 2
+
+    def test_listeners(self):
+        metrics = HelenMetrics()
+        events = []
+        metrics.add_listener(lambda event, name, values: events.append((event, name, values)))
+        metrics.add_listener(lambda event, name, values: 1 / 0)
+
+        metrics.record_request("endpoint", 0.2, 10)
+        metrics.record_cache("spot_prices", "misses")
+
+        assert events == [
+            ("request", "endpoint", {"duration": 0.2, "response_bytes": 10, "retries": 0, "error": False}),
+            ("cache", "spot_prices", {"event": "misses", "count": 1}),
+        ]
+
+    def test_prometheus_export(self):
+        metrics = HelenMetrics()
+        metrics.record_request("api.omahelen.fi/v25/contract/list", 0.3, 100)
+        metrics.record_cache("contract_list", "hits", 3)
+
+        text = metrics.to_prometheus()
+
+        assert 'helen_requests_total{endpoint="api.omahelen.fi/v25/contract/list"} 1' in text
+        assert 'helen_request_duration_seconds_bucket{endpoint="api.omahelen.fi/v25/contract/list",le="0.25"} 0' in text
+        assert 'helen_request_duration_seconds_bucket{endpoint="api.omahelen.fi/v25/contract/list",le="0.5"} 1' in text
+        assert 'helen_request_duration_seconds_bucket{endpoint="api.omahelen.fi/v25/contract/list",le="+Inf"} 1' in text
+        assert 'helen_response_bytes_total{endpoint="api.omahelen.fi/v25/contract/list"} 100' in text
+        assert 'helen_cache_hits_total{cache="contract_list"} 3' in text
+        assert "# TYPE helen_request_duration_seconds histogram" in text
+        assert text.endswith("\n")
+
+    def test_transport_records_responses(self):
+        server = HTTPServer(("127.0.0.1", 0), _StubHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        metrics = HelenMetrics()
+        transport = HelenTransport(max_retries=0, metrics=metrics)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            transport.get(f"{base_url}/v25/contract/list")
+            transport.get(f"{base_url}/fail/643007572123456789")
+        finally:
+            transport.close()
+            server.shutdown()
+            server.server_close()
+
+        endpoints = metrics.snapshot()["endpoints"]
+        assert endpoints[f"127.0.0.1:{server.server_address[1]}/v25/contract/list"]["response_bytes"] == 17
+        assert endpoints[f"127.0.0.1:{server.server_address[1]}/fail/{{id}}"]["errors"] == 1
+
+
+class TestCacheMetrics:
+    def test_policy_cache(self):
+        metrics = HelenMetrics()
+        now = [0.0]
+        cache = PolicyCache(1, timer=lambda: now[0], name="spot_prices", metrics=metrics)
+        today = date.today()
+
+        cache.get("a")
+        cache.put("a", 1, today)
+        cache.get("a")
+        now[0] += cache._cache_policy.live_ttl + 1
+        cache.get("a")
+        cache.put("b", 2, today - timedelta(days=10))
+
+        assert metrics.snapshot()["caches"]["spot_prices"] == {"hits": 1, "stale_hits": 1, "misses": 1, "evictions": 1}
+
+    def test_instrumented_ttl_cache_with_cachedmethod(self):
+        metrics = HelenMetrics()
+
+        class Client:
+            def __init__(self):
+                self._cache = InstrumentedTTLCache(maxsize=1, ttl=60, name="contract_list", metrics=metrics)
+
+            @cachedmethod(lambda self: self._cache)
+            def get(self, key):
+                return key
+
+        client = Client()
+        client.get(1)
+        client.get(1)
+        client.get(2)
+
+        assert metrics.snapshot()["caches"]["contract_list"] == {
+            "hits": 1,
+            "stale_hits": 0,
+            "misses": 2,
+            "evictions": 1,
+        }
@@ -0,0 +1,82 @@
+import json
+import random
+import statistics
+from array import array
+from datetime import date
+from unittest.mock import Mock, patch
+
+import pytest
+
+from helenservice.api_client import HelenApiClient
+from helenservice.price_percentiles import PricePercentileIndex
+from helenservice.spot_price_index import SpotPriceIndex
+
+
+def _index(prices: list) -> SpotPriceIndex:
+    starts = array("q", range(0, len(prices) * 900, 900))
+    stops = array("q", range(900, (len(prices) + 1) * 900, 900))
+    return SpotPriceIndex(starts, stops, array("d", prices), array("d", [price * 1.255 for price in prices]))
+
+
+class TestPricePercentileIndex:
+    def test_order_statistics_match_sorting(self):
+        random.seed(7)
+        days = {date(2025, 10, day): [random.uniform(-2, 30) for _ in range(96)] for day in range(1, 11)}
+        percentile_index = PricePercentileIndex(vat=False)
+        for day, prices in days.items():
+            percentile_index.add_day(day, _index(prices))
+        all_prices = sorted(price for prices in days.values() for price in prices)
+
+        assert len(percentile_index) == 960
+        assert percentile_index.median() == pytest.approx(statistics.median(all_prices))
+        assert percentile_index.quantile(0) == all_prices[0]
+        assert percentile_index.quantile(1) == all_prices[-1]
+        assert percentile_index.quantile(0.2) == pytest.approx(
+            statistics.quantiles(all_prices, n=5, method="inclusive")[0]
+        )
+        assert percentile_index.rank(all_prices[100]) == 100
+        assert percentile_index.percentile_of(all_prices[191]) == 20.0
+        assert percentile_index.is_among_cheapest(all_prices[191], 20)
+        assert not percentile_index.is_among_cheapest(all_prices[192], 20)
+
+    def test_replace_and_remove_days(self):
+        percentile_index = PricePercentileIndex()
+        percentile_index.add_day(date(2025, 10, 1), _index([1.0, 2.0, float("nan")]))
+        percentile_index.add_day(date(2025, 10, 2), _index([2.0, 3.0]))
+        percentile_index.add_day(date(2025, 10, 1), _index([4.0]))
+
+        assert len(percentile_index) == 3
+        assert percentile_index.quantile(0) == pytest.approx(2.0 * 1.255)
+
+        percentile_index.remove_day(date(2025, 10, 2))
+        assert percentile_index.days == [date(2025, 10, 1)]
+        assert percentile_index.median() == pytest.approx(4.0 * 1.255)
+
+    def test_max_days_drops_the_oldest_days(self):
+        percentile_index = PricePercentileIndex(vat=False, max_days=2)
+        for day in range(1, 5):
+            percentile_index.add_day(date(2025, 10, day), _index([float(day)]))
+
+        assert percentile_index.days == [date(2025, 10, 3), date(2025, 10, 4)]
+        assert percentile_index.median() == 3.5
+
+    def test_empty_index(self):
+        with pytest.raises(ValueError):
+            PricePercentileIndex().median()
+
+
+class TestHelenApiClientPricePercentileIndex:
+    def test_get_price_percentile_index(self):
+        client = HelenApiClient()
+        client._session = Mock()
+        client._session.get_access_token.return_value = "mock_token"
+        response = Mock()
+        with open("tests/resources/chart_data_response.json") as f:
+            response.json.return_value = json.load(f)
+
+        with patch("requests.Session.get", return_value=response) as mock_get:
+            percentile_index = client.get_price_percentile_index(date(2025, 10, 6), date(2025, 10, 8), vat=False)
+
+        assert mock_get.call_count == 3
+        assert len(percentile_index.days) == 3
+        assert percentile_index.quantile(0) == 11.514
@@ -0,0 +1,129 @@
+import json
+from array import array
+from datetime import date
+from unittest.mock import Mock, patch
+
+import pytest
+
+from helenservice.api_client import HelenApiClient
+from helenservice.api_response import MeasurementsWithSpotPriceResponse
+from helenservice.rollup import roll_up_measurements
+from helenservice.utils import format_epoch_utc_timestamp
+
+
+def _load_response(resolution: str) -> MeasurementsWithSpotPriceResponse:
+    with open(f"tests/resources/measurement_spot_{resolution}_response.json") as f:
+        return MeasurementsWithSpotPriceResponse(**json.load(f))
+
+
+def _quarter_response(start_epoch: int, count: int) -> MeasurementsWithSpotPriceResponse:
+    series = [
+        {
+            "start": format_epoch_utc_timestamp(start_epoch + index * 900),
+            "stop": format_epoch_utc_timestamp(start_epoch + (index + 1) * 900),
+            "electricity": 0.25,
+            "electricity_spot_prices": float(index % 4),
+        }
+        for index in range(count)
+    ]
+    return MeasurementsWithSpotPriceResponse(
+        series[0]["start"], series[-1]["stop"], "quarter", {"electricity": "kWh"}, {}, {}, {}, series
+    )
+
+
+class TestRollUpMeasurements:
+    def test_quarters_roll_up_to_the_hours_of_the_api(self):
+        quarters = _load_response("quarter")
+        hours = _load_response("hour")
+
+        rolled_up = roll_up_measurements(quarters, "hour")
+
+        assert rolled_up.resolution == "hour"
+        assert list(rolled_up.starts) == list(hours.starts)
+        assert list(rolled_up.stops) == list(hours.stops)
+        for rolled_up_entry, entry in zip(rolled_up.series, hours.series):
+            assert rolled_up_entry.electricity == pytest.approx(entry.electricity)
+            assert rolled_up_entry.electricity_spot_prices == pytest.approx(entry.electricity_spot_prices, abs=0.001)
+
+    def test_daylight_saving_time_end_is_one_25_hour_day(self):
+        # 2025-10-26 in Helsinki is from 2025-10-25T21:00Z to 2025-10-26T22:00Z
+        quarters = _quarter_response(1761426000, 100)
+
+        days = roll_up_measurements(quarters, "day")
+        hours = roll_up_measurements(quarters, "hour")
+
+        assert len(days.series) == 1
+        assert days.series[0].start == "2025-10-25T21:00:00Z"
+        assert days.series[0].stop == "2025-10-26T22:00:00Z"
+        assert days.series[0].electricity == 25.0
+        assert days.series[0].electricity_spot_prices == 1.5
+        assert len(hours.series) == 25
+
+    def test_months_follow_helsinki_month_boundaries(self):
+        # From 2025-03-31T00:00 to 2025-04-01T02:00 Helsinki time
+        quarters = _quarter_response(1743368400, 26 * 4)
+
+        months = roll_up_measurements(quarters, "month")
+
+        assert [(entry.start, entry.stop) for entry in months.series] == [
+            ("2025-03-30T21:00:00Z", "2025-03-31T21:00:00Z"),
+            ("2025-03-31T21:00:00Z", "2025-03-31T23:00:00Z"),
+        ]
+        assert [entry.electricity for entry in months.series] == [24.0, 2.0]
+
+    def test_prices_weighted_by_consumption(self):
+        quarters = _quarter_response(1761426000, 4)
+        quarters.columns["electricity"] = array("d", [0.0, 0.0, 0.0, 1.0])
+
+        assert roll_up_measurements(quarters, "hour").series[0].electricity_spot_prices == 1.5
+        assert roll_up_measurements(quarters, "hour", True).series[0].electricity_spot_prices == 3.0
+
+    def test_unsupported_resolution(self):
+        with pytest.raises(ValueError):
+            roll_up_measurements(_load_response("quarter"), "quarter")
+
+
+class TestHelenApiClientRollUp:
+    @pytest.fixture
+    def api_client(self):
+        client = HelenApiClient()
+        client._session = Mock()
+        client._session.get_access_token.return_value = "mock_token"
+        client._selected_contract = {"delivery_site": {"id": "123456789"}, "domain": None, "gsrn": "643007572123456789"}
+        return client
+
+    def test_hourly_and_daily_measurements_are_rolled_up_from_cached_quarters(self, api_client):
+        api_client._roll_up_resolutions = True
+        day = date(2025, 10, 7)
+        quarter_response = Mock()
+        with open("tests/resources/measurement_spot_quarter_response.json") as f:
+            quarter_response.json.return_value = json.load(f)
+
+        with patch("requests.Session.get", return_value=quarter_response) as mock_get:
+            api_client.get_measurements_with_spot_prices(day, day, "quarter")
+            hours = api_client.get_measurements_with_spot_prices(day, day, "hour")
+            days = api_client.get_daily_measurements_between_dates(day, day)
+
+        assert mock_get.call_count == 1
+        assert len(hours.series) == 24
+        assert days.series[0].electricity == pytest.approx(30.564)
+
+    def test_cached_quarters_do_not_change_the_hours_by_default(self, api_client):
+        day = date(2025, 10, 7)
+        responses = {}
+        for resolution in ("quarter", "hour"):
+            with open(f"tests/resources/measurement_spot_{resolution}_response.json") as f:
+                responses[resolution] = json.load(f)
+
+        def get(url, params=None, **kwargs):
+            response = Mock()
+            response.json.return_value = responses[params["resolution"]]
+            return response
+
+        with patch("requests.Session.get", side_effect=get) as mock_get:
+            api_client.get_measurements_with_spot_prices(day, day, "quarter")
+            hours = api_client.get_measurements_with_spot_prices(day, day, "hour")
+
+        assert mock_get.call_count == 2
+        assert hours.to_dict() == MeasurementsWithSpotPriceResponse(**responses["hour"]).to_dict()
+        assert hours.series[0].ambient_temperature is not None
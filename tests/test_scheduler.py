@@ -0,0 +1,87 @@
+import math
+import random
+from array import array
+from datetime import timedelta
+
+import pytest
+
+from helenservice.scheduler import Appliance, PriceScheduler
+from helenservice.spot_price_index import SpotPriceIndex
+
+DAY_START = 1759784400
+
+
+def _index(prices: list, start: int = DAY_START) -> SpotPriceIndex:
+    starts = array("q", [start + index * 900 for index in range(len(prices))])
+    stops = array("q", [value + 900 for value in starts])
+    values = array("d", [math.nan if price is None else price for price in prices])
+    return SpotPriceIndex(starts, stops, values, array("d", values))
+
+
+class TestPriceScheduler:
+    def test_cheapest_window(self):
+        scheduler = PriceScheduler(_index([5.0, 1.0, 2.0, 9.0, 0.5, 0.5, 8.0]))
+
+        run = scheduler.find_cheapest_window(2)
+
+        assert run.start == DAY_START + 4 * 900
+        assert run.stop == DAY_START + 6 * 900
+        assert run.total_price == 1.0
+        assert run.average_price == 0.5
+
+    def test_cheapest_window_matches_brute_force(self):
+        random.seed(3)
+        prices = [random.uniform(-1, 20) for _ in range(2 * 96)]
+        scheduler = PriceScheduler(_index(prices))
+
+        for interval_count in (1, 4, 13, 96):
+            expected_total = min(
+                sum(prices[index : index + interval_count]) for index in range(len(prices) - interval_count + 1)
+            )
+            assert scheduler.find_cheapest_window(interval_count).total_price == pytest.approx(expected_total)
+
+    def test_window_does_not_span_missing_prices_or_gaps(self):
+        index = SpotPriceIndex.concat([_index([1.0, None, 1.0, 1.0, 5.0]), _index([0.0, 0.0], DAY_START + 10 * 900)])
+        scheduler = PriceScheduler(index)
+
+        assert scheduler.find_cheapest_window(2).start == DAY_START + 10 * 900
+        assert scheduler.find_cheapest_window(3).start == DAY_START + 2 * 900
+        assert scheduler.find_cheapest_window(4) is None
+
+    def test_earliest_and_deadline(self):
+        scheduler = PriceScheduler(_index([0.0, 3.0, 2.0, 1.0, 0.0]))
+
+        run = scheduler.find_cheapest_window(timedelta(minutes=30), DAY_START + 900, DAY_START + 4 * 900)
+
+        assert [span.price for span in run.spans] == [2.0, 1.0]
+        assert scheduler.find_cheapest_window(2, deadline=DAY_START + 900) is None
+
+    def test_cheapest_intervals(self):
+        scheduler = PriceScheduler(_index([5.0, 1.0, None, 9.0, 0.5, 3.0]))
+
+        run = scheduler.find_cheapest_intervals(timedelta(minutes=40))
+
+        assert [span.price for span in run.spans] == [1.0, 0.5, 3.0]
+        assert run.total_price == 4.5
+        assert scheduler.find_cheapest_intervals(6) is None
+
+    def test_schedule_appliances(self):
+        scheduler = PriceScheduler(_index([4.0, 1.0, 1.0, 6.0, 0.0, 7.0, 0.0, 2.0]))
+
+        schedule = scheduler.schedule(
+            [
+                Appliance("car", timedelta(hours=1), deadline=DAY_START + 4 * 900),
+                Appliance("water heater", 2, earliest=DAY_START + 2 * 900),
+                Appliance("dishwasher", 2, contiguous=False),
+                Appliance("sauna", 20),
+            ]
+        )
+
+        assert schedule["car"].total_price == 12.0
+        assert schedule["water heater"].start == DAY_START + 6 * 900
+        assert [span.start for span in schedule["dishwasher"].spans] == [DAY_START + 4 * 900, DAY_START + 6 * 900]
+        assert schedule["sauna"] is None
+
+    def test_duration_must_be_positive(self):
+        with pytest.raises(ValueError):
+            PriceScheduler(_index([1.0])).find_cheapest_window(0)
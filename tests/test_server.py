@@ -0,0 +1,150 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from datetime import date
+from unittest.mock import Mock
+
+import pytest
+from requests import Response
+
+from helenservice.api_client import HelenApiClient
+from helenservice.api_exceptions import InvalidDeliverySiteException
+from helenservice.api_response import MeasurementsWithSpotPriceResponse
+from helenservice.calculations import UsageCostSummary
+from helenservice.price_client import HelenExchangePrices, HelenPriceClient
+from helenservice.server import HelenHTTPServer, HelenService
+from helenservice.transport import HelenTransport
+
+
+def _upstream_response(status_code: int, body: bytes) -> Response:
+    response = Response()
+    response.status_code = status_code
+    response._content = body
+    response.url = "https://api.omahelen.fi/v26/chart-data/643007572123456789/electricity"
+    return response
+
+
+class TestHelenHTTPServer:
+    @pytest.fixture
+    def api_client(self):
+        api_client = Mock(spec=HelenApiClient)
+        api_client.is_session_valid.return_value = True
+        with open("tests/resources/measurement_spot_quarter_response.json") as f:
+            api_client.get_measurements_with_spot_prices.return_value = MeasurementsWithSpotPriceResponse(
+                **json.load(f)
+            )
+        api_client.calculate_usage_cost_summary_between_dates.return_value = UsageCostSummary(
+            10.0, 1.5, 12.0, 11.0, 1.0, 96
+        )
+        return api_client
+
+    @pytest.fixture
+    def base_url(self, api_client):
+        price_client = Mock(spec=HelenPriceClient)
+        price_client.get_exchange_prices.return_value = HelenExchangePrices(0.45)
+        helen_service = HelenService(api_client, price_client, "username", "password")
+        server = HelenHTTPServer(("127.0.0.1", 0), helen_service, max_workers=2)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+        server.shutdown()
+        server.server_close()
+
+    @pytest.fixture
+    def transport(self):
+        return Mock(spec=HelenTransport)
+
+    @pytest.fixture
+    def upstream_base_url(self, transport):
+        """A server with a real HelenApiClient whose requests to Oma Helen are answered by the transport"""
+        api_client = HelenApiClient(transport=transport)
+        api_client._session = Mock()
+        api_client._session.get_access_token.return_value = "mock_token"
+        api_client._selected_contract = {"gsrn": "643007572123456789"}
+        api_client.is_session_valid = Mock(return_value=True)
+        helen_service = HelenService(api_client, Mock(spec=HelenPriceClient), "username", "password")
+        server = HelenHTTPServer(("127.0.0.1", 0), helen_service, max_workers=2)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+        server.shutdown()
+        server.server_close()
+
+    def _get(self, url: str) -> tuple[int, dict]:
+        try:
+            with urllib.request.urlopen(url, timeout=5) as response:
+                return response.status, json.load(response)
+        except urllib.error.HTTPError as e:
+            return e.code, json.load(e)
+
+    def test_health(self, base_url):
+        assert self._get(f"{base_url}/health") == (200, {"status": "ok", "session_valid": True})
+
+    def test_measurements(self, base_url, api_client):
+        status, body = self._get(
+            f"{base_url}/measurements?start=2025-10-07&end=2025-10-07&resolution=quarter&gsrn=643007572123456789"
+        )
+
+        assert status == 200
+        assert len(body["series"]) == 96
+        api_client.get_measurements_with_spot_prices.assert_called_once_with(
+            date(2025, 10, 7), date(2025, 10, 7), "quarter", "643007572123456789"
+        )
+
+    def test_usage_cost_summary_and_prices(self, base_url):
+        status, body = self._get(f"{base_url}/usage-cost-summary?start=2025-10-01&end=2025-10-07")
+        assert status == 200
+        assert body["total_spot_cost"] == 1.5
+
+        status, body = self._get(f"{base_url}/prices/exchange")
+        assert status == 200
+        assert body["margin"] == 0.45
+
+    def test_session_is_renewed_when_expired(self, base_url, api_client):
+        api_client.is_session_valid.return_value = False
+        api_client.get_contract_data_json.return_value = []
+
+        assert self._get(f"{base_url}/contracts") == (200, [])
+
+        api_client.login_and_init.assert_called_once_with("username", "password", None)
+
+    def test_errors(self, base_url, api_client):
+        api_client.get_contract_type.side_effect = InvalidDeliverySiteException("Unknown delivery site")
+
+        assert self._get(f"{base_url}/unknown")[0] == 404
+        assert self._get(f"{base_url}/measurements?start=2025-10-07")[0] == 400
+        assert self._get(f"{base_url}/measurements?start=2025-10-08&end=2025-10-07")[0] == 400
+        assert self._get(f"{base_url}/contract?gsrn=1") == (400, {"error": "Unknown delivery site"})
+
+    def test_prometheus_metrics(self, base_url):
+        with urllib.request.urlopen(f"{base_url}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            assert "# TYPE helen_request_duration_seconds histogram" in response.read().decode()
+
+    def test_upstream_error_page(self, upstream_base_url, transport):
+        transport.get.return_value = _upstream_response(502, b"<html><body>Bad Gateway</body></html>")
+
+        status, body = self._get(f"{upstream_base_url}/measurements?start=2025-10-07&end=2025-10-07")
+
+        assert status == 502
+        assert "502" in body["error"]
+
+    def test_upstream_response_that_is_not_json(self, upstream_base_url, transport):
+        transport.get.return_value = _upstream_response(200, b"<html><body>Maintenance</body></html>")
+
+        status, body = self._get(f"{upstream_base_url}/spot-prices?date=2025-10-07")
+
+        assert status == 502
+        assert "not valid JSON" in body["error"]
+
+    def test_upstream_json_error_body(self, upstream_base_url, transport):
+        transport.get.return_value = _upstream_response(200, b'{"error": "unauthorized"}')
+
+        status, body = self._get(f"{upstream_base_url}/measurements?start=2025-10-07&end=2025-10-07")
+
+        assert status == 502
+        assert "Unexpected response" in body["error"]
+
+    def test_unexpected_error(self, base_url, api_client):
+        api_client.get_contract_data_json.side_effect = RuntimeError("Unexpected")
+
+        assert self._get(f"{base_url}/contracts") == (500, {"error": "Internal server error"})
@@ -0,0 +1,85 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from unittest.mock import Mock, patch
+
+import pytest
+
+from helenservice.api_client import HelenApiClient
+from helenservice.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    def _call_concurrently(self, function, count: int) -> list:
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            futures = [executor.submit(function) for _ in range(count)]
+            return [future.exception() or future.result() for future in futures]
+
+    def test_concurrent_calls_share_one_call(self):
+        group = SingleFlight()
+        calls = []
+
+        def slow_call():
+            calls.append(1)
+            time.sleep(0.2)
+            return "result"
+
+        results = self._call_concurrently(lambda: group.do("key", slow_call), 8)
+
+        assert results == ["result"] * 8
+        assert len(calls) == 1
+
+    def test_exception_is_shared_and_next_call_runs_again(self):
+        group = SingleFlight()
+
+        def failing_call():
+            time.sleep(0.2)
+            raise ConnectionError("upstream is down")
+
+        results = self._call_concurrently(lambda: group.do("key", failing_call), 4)
+
+        assert all(isinstance(result, ConnectionError) for result in results)
+        assert group.do("key", lambda: "recovered") == "recovered"
+
+    def test_different_keys_are_not_coalesced(self):
+        group = SingleFlight()
+        both_running = threading.Barrier(2, timeout=5)
+
+        def call(value):
+            both_running.wait()
+            return value
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(group.do, "first", call, 1)
+            second = executor.submit(group.do, "second", call, 2)
+
+        assert (first.result(), second.result()) == (1, 2)
+
+    @pytest.fixture
+    def api_client(self):
+        client = HelenApiClient()
+        client._session = Mock()
+        client._session.get_access_token.return_value = "mock_token"
+        return client
+
+    def test_concurrent_cache_misses_send_one_request(self, api_client):
+        """Test that concurrent callers of the same spot prices share one upstream request."""
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            "start": "2025-10-05T21:00:00Z",
+            "stop": "2025-10-06T21:00:00Z",
+            "resolution": "quarter",
+            "unit": "c/kWh",
+            "series": [],
+        }
+
+        def slow_get(*args, **kwargs):
+            time.sleep(0.2)
+            return mock_response
+
+        with patch("requests.Session.get", side_effect=slow_get) as mock_get:
+            results = self._call_concurrently(lambda: api_client.get_spot_prices_from_chart_data(date(2025, 10, 6)), 8)
+
+        assert mock_get.call_count == 1
+        assert all(result is results[0] for result in results)
@@ -0,0 +1,100 @@
+import json
+from datetime import date, datetime, timezone
+from unittest.mock import Mock, patch
+
+import pytest
+
+from helenservice.api_client import HelenApiClient
+from helenservice.api_response import MeasurementsWithSpotPriceResponse, SpotPriceChartResponse
+from helenservice.spot_price_index import SpotPriceIndex
+from helenservice.utils import format_epoch_utc_timestamp
+
+# 2025-10-07T00:00 Helsinki time
+DAY_START = 1759784400
+
+
+def _chart_response(start_epoch: int, count: int) -> dict:
+    series = [
+        {
+            "start": format_epoch_utc_timestamp(start_epoch + index * 900),
+            "stop": format_epoch_utc_timestamp(start_epoch + (index + 1) * 900),
+            "electricity_spot_prices": float(index),
+            "electricity_spot_prices_vat": float(index) * 1.255,
+        }
+        for index in range(count)
+    ]
+    series[2]["electricity_spot_prices_vat"] = None
+    return {
+        "start": series[0]["start"],
+        "stop": series[-1]["stop"],
+        "resolution": "quarter",
+        "units": {},
+        "ids": {},
+        "data_start_times": {},
+        "data_stop_times": {},
+        "series": series,
+    }
+
+
+class TestSpotPriceIndex:
+    @pytest.fixture
+    def index(self):
+        return SpotPriceIndex.from_chart_response(SpotPriceChartResponse(**_chart_response(DAY_START, 96)))
+
+    def test_price_at(self, index):
+        assert index.price_at(DAY_START) == 0.0
+        assert index.price_at(datetime(2025, 10, 7, 14, 37)) == pytest.approx(58 * 1.255)
+        assert index.price_at(datetime(2025, 10, 7, 11, 37, tzinfo=timezone.utc), vat=False) == 58.0
+        assert index.price_at(DAY_START + 2 * 900 + 1) is None
+        assert index.price_at(DAY_START - 1) is None
+        assert index.price_at(DAY_START + 96 * 900) is None
+
+    def test_span_at(self, index):
+        span = index.span_at(datetime(2025, 10, 7, 14, 37))
+
+        assert span.start_time == datetime(2025, 10, 7, 11, 30, tzinfo=timezone.utc)
+        assert span.stop - span.start == 900
+        assert span.price == 58.0
+        assert index.span_at(0) is None
+
+    def test_slice(self, index):
+        sliced = index.slice(DAY_START + 900 + 1, DAY_START + 4 * 900)
+
+        assert [span.price for span in sliced] == [1.0, 2.0, 3.0]
+        assert len(index.slice(DAY_START + 96 * 900)) == 0
+        assert len(index.slice(stop=DAY_START)) == 0
+        assert len(index.slice()) == 96
+
+    def test_from_measurements(self):
+        with open("tests/resources/measurement_spot_quarter_response.json") as f:
+            measurements = MeasurementsWithSpotPriceResponse(**json.load(f))
+
+        index = SpotPriceIndex.from_measurements(measurements)
+
+        assert index.price_at(measurements.starts[5], vat=False) == measurements.series[5].electricity_spot_prices
+
+    def test_concat(self, index):
+        next_day = SpotPriceIndex.from_chart_response(SpotPriceChartResponse(**_chart_response(DAY_START + 86400, 96)))
+
+        combined = SpotPriceIndex.concat([index, next_day])
+
+        assert len(combined) == 192
+        assert combined.price_at(DAY_START + 86400, vat=False) == 0.0
+
+
+class TestHelenApiClientSpotPriceIndex:
+    def test_index_is_built_once_per_response(self):
+        client = HelenApiClient()
+        client._session = Mock()
+        client._session.get_access_token.return_value = "mock_token"
+        response = Mock()
+        response.json.return_value = _chart_response(DAY_START, 96)
+
+        with patch("requests.Session.get", return_value=response) as mock_get:
+            with patch.object(SpotPriceIndex, "from_chart_response", wraps=SpotPriceIndex.from_chart_response) as build:
+                first = client.get_spot_price_index(date(2025, 10, 7))
+                second = client.get_spot_price_index(date(2025, 10, 7))
+
+        assert mock_get.call_count == 1
+        assert build.call_count == 1
+        assert first.price_at(DAY_START, vat=False) == second.price_at(DAY_START, vat=False) == 0.0
@@ -0,0 +1,77 @@
+import json
+from datetime import date
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+from helenservice.api_client import HelenApiClient
+from helenservice.api_exceptions import InvalidApiResponseException
+from helenservice.api_response import MeasurementsWithSpotPriceResponse
+from helenservice.stream_decoder import decode_measurements_with_spot_prices
+
+
+def _chunks(data: bytes, chunk_size: int):
+    return (data[position : position + chunk_size] for position in range(0, len(data), chunk_size))
+
+
+class TestStreamDecoder:
+    @pytest.fixture
+    def mock_measurement_spot_quarter_response(self):
+        """Load the test measurement with spot prices response (quarterly)."""
+        with open("tests/resources/measurement_spot_quarter_response.json") as f:
+            return json.load(f)
+
+    @pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+    def test_decodes_same_response_as_json(self, mock_measurement_spot_quarter_response, chunk_size):
+        data = json.dumps(mock_measurement_spot_quarter_response, indent=4).encode()
+
+        response = decode_measurements_with_spot_prices(_chunks(data, chunk_size))
+
+        expected = MeasurementsWithSpotPriceResponse(**mock_measurement_spot_quarter_response)
+        assert response.to_dict() == expected.to_dict()
+        assert len(response.series) == 96
+
+    def test_multibyte_characters_split_between_chunks(self, mock_measurement_spot_quarter_response):
+        mock_measurement_spot_quarter_response["units"]["electricity_spot_prices"] = "€/kWh"
+        data = json.dumps(mock_measurement_spot_quarter_response, ensure_ascii=False).encode()
+
+        response = decode_measurements_with_spot_prices(_chunks(data, 3))
+
+        assert response.units["electricity_spot_prices"] == "€/kWh"
+
+    def test_numbers_split_between_chunks(self):
+        data = (
+            '{"start": "2025-10-06T21:00:00Z", "series": '
+            '[{"start": "2025-10-06T21:00:00Z", "stop": "2025-10-06T22:00:00Z", "electricity": 1.25}], '
+            '"missing_series": null}'
+        )
+
+        response = decode_measurements_with_spot_prices([data[: data.index("1.2") + 3], data[data.index("1.2") + 3 :]])
+
+        assert response.series[0].electricity == 1.25
+        assert response.missing_series == []
+
+    def test_truncated_response_raises(self, mock_measurement_spot_quarter_response):
+        data = json.dumps(mock_measurement_spot_quarter_response).encode()
+
+        with pytest.raises(InvalidApiResponseException):
+            decode_measurements_with_spot_prices(_chunks(data[: len(data) // 2], 100))
+
+    def test_api_client_streams_measurements(self, mock_measurement_spot_quarter_response):
+        client = HelenApiClient(stream_responses=True)
+        client._session = Mock()
+        client._session.get_access_token.return_value = "mock_token"
+        client._selected_contract = {"delivery_site": {"id": "123456789"}, "domain": None, "gsrn": "643007572123456789"}
+        mock_response = MagicMock()
+        mock_response.__enter__.return_value = mock_response
+        mock_response.iter_content.return_value = _chunks(
+            json.dumps(mock_measurement_spot_quarter_response).encode(), 512
+        )
+
+        with patch("requests.Session.get", return_value=mock_response) as mock_get:
+            result = client.get_measurements_with_spot_prices(date(2025, 10, 7), date(2025, 10, 7), "quarter")
+
+        assert mock_get.call_args[1]["stream"] is True
+        mock_response.json.assert_not_called()
+        mock_response.__exit__.assert_called_once()
+        assert len(result.series) == 96
@@ -0,0 +1,98 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from helenservice.transport import HelenTransport, get_default_transport
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        server.client_ports.append(self.client_address[1])
+        server.cookies.append(self.headers.get("Cookie"))
+        status = server.statuses.pop(0) if server.statuses else 200
+        body = b'{"ok": true}'
+        self.send_response(status)
+        if self.path.endswith("/login"):
+            self.send_header("Set-Cookie", "session=s3cr3t; Path=/")
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHelenTransport:
+    """Test cases for the pooled HTTP transport."""
+
+    @pytest.fixture
+    def stub_server(self):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+        server.statuses = []
+        server.client_ports = []
+        server.cookies = []
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield server
+        server.shutdown()
+        server.server_close()
+
+    def _url(self, server):
+        return f"http://127.0.0.1:{server.server_address[1]}/chart-data"
+
+    def test_retries_server_errors(self, stub_server):
+        """Test that 503 and 429 responses are retried until the request succeeds."""
+        stub_server.statuses = [503, 429]
+        transport = HelenTransport(backoff_factor=0)
+
+        response = transport.get(self._url(stub_server))
+
+        assert response.status_code == 200
+        assert response.json() == {"ok": True}
+        assert len(stub_server.client_ports) == 3
+        transport.close()
+
+    def test_returns_last_response_when_retries_run_out(self, stub_server):
+        stub_server.statuses = [500, 500]
+        transport = HelenTransport(max_retries=1, backoff_factor=0)
+
+        response = transport.get(self._url(stub_server))
+
+        assert response.status_code == 500
+        transport.close()
+
+    def test_reuses_connections(self, stub_server):
+        """Test that consecutive requests to the same host share one keep-alive connection."""
+        transport = HelenTransport()
+
+        for _ in range(3):
+            transport.get(self._url(stub_server))
+
+        assert len(stub_server.client_ports) == 3
+        assert len(set(stub_server.client_ports)) == 1
+        transport.close()
+
+    def test_transports_sharing_a_pool_keep_their_own_cookies(self, stub_server):
+        """Test that a cookie set for one transport is not sent by another transport of the same pool."""
+        transport = HelenTransport()
+        other_transport = transport.with_own_cookies()
+
+        transport.get(f"http://127.0.0.1:{stub_server.server_address[1]}/login")
+        transport.get(self._url(stub_server))
+        other_transport.get(self._url(stub_server))
+
+        assert stub_server.cookies == [None, "session=s3cr3t", None]
+        assert len(set(stub_server.client_ports)) == 1
+        transport.close()
+
+    def test_default_transports_share_the_pool_but_not_cookies(self):
+        transport = get_default_transport()
+        other_transport = get_default_transport()
+
+        assert transport._adapter is other_transport._adapter
+        assert transport._session is not other_transport._session
@@ -0,0 +1,65 @@
+import time
+from datetime import date
+
+import pytest
+
+from helenservice.utils import get_utc_time_range, group_consecutive_dates, map_ahead, plan_date_chunks
+
+
+class TestUtils:
+    """Test cases for the date utilities."""
+
+    def test_get_utc_time_range_across_dst_change(self):
+        """Test that the range starts and stops at Helsinki midnight in both winter and summer time."""
+        start_time, end_time = get_utc_time_range(date(2025, 3, 1), date(2025, 3, 31))
+
+        assert start_time == "2025-02-28T22:00:00+00:00"
+        assert end_time == "2025-03-31T21:00:00+00:00"
+
+    def test_plan_date_chunks_by_month(self):
+        """Test that chunks end at month boundaries and cover the whole range."""
+        chunks = plan_date_chunks(date(2025, 1, 15), date(2025, 3, 10), "month")
+
+        assert chunks == [
+            (date(2025, 1, 15), date(2025, 1, 31)),
+            (date(2025, 2, 1), date(2025, 2, 28)),
+            (date(2025, 3, 1), date(2025, 3, 10)),
+        ]
+
+    def test_plan_date_chunks_by_week(self):
+        """Test that chunks end on Sundays and cover the whole range."""
+        chunks = plan_date_chunks(date(2025, 9, 3), date(2025, 9, 16), "week")
+
+        assert chunks == [
+            (date(2025, 9, 3), date(2025, 9, 7)),
+            (date(2025, 9, 8), date(2025, 9, 14)),
+            (date(2025, 9, 15), date(2025, 9, 16)),
+        ]
+
+    def test_plan_date_chunks_with_unknown_chunk_size(self):
+        with pytest.raises(ValueError):
+            plan_date_chunks(date(2025, 9, 1), date(2025, 9, 30), "year")
+
+    def test_group_consecutive_dates(self):
+        dates = [date(2025, 9, 5), date(2025, 9, 1), date(2025, 9, 2), date(2025, 9, 4)]
+
+        assert group_consecutive_dates(dates) == [
+            (date(2025, 9, 1), date(2025, 9, 2)),
+            (date(2025, 9, 4), date(2025, 9, 5)),
+        ]
+
+    def test_map_ahead_yields_in_order_and_bounds_the_calls_ahead(self):
+        """Test that results come in the order of the items and at most max_workers calls run ahead."""
+        started = []
+
+        def slow_first(item):
+            started.append(item)
+            if item == 0:
+                time.sleep(0.05)
+            return item * 10
+
+        results = map_ahead(slow_first, range(6), 2)
+
+        assert next(results) == 0
+        assert len(started) <= 2
+        assert list(results) == [10, 20, 30, 40, 50]